@@ -3,11 +3,16 @@ from flask_cors import CORS
 from dotenv import load_dotenv            # <-- add this
 from config import Config
 from prr.utils.db import init_db
+from prr.utils import metrics
 from prr.routes.promotion import bp as promotion_bp
 from prr.routes.plan import bp as plan_bp
 from prr.routes.explain import bp as explain_bp
 from prr.routes.fairness import bp as fairness_bp
 from prr.routes.ingest import bp as ingest_bp
+from prr.routes.models import bp as models_bp
+from prr.services.model import ModelService
+from prr.services.leaderboard import LeaderboardService
+from prr.services.mentors import MentorService
 
 def create_app():
     load_dotenv()                         # <-- add this line
@@ -15,11 +20,15 @@ def create_app():
     app.config.from_object(Config)
     CORS(app)
     init_db(app)
+    metrics.init_app(app)
+    LeaderboardService.init_app(app)
+    MentorService.init_app(app)
     app.register_blueprint(promotion_bp, url_prefix="/v1/promotion")
     app.register_blueprint(plan_bp, url_prefix="/v1/plan")
     app.register_blueprint(explain_bp, url_prefix="/v1/explain")
     app.register_blueprint(fairness_bp, url_prefix="/v1/fairness")
     app.register_blueprint(ingest_bp, url_prefix="/v1/ingest")
+    app.register_blueprint(models_bp, url_prefix="/v1/models")
 
     @app.route("/")
     def root():
@@ -27,14 +36,32 @@ def create_app():
             "app": "PRR Flask API",
             "status": "ok",
             "endpoints": [
+                "GET  /ready",
+                "GET  /metrics",
                 "GET  /v1/ingest/health",
+                "POST /v1/ingest/<table>",
                 "POST /v1/promotion/score",
+                "POST /v1/promotion/score:batch",
+                "GET  /v1/promotion/leaderboard?org_unit=&decision=&limit=&cursor=",
                 "POST /v1/plan/recommend",
+                "POST /v1/plan/mentor",
                 "GET  /v1/explain/local?employee_id=1",
-                "GET  /v1/fairness/summary"
+                "POST /v1/explain/local:batch",
+                "GET  /v1/explain/global",
+                "GET  /v1/fairness/summary",
+                "GET  /v1/models",
+                "POST /v1/models/<version>/promote"
             ]
         })
 
+    @app.route("/ready")
+    def ready():
+        """Readiness probe: 503 until the model is loaded and warmed (starting that on first call)."""
+        if ModelService.ready():
+            return jsonify({"status": "ready", "model_version": ModelService.version()})
+        ModelService.warm_async()
+        return jsonify({"status": "warming", **ModelService.status()}), 503
+
     @app.route("/favicon.ico")
     def favicon():
         return ("", 204)
@@ -43,6 +70,9 @@ def create_app():
     def dashboard():
         return send_from_directory("templates", "index.html")
 
+    if Config.PRELOAD_MODEL:
+        # under gunicorn's preload_app this runs once in the master, and the workers share it copy-on-write
+        ModelService.warm()
     return app
 
 app = create_app()
@@ -0,0 +1,102 @@
+# Optional async entry point: uvicorn asgi:application --workers 1   (pip install -r requirements-async.txt)
+# The dashboard's per-employee reads (score, plan, local explanation) are served natively async: their independent
+# queries run concurrently and inference runs on a thread pool, so one worker multiplexes many in-flight requests.
+# Every other route is the regular Flask app behind asgiref's WSGI adapter; wsgi.py keeps serving it all synchronously.
+import asyncio, json, time
+from urllib.parse import parse_qs
+from asgiref.wsgi import WsgiToAsgi
+from app import app as flask_app
+from config import Config
+from prr.utils import metrics
+from prr.services import aio
+from prr.utils.dates import parse_as_of
+from prr.services.model import ModelService, ExplanationUnsupported
+from prr.services.recommender import infer_gaps
+from prr.services.mentors import MentorService
+from prr.routes.promotion import _payload
+from prr.routes.plan import plan_payload
+from prr.routes.explain import top_factors
+
+def _in_app(fn, *args):
+    """Sync service calls that use the Flask-SQLAlchemy session, run on the inference pool."""
+    with flask_app.app_context():
+        return fn(*args)
+
+async def score(body: dict, args: dict):
+    eid, as_of = int(body["employee_id"]), parse_as_of(body.get("as_of"))
+    model = await aio.current_model()
+    p, emp = await asyncio.gather(aio.score_for(eid, as_of, model), aio.employee_for(eid, as_of, model))
+    with flask_app.app_context():   # thresholds come from app.config, as in the blueprint
+        return _payload(eid, emp["name"] if emp else None, as_of, p, model.version)
+
+async def plan(body: dict, args: dict):
+    eid, as_of = int(body["employee_id"]), parse_as_of(body.get("as_of"))
+    model = await aio.current_model()
+    feats, emp, index = await asyncio.gather(aio.features_for(eid, as_of, model), aio.employee_for(eid, as_of, model),
+                                             aio.skill_index())
+    p = await aio.score_for(eid, as_of, model)
+    org = emp["org_unit"] if emp else ""
+    gaps = infer_gaps(feats, org)
+    mentor = next(iter(await aio.offload(_in_app, MentorService.suggest, eid, gaps, 1)), None)
+    return plan_payload(eid, p, model.version, gaps, index.search(gaps), mentor)
+
+async def explain_local(body: dict, args: dict):
+    eid, as_of = int(args["employee_id"]), parse_as_of(args.get("as_of"))
+    model = await aio.current_model()
+    values, base = await aio.explanation_for(eid, as_of, model)
+    feats = await aio.features_for(eid, as_of, model)
+    return {"employee_id": eid, "as_of": as_of, "model_version": model.version,
+            "base_value": base, "top_factors": top_factors(feats, values, model.feat_order)}
+
+ROUTES = {("POST", "/v1/promotion/score"): score, ("POST", "/v1/plan/recommend"): plan,
+          ("GET", "/v1/explain/local"): explain_local}
+
+class Application:
+    def __init__(self, routes: dict = ROUTES):
+        self.routes, self.wsgi = routes, WsgiToAsgi(flask_app)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan": return await self.lifespan(receive, send)
+        handler = self.routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if handler is None: return await self.wsgi(scope, receive, send)
+        t = time.perf_counter()
+        status, payload = 200, None
+        try:
+            raw = b""
+            while True:
+                message = await receive()
+                raw += message.get("body", b"")
+                if not message.get("more_body"): break
+            body = json.loads(raw) if raw else {}
+            args = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+            payload = await handler(body, args)
+        except (KeyError, ValueError, TypeError) as e:
+            status, payload = 400, {"error": f"bad request: {e!r}"}
+        except ExplanationUnsupported as e:     # as the explain blueprint reports it
+            status, payload = 501, {"error": str(e)}
+        except Exception as e:
+            flask_app.logger.exception("async %s %s failed", scope["method"], scope["path"])
+            status, payload = 500, {"error": str(e)}
+        data = flask_app.json.dumps(payload).encode() + b"\n"
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())]})
+        await send({"type": "http.response.body", "body": data})
+        if metrics.ENABLED:
+            metrics.REGISTRY.observe("prr_request_seconds", (("endpoint", scope["path"]), ("method", scope["method"]),
+                                                             ("status", str(status))), time.perf_counter() - t)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    if Config.PRELOAD_MODEL: await aio.offload(ModelService.warm)
+                    await send({"type": "lifespan.startup.complete"})
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+            elif message["type"] == "lifespan.shutdown":
+                await aio.AsyncDB.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+application = Application()
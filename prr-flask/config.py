@@ -7,3 +7,37 @@ class Config:
     BORDERLINE_LOW = float(os.getenv("BORDERLINE_LOW", 0.60))
     SECRET_KEY = os.getenv("SECRET_KEY","dev_secret_key_change_me")
     LOG_LEVEL = os.getenv("LOG_LEVEL","DEBUG")
+    FEATURE_STORE = os.getenv("FEATURE_STORE", "1") == "1"
+    CACHE_MAXSIZE = int(os.getenv("CACHE_MAXSIZE", 4096))
+    CACHE_TTL = float(os.getenv("CACHE_TTL", 300))
+    LABELS_PATH = os.getenv("LABELS_PATH", "data/promotion_labels_2014.csv")
+    FAIRNESS_GAP_THRESH = float(os.getenv("FAIRNESS_GAP_THRESH", 0.10))
+    FAIRNESS_TTL = float(os.getenv("FAIRNESS_TTL", 900))
+    INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 1000))
+    NATIVE_PREDICT = os.getenv("NATIVE_PREDICT", "1") == "1"
+    MODEL_REGISTRY = os.getenv("MODEL_REGISTRY", "ml/registry")
+    MODEL_POLL_S = float(os.getenv("MODEL_POLL_S", 5))
+    PRELOAD_MODEL = os.getenv("PRELOAD_MODEL", "0") == "1"
+    LEADERBOARD_AS_OF = os.getenv("LEADERBOARD_AS_OF", "2014-12-31")
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+    METRICS = os.getenv("METRICS", "1") == "1"
+    SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+    METRICS_TEXTFILE = os.getenv("METRICS_TEXTFILE", "")
+    # multi-worker servers: each worker dumps its registry here every METRICS_FLUSH_S; /metrics merges them
+    METRICS_DIR = os.getenv("METRICS_DIR", "")
+    METRICS_FLUSH_S = float(os.getenv("METRICS_FLUSH_S", 5))
+    # SQLite: per-connection pragmas (WAL lets readers run alongside a writer)
+    SQLITE_WAL = os.getenv("SQLITE_WAL", "1") == "1"
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_MB = int(os.getenv("SQLITE_MMAP_MB", 256))
+    SQLITE_CACHE_MB = int(os.getenv("SQLITE_CACHE_MB", 64))
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+    # server databases (Postgres): connection pool per process
+    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+    DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    # asgi.py: async driver URL (derived from DATABASE_URL when unset) and threads for model inference
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")
+    ASYNC_INFERENCE_THREADS = int(os.getenv("ASYNC_INFERENCE_THREADS", 4))
+    MENTOR_CAPACITY = int(os.getenv("MENTOR_CAPACITY", 3))
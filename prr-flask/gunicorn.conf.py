@@ -0,0 +1,45 @@
+# gunicorn -c gunicorn.conf.py wsgi:application
+# Loads the app and the model once in the master and forks the workers from it, so they share the model's pages
+# copy-on-write and start serving without a load of their own. PRELOAD_APP=0 restores one load per worker.
+import gc, glob, multiprocessing, os, tempfile
+
+preload_app = os.getenv("PRELOAD_APP", "1") == "1"
+if preload_app:
+    os.environ.setdefault("PRELOAD_MODEL", "1")
+# one scoring thread per worker; it also stops LightGBM's OpenMP pool from starting in the master, which a
+# forked worker would inherit broken
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+# /metrics is answered by whichever worker gets the scrape: have them share their registries through files
+if workers > 1 and not os.getenv("METRICS_DIR"):
+    os.environ["METRICS_DIR"] = tempfile.mkdtemp(prefix="prr-metrics-")
+
+def on_starting(server):
+    # a previous server's totals would otherwise be added to this one's; with no METRICS_DIR there are no files
+    metrics_dir = os.getenv("METRICS_DIR")
+    if not metrics_dir: return
+    for path in glob.glob(os.path.join(metrics_dir, "worker-*.json")): os.remove(path)
+
+def when_ready(server):
+    # everything loaded so far is permanent: take it out of the collector's generations, so a collection in a
+    # worker never writes to (and so copies) the shared pages
+    gc.collect()
+    gc.freeze()
+
+def post_fork(server, worker):
+    if not server.cfg.preload_app: return
+    # connections opened in the master (create_all) must not be shared across processes
+    from app import app
+    from prr.utils.db import db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+def worker_exit(server, worker):
+    # the exited worker's file keeps its final totals in the merged /metrics
+    from config import Config
+    if Config.METRICS and Config.METRICS_DIR:
+        from prr.utils import metrics
+        metrics.flush()
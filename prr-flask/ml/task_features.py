@@ -0,0 +1,73 @@
+# ml/task_features.py — training features from the per-task file, streamed chunk by chunk
+import argparse, sys
+from pathlib import Path
+import numpy as np, pandas as pd
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from prr.utils import datasets
+
+# task-level replacements for the monthly-derived columns; the rest come from the existing training features
+TASK_FEATURES = ["on_time_ratio", "quality_mean", "velocity_total", "impact_total"]
+SUMS = ["n", "on_time", "quality", "velocity", "impact"]
+
+class TaskAccumulator:
+    """Per-employee running sums over tasks dated on/after the employee's last promotion and on/before as_of."""
+    def __init__(self, employees: pd.DataFrame, as_of: str):
+        ids = employees["employee_id"].to_numpy()
+        self.size = int(ids.max()) + 1 if len(ids) else 1
+        never = np.iinfo(np.int64).max
+        self.since = np.full(self.size, never, dtype=np.int64)   # unknown employees never qualify
+        self.since[ids] = pd.to_datetime(employees["last_promotion_date"]).to_numpy("datetime64[D]").astype(np.int64)
+        self.until = np.datetime64(as_of, "D").astype(np.int64)
+        self.sums = {k: np.zeros(self.size) for k in SUMS}
+        self.rows = 0
+
+    def add(self, chunk: pd.DataFrame):
+        eid = chunk["employee_id"].to_numpy()
+        day = pd.to_datetime(chunk["date"], format="%Y-%m-%d").to_numpy("datetime64[D]").astype(np.int64)
+        ok = eid < self.size
+        ok[ok] &= (day[ok] >= self.since[eid[ok]]) & (day[ok] <= self.until)
+        eid = eid[ok]
+        self.sums["n"] += np.bincount(eid, minlength=self.size)
+        for k in SUMS[1:]:
+            self.sums[k] += np.bincount(eid, weights=chunk[k].to_numpy(dtype=float)[ok], minlength=self.size)
+        self.rows += len(chunk)
+
+    def frame(self) -> pd.DataFrame:
+        n = self.sums["n"]
+        ids = np.flatnonzero(n)
+        return pd.DataFrame({
+            "employee_id": ids,
+            "on_time_ratio": self.sums["on_time"][ids] / n[ids],
+            "quality_mean": self.sums["quality"][ids] / n[ids],
+            "velocity_total": self.sums["velocity"][ids].round().astype(np.int64),
+            "impact_total": self.sums["impact"][ids].round().astype(np.int64),
+        })
+
+def task_features(root, as_of="2014-12-31", batch_rows=1_000_000, base: pd.DataFrame | None = None) -> pd.DataFrame:
+    """training_features schema with the task-derived columns recomputed out of core from full_project_tasks."""
+    emp = datasets.read("employees", root, columns=["employee_id", "last_promotion_date"])
+    acc = TaskAccumulator(emp, as_of)
+    filters = datasets.date_filters("full_project_tasks", emp["last_promotion_date"].min(), as_of)
+    for chunk in datasets.iter_batches("full_project_tasks", root, columns=["employee_id", "date", *SUMS[1:]],
+                                       filters=filters, batch_rows=batch_rows):
+        acc.add(chunk)
+    if base is None:
+        base = datasets.read("training_features", root, columns=["employee_id"] + datasets.FEATURES)
+    rest = base[["employee_id"] + [c for c in datasets.FEATURES if c not in TASK_FEATURES]]
+    out = acc.frame().merge(rest, on="employee_id", how="inner")
+    print(f"Aggregated {acc.rows:,} task rows into {len(out):,} employees")
+    return out[["employee_id"] + datasets.FEATURES]
+
+def main():
+    ap = argparse.ArgumentParser(description="Rebuild training_features from full_project_tasks without loading it into memory")
+    ap.add_argument("--data", default="data", help="directory holding employees, training_features and full_project_tasks")
+    ap.add_argument("--out", default=None, help="where to write training_features (default: --data, replacing it)")
+    ap.add_argument("--as-of", default="2014-12-31")
+    ap.add_argument("--batch-rows", type=int, default=1_000_000)
+    ap.add_argument("--format", choices=["csv", "parquet"], default=datasets.default_format())
+    args = ap.parse_args()
+    feats = task_features(args.data, args.as_of, args.batch_rows)
+    print("Wrote", datasets.write("training_features", feats, args.out or args.data, args.format))
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 # Small demo trainer (kept for parity)
-import os, json, joblib, numpy as np, pandas as pd
+import os, sys, json, joblib, numpy as np, pandas as pd
 from sklearn.linear_model import LogisticRegression
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from prr.utils import datasets
 def main():
-    df = pd.read_csv('data/training_features_2005_2014.csv')
-    feat_cols = [c for c in df.columns if c!='employee_id']
+    feat_cols = datasets.FEATURES
+    df = datasets.read("training_features", columns=feat_cols)
     comp = (0.22*df['okr_attainment'] + 0.18*(df['feedback_mean']/5.0) +
             0.12*df['recognitions'] + 0.12*df['courses_completed'] +
             0.12*df['on_time_ratio'] + 0.12*df['quality_mean'] +
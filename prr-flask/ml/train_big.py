@@ -1,12 +1,43 @@
 # ml/train_big.py — LightGBM, group-wise CV, noise to avoid leakage-perfect scores
 import os, json, joblib, numpy as np, pandas as pd
+import sys, time, argparse, multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from lightgbm import LGBMClassifier
 from sklearn.model_selection import GroupKFold
 from sklearn.metrics import roc_auc_score, average_precision_score, precision_recall_fscore_support
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from prr.utils import datasets
+from prr.services.ensemble import FoldEnsemble, base_estimators, booster, shap_values
+from prr.services.registry import ModelRegistry
+from prr.utils.metrics import stage, add_rows, write_textfile
 
 ART_DIR = Path("ml/artifacts")
 NOISE_FLIP_RATE = 0.08  # 8% label flips to simulate human variability
+N_SPLITS = 5
+BASE_PARAMS = dict(
+    n_estimators=5000,            # big cap; early stopping will cut it
+    learning_rate=0.03,
+    num_leaves=31,                # smaller leaves for regularization
+    max_depth=-1,
+    subsample=0.8,
+    colsample_bytree=0.8,
+    reg_lambda=5.0,               # stronger L2
+    reg_alpha=1.0,                # L1
+    min_child_samples=50,         # discourage tiny leaves
+    min_split_gain=0.0,
+    class_weight="balanced",
+)
+# random-search space around BASE_PARAMS (trial 0 is always BASE_PARAMS itself)
+SEARCH_SPACE = {
+    "learning_rate": lambda r: float(10 ** r.uniform(-2, -1)),
+    "num_leaves": lambda r: int(r.choice([7, 15, 31, 63])),
+    "min_child_samples": lambda r: int(r.choice([10, 20, 50, 100])),
+    "subsample": lambda r: float(r.uniform(0.6, 1.0)),
+    "colsample_bytree": lambda r: float(r.uniform(0.6, 1.0)),
+    "reg_lambda": lambda r: float(10 ** r.uniform(-1, 1.3)),
+    "reg_alpha": lambda r: float(10 ** r.uniform(-2, 0.5)),
+}
 
 def evaluate(y_true, y_prob, y_pred):
     metrics = {}
@@ -22,16 +53,97 @@ def evaluate(y_true, y_prob, y_pred):
     metrics.update({"precision": float(p), "recall": float(r), "f1": float(f1)})
     return metrics
 
-def main():
-    # 1) Load features and labels
-    Xdf = pd.read_csv("data/training_features_2005_2014.csv")        # has employee_id + features
-    ydf = pd.read_csv("data/promotion_labels_2014.csv")               # has employee_id + label
-    # Merge to keep alignment; also bring org_unit for grouping (from employees file)
-    edf = pd.read_csv("data/employees_500.csv")[["employee_id","org_unit"]]
-    df = Xdf.merge(ydf[["employee_id","label"]], on="employee_id", how="inner") \
-            .merge(edf, on="employee_id", how="left")
+def shap_matrix(model, X):
+    """Vectorized TreeSHAP over X for the saved model (averaged over calibrated base models), log-odds."""
+    import shap
+    return shap_values([shap.TreeExplainer(booster(est)) for est in base_estimators(model)], X)
+
+def global_summary(sv, base, feat_cols, org_units):
+    """Per-feature mean |SHAP| / mean SHAP, overall and per org_unit."""
+    def summarize(block):
+        return {"n": int(block.shape[0]),
+                "mean_abs_shap": dict(zip(feat_cols, np.abs(block).mean(axis=0).round(6).tolist())),
+                "mean_shap": dict(zip(feat_cols, block.mean(axis=0).round(6).tolist()))}
+    codes, names = pd.factorize(org_units)
+    return {"feature_order": feat_cols, "base_value": base, **summarize(sv),
+            "by_org_unit": {str(name): summarize(sv[codes == i]) for i, name in enumerate(names)}}
+
+def cpu_budget(workers: int | None = None) -> tuple[int, int]:
+    """(fold processes, LightGBM threads per process) so that together they use the cores exactly once."""
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    workers = max(1, min(workers or cores, N_SPLITS, cores))
+    return workers, max(1, cores // workers)
+
+_DATA = {}
+
+def _init_worker(X, y):
+    # each pool process receives the training matrix once, not once per fold
+    _DATA["X"], _DATA["y"] = X, y
+
+def fit_fold(fold, tr, va, params, n_jobs, seed=42):
+    """Trains one early-stopped fold model; returns its validation predictions and timings."""
+    from lightgbm import early_stopping
+    X, y = _DATA["X"], _DATA["y"]
+    t0 = time.perf_counter()
+    clf = LGBMClassifier(**{**BASE_PARAMS, **params}, random_state=seed + fold, n_jobs=n_jobs, verbose=-1)
+    clf.fit(X[tr], y[tr], eval_set=[(X[va], y[va])], eval_metric="auc",
+            callbacks=[early_stopping(stopping_rounds=100, verbose=False)])
+    # Use best_iteration_ if available
+    best_it = int(getattr(clf, "best_iteration_", None) or clf.n_estimators)
+    prob = clf.predict_proba(X[va], num_iteration=best_it)[:, 1]
+    return {"fold": fold, "model": clf, "prob": prob, "best_iteration": best_it,
+            "wall_s": round(time.perf_counter() - t0, 3), "n_train": int(len(tr)), "n_valid": int(len(va))}
+
+def cross_validate(X, y, splits, params, pool=None, n_jobs=1):
+    """Runs every fold (concurrently when given a pool) and returns per-fold results in fold order."""
+    args = [(fold, tr, va, params, n_jobs) for fold, (tr, va) in enumerate(splits, 1)]
+    if pool is None:
+        _init_worker(X, y)
+        return [fit_fold(*a) for a in args]
+    return [f.result() for f in [pool.submit(fit_fold, *a) for a in args]]
+
+def search(X, y, splits, budget_s, max_trials, pool=None, n_jobs=1, seed=7):
+    """Time-boxed random search; each trial is a full (parallel) CV scored by OOF AUC. Returns (best, trials)."""
+    rng, t0, trials, best = np.random.default_rng(seed), time.perf_counter(), [], None
+    while len(trials) < max_trials and (not trials or time.perf_counter() - t0 < budget_s):
+        params = {} if not trials else {k: draw(rng) for k, draw in SEARCH_SPACE.items()}
+        folds = cross_validate(X, y, splits, params, pool, n_jobs)
+        oof = np.zeros(len(y))
+        for f in folds: oof[splits[f["fold"] - 1][1]] = f["prob"]
+        auc = float(roc_auc_score(y, oof))
+        trials.append({"params": params, "oof_auc": round(auc, 6), "wall_s": round(sum(f["wall_s"] for f in folds), 3)})
+        print(f"[Search {len(trials)}] OOF AUC={auc:.4f} {params or 'base params'}")
+        if best is None or auc > best[0]: best = (auc, params, folds)
+    return best, {"trials": trials, "budget_s": budget_s, "elapsed_s": round(time.perf_counter() - t0, 3)}
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description="Train the LightGBM promotion model with group-wise CV")
+    ap.add_argument("--workers", type=int, default=None, help="fold processes (default: one per core, at most 5)")
+    ap.add_argument("--search-budget", type=float, default=0.0,
+                    help="seconds of random hyperparameter search (0 = use the base params)")
+    ap.add_argument("--max-trials", type=int, default=20)
+    ap.add_argument("--ensemble", action="store_true",
+                    help="save all fold models plus one isotonic calibrator fit on OOF predictions "
+                         "instead of recalibrating the last fold with three refits")
+    ap.add_argument("--register", nargs="?", const="", default=None, metavar="VERSION",
+                    help="also copy the artifacts into MODEL_REGISTRY as a new version (default name: a timestamp)")
+    ap.add_argument("--promote", action="store_true", help="with --register, make it the CURRENT version "
+                                                           "(running servers pick it up within MODEL_POLL_S seconds)")
+    return ap.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    # 1) Load features and labels (Parquet when generated that way; only the needed columns either way)
+    feat_cols = datasets.FEATURES
+    with stage("train.load"):
+        Xdf = datasets.read("training_features", columns=["employee_id"] + feat_cols)
+        ydf = datasets.read("promotion_labels", columns=["employee_id","label"])
+        # Merge to keep alignment; also bring org_unit for grouping (from employees file)
+        edf = datasets.read("employees", columns=["employee_id","org_unit"])
+        df = Xdf.merge(ydf, on="employee_id", how="inner") \
+                .merge(edf, on="employee_id", how="left")
+        add_rows(len(df))
 
-    feat_cols = [c for c in Xdf.columns if c != "employee_id"]
     groups = df["org_unit"].astype("category").cat.codes.values
     X = df[feat_cols].values
     y = df["label"].astype(int).values
@@ -42,79 +154,57 @@ def main():
         flip_idx = rng.random(len(y)) < NOISE_FLIP_RATE
         y = np.where(flip_idx, 1 - y, y)
 
-    # 3) GroupKFold CV by org_unit (prevents memorizing org-specific patterns)
-    gkf = GroupKFold(n_splits=5)
-    oof_prob = np.zeros_like(y, dtype=float)
-    oof_pred = np.zeros_like(y, dtype=int)
-
-    # We’ll keep the last fold’s model as the one to serialize (or you can average models)
-    final_model = None
-    best_iter = None
-
-    for fold, (tr, va) in enumerate(gkf.split(X, y, groups=groups), 1):
-        Xtr, Xva = X[tr], X[va]
-        ytr, yva = y[tr], y[va]
-
-        clf = LGBMClassifier(
-            n_estimators=5000,            # big cap; early stopping will cut it
-            learning_rate=0.03,
-            num_leaves=31,                # smaller leaves for regularization
-            max_depth=-1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            reg_lambda=5.0,               # stronger L2
-            reg_alpha=1.0,                # L1
-            min_child_samples=50,         # discourage tiny leaves
-            min_split_gain=0.0,
-            class_weight="balanced",
-            random_state=42 + fold,
-            n_jobs=-1
-        )
-
-        # Early stopping via the sklearn API: use callbacks if available; else rely on best_score_
+    # 3) GroupKFold CV by org_unit (prevents memorizing org-specific patterns), folds run concurrently
+    splits = list(GroupKFold(n_splits=N_SPLITS).split(X, y, groups=groups))
+    workers, n_jobs = cpu_budget(args.workers)
+    pool = None
+    if workers > 1:
+        # spawn: a forked child inheriting an initialized OpenMP runtime can hang inside LightGBM
+        pool = ProcessPoolExecutor(workers, mp_context=mp.get_context("spawn"), initializer=_init_worker, initargs=(X, y))
+    with stage("train.cv"):
         try:
-            from lightgbm import early_stopping, log_evaluation
-            callbacks = [early_stopping(stopping_rounds=100), log_evaluation(period=100)]
-        except Exception:
-            callbacks = []
-
-        clf.fit(
-            Xtr, ytr,
-            eval_set=[(Xva, yva)],
-            eval_metric="auc",
-            callbacks=callbacks
-        )
-
-        # Use best_iteration_ if available
-        best_it = int(getattr(clf, "best_iteration_", clf.n_estimators))
-        prob = clf.predict_proba(Xva, num_iteration=best_it)[:, 1]
-        pred = (prob >= 0.5).astype(int)
-
-        oof_prob[va] = prob
-        oof_pred[va] = pred
-
-        # Keep last fold model (or you could choose the best-auc fold)
-        final_model = clf
-        best_iter = best_it
+            budget = args.search_budget if args.search_budget > 0 else 0.0
+            (_, params, folds), search_log = search(X, y, splits, budget, args.max_trials if budget else 1, pool, n_jobs)
+        finally:
+            if pool: pool.shutdown()
 
-        m = evaluate(yva, prob, pred)
-        print(f"[Fold {fold}] AUC={m['roc_auc']:.4f} AP={m['avg_precision']:.4f} F1={m['f1']:.4f}")
+    oof_prob = np.zeros_like(y, dtype=float)
+    for f in folds:
+        va = splits[f["fold"] - 1][1]
+        oof_prob[va] = f["prob"]
+        m = evaluate(y[va], f["prob"], (f["prob"] >= 0.5).astype(int))
+        print(f"[Fold {f['fold']}] AUC={m['roc_auc']:.4f} AP={m['avg_precision']:.4f} F1={m['f1']:.4f} "
+              f"best_iter={f['best_iteration']} {f['wall_s']:.1f}s")
+    oof_pred = (oof_prob >= 0.5).astype(int)
+
+    # We keep the last fold's model as the one to serialize, capped at its early-stopped size
+    final_model = folds[-1]["model"].set_params(n_estimators=folds[-1]["best_iteration"], n_jobs=n_jobs * workers)
+    best_iter = folds[-1]["best_iteration"]
 
     # 4) OOF metrics (stronger estimate of generalization)
     overall = evaluate(y, oof_prob, oof_pred)
     print("OOF metrics:", json.dumps(overall, indent=2))
 
-    # 5) Optional probability calibration (fit on full data)
+    # 5) Optional probability calibration: on the OOF predictions for a fold ensemble (no refits),
+    #    otherwise refit on the full data around the last fold model
     calibrated = False
     model_to_save = final_model
-    try:
-        from sklearn.calibration import CalibratedClassifierCV
-        cal = CalibratedClassifierCV(final_model, method="isotonic", cv=3)
-        cal.fit(X, y)
-        model_to_save = cal
-        calibrated = True
-    except Exception:
-        calibrated = False
+    with stage("train.calibrate"):
+        if args.ensemble:
+            model_to_save = FoldEnsemble.from_folds([f["model"] for f in folds], [f["best_iteration"] for f in folds], oof_prob, y)
+            calibrated = True
+        else:
+            try:
+                from sklearn.calibration import CalibratedClassifierCV
+                # the three calibration fits share the cores the same way the folds did
+                cal_jobs = min(3, workers * n_jobs)
+                final_model.set_params(n_jobs=max(1, workers * n_jobs // cal_jobs))
+                cal = CalibratedClassifierCV(final_model, method="isotonic", cv=3, n_jobs=cal_jobs)
+                cal.fit(X, y)
+                model_to_save = cal
+                calibrated = True
+            except Exception:
+                calibrated = False
 
     # 6) Save artifacts
     ART_DIR.mkdir(parents=True, exist_ok=True)
@@ -122,11 +212,16 @@ def main():
     with open(ART_DIR / "features.json", "w") as f:
         json.dump({
             "feature_order": feat_cols,
-            "model_type": "LightGBM",
+            "model_type": "LightGBM-FoldEnsemble" if args.ensemble else "LightGBM",
             "calibrated": calibrated,
             "best_iteration": best_iter,
             "label_noise_flip_rate": NOISE_FLIP_RATE,
-            "cv": "GroupKFold(n_splits=5, group=org_unit)"
+            "cv": f"GroupKFold(n_splits={N_SPLITS}, group=org_unit)",
+            "params": {**BASE_PARAMS, **params},
+            "folds": [{k: f[k] for k in ("fold", "best_iteration", "wall_s", "n_train", "n_valid")} for f in folds],
+            "parallelism": {"workers": workers, "n_jobs_per_worker": n_jobs},
+            "search": search_log,
+            "oof": overall,
         }, f)
 
     # 7) (Optional) SHAP background sample
@@ -136,7 +231,23 @@ def main():
     except Exception:
         pass
 
+    # 8) Global SHAP artifacts: per-employee matrix (memory-mapped by the API) plus summary JSON
+    with stage("train.shap"):
+        try:
+            sv, base = shap_matrix(model_to_save, X)
+            np.save(ART_DIR / "shap_values.npy", sv.astype(np.float32))
+            np.save(ART_DIR / "shap_employee_ids.npy", df["employee_id"].to_numpy(dtype=np.int64))
+            with open(ART_DIR / "explain_global.json", "w") as f:
+                json.dump(global_summary(sv, base, feat_cols, df["org_unit"].fillna("Unknown").to_numpy()), f)
+        except Exception as e:
+            print("Skipped global SHAP artifacts:", e)
+
     print("Saved artifacts to ml/artifacts")
+    if args.register is not None:
+        version = ModelRegistry.publish(ART_DIR, args.register or None)
+        if args.promote: ModelRegistry.set_current(version)
+        print(f"Registered model version {version}" + (" (promoted)" if args.promote else ""))
+    write_textfile()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
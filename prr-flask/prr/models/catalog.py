@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class Catalog(Base):
     __tablename__ = "catalog"
+    __table_args__ = (Index("ux_catalog_natural", "course_id", unique=True),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     course_id: Mapped[str]
     title: Mapped[str]
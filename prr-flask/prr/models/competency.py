@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class CompetencyFramework(Base):
     __tablename__ = "competency_framework"
+    __table_args__ = (Index("ux_competency_framework_natural", "rank", "competency", unique=True),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     rank: Mapped[str]
     competency: Mapped[str]
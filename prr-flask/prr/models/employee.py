@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class Employee(Base):
     __tablename__ = "employee"
+    __table_args__ = (Index("ix_employee_org_unit", "org_unit"),)
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str]
     org_unit: Mapped[str]
@@ -0,0 +1,18 @@
+from sqlalchemy.orm import Mapped, mapped_column
+from prr.models.base import Base
+class FeatureMonthly(Base):
+    """Running totals per employee through the end of `month` (YYYY-MM)."""
+    __tablename__ = "feature_monthly"
+    employee_id: Mapped[int] = mapped_column(primary_key=True)
+    month: Mapped[str] = mapped_column(primary_key=True)
+    on_time_n: Mapped[int] = mapped_column(default=0)
+    on_time_sum: Mapped[int] = mapped_column(default=0)
+    quality_n: Mapped[int] = mapped_column(default=0)
+    quality_sum: Mapped[float] = mapped_column(default=0)
+    velocity_sum: Mapped[int] = mapped_column(default=0)
+    impact_sum: Mapped[int] = mapped_column(default=0)
+    rating_n: Mapped[int] = mapped_column(default=0)
+    rating_sum: Mapped[int] = mapped_column(default=0)
+    recognitions: Mapped[int] = mapped_column(default=0)
+    incident_weight: Mapped[int] = mapped_column(default=0)
+    completions: Mapped[int] = mapped_column(default=0)
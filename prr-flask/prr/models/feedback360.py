@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class Feedback360(Base):
     __tablename__ = "feedback360"
+    __table_args__ = (Index("ix_feedback360_employee_date", "employee_id", "date", "rating"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     employee_id: Mapped[int]
     rater_id: Mapped[int]
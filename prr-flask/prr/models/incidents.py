@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class Incident(Base):
     __tablename__ = "incidents"
+    __table_args__ = (Index("ix_incidents_employee_date", "employee_id", "date", "severity"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     employee_id: Mapped[int]
     date: Mapped[str]
@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class LearningHistory(Base):
     __tablename__ = "learning_history"
+    __table_args__ = (Index("ix_learning_history_employee_end", "employee_id", "end_dt", "completion"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     employee_id: Mapped[int]
     course_id: Mapped[str]
@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class ManagerReview(Base):
     __tablename__ = "manager_review"
+    __table_args__ = (Index("ix_manager_review_employee_period", "employee_id", "period"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     employee_id: Mapped[int]
     period: Mapped[str]
@@ -0,0 +1,10 @@
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+from prr.models.base import Base
+class MentorAssignment(Base):
+    """Current mentor per mentee, chosen by MentorService; per-mentor counts are its load."""
+    __tablename__ = "mentor_assignment"
+    __table_args__ = (Index("ix_mentor_assignment_mentor", "mentor_id"),)
+    mentee_id: Mapped[int] = mapped_column(primary_key=True)
+    mentor_id: Mapped[int]
+    assigned_at: Mapped[float]
@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class OKR(Base):
     __tablename__ = "okr"
+    __table_args__ = (Index("ix_okr_employee_period", "employee_id", "period"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     employee_id: Mapped[int]
     period: Mapped[str]
@@ -1,7 +1,10 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class ProjectActivity(Base):
     __tablename__ = "project_activity"
+    __table_args__ = (Index("ix_project_activity_employee_date", "employee_id", "date", "on_time", "quality_score", "velocity", "customer_impact"),
+                      Index("ux_project_activity_natural", "employee_id", "date", "project_id", unique=True))
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     employee_id: Mapped[int]
     date: Mapped[str]
@@ -0,0 +1,16 @@
+from sqlalchemy import Index
+from sqlalchemy.orm import Mapped, mapped_column
+from prr.models.base import Base
+class PromotionScore(Base):
+    """Materialized readiness score per (employee, as_of), kept current by LeaderboardService."""
+    __tablename__ = "promotion_scores"
+    # leaderboard pages are backward range reads over (readiness_score, employee_id)
+    __table_args__ = (Index("ix_promotion_scores_rank", "as_of", "readiness_score", "employee_id"),
+                      Index("ix_promotion_scores_org_rank", "as_of", "org_unit", "readiness_score", "employee_id"))
+    employee_id: Mapped[int] = mapped_column(primary_key=True)
+    as_of: Mapped[str] = mapped_column(primary_key=True)
+    name: Mapped[str | None]
+    org_unit: Mapped[str | None]
+    readiness_score: Mapped[float]
+    model_version: Mapped[str]
+    scored_at: Mapped[float]
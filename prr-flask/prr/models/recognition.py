@@ -1,7 +1,9 @@
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column
 from prr.models.base import Base
 class Recognition(Base):
     __tablename__ = "recognition"
+    __table_args__ = (Index("ix_recognition_employee_date", "employee_id", "date"),)
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     employee_id: Mapped[int]
     date: Mapped[str]
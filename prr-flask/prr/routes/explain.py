@@ -1,16 +1,64 @@
 from flask import Blueprint, request, jsonify
-import numpy as np
-from prr.services.features import build_features
-from prr.services.model import ModelService
+from prr.utils.dates import parse_as_of
+from prr.services.features import build_features_batch
+from prr.services.model import ModelService, ExplanationUnsupported
+from prr.services.readiness import features_for, explanation_for
 bp = Blueprint("explain", __name__)
+def top_factors(feats: dict, shap_row, feat_order, k=5) -> list[dict]:
+    factors = [{"feature": f, "value": float(feats.get(f, 0)), "shap": float(v)} for f, v in zip(feat_order, shap_row)]
+    return sorted(factors, key=lambda t: abs(t['shap']), reverse=True)[:k]
+@bp.errorhandler(ExplanationUnsupported)
+def unsupported(e):
+    return jsonify({"error": str(e)}), 501
 @bp.route('/local', methods=['GET'])
 def local():
     eid = int(request.args['employee_id'])
-    as_of = request.args.get('as_of','2014-12-31')
-    feats = build_features(eid, as_of)
-    ModelService.load()
-    order = ModelService._feat_order
-    x = np.array([[feats.get(k,0) for k in order]])
-    top = sorted([{"feature":k, "value":float(v)} for k,v in zip(order, x[0])],
-                 key=lambda t: abs(t['value']), reverse=True)[:5]
-    return jsonify({"employee_id": eid, "top_factors": top})
+    try:
+        as_of = parse_as_of(request.args.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    model = ModelService.current()
+    feats = features_for(eid, as_of, model)
+    values, base = explanation_for(eid, as_of, model)
+    return jsonify({"employee_id": eid, "as_of": as_of, "model_version": model.version,
+                    "base_value": base, "top_factors": top_factors(feats, values, model.feat_order)})
+@bp.route('/local:batch', methods=['POST'])
+def local_batch():
+    data = request.get_json(force=True)
+    try:
+        as_of = parse_as_of(data.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    k = int(data.get('top_k', 5))
+    if not data.get('employee_ids'):
+        return jsonify({"error": "employee_ids is required"}), 400
+    feats = build_features_batch(data['employee_ids'], as_of)
+    eids = list(feats)
+    model = ModelService.current()
+    values, base = model.explain_batch([feats[e] for e in eids])
+    return jsonify({"as_of": as_of, "model_version": model.version, "base_value": base,
+                    "results": [{"employee_id": e, "top_factors": top_factors(feats[e], v, model.feat_order, k)} for e, v in zip(eids, values)]})
+def ranked(summary: dict) -> list[dict]:
+    return sorted([{"feature": f, "mean_abs_shap": v, "mean_shap": summary["mean_shap"][f]} for f, v in summary["mean_abs_shap"].items()],
+                  key=lambda t: t["mean_abs_shap"], reverse=True)
+@bp.route('/global', methods=['GET'])
+def global_():
+    model = ModelService.current()
+    g = model.global_explanation()
+    if g is None:
+        return jsonify({"error": "no global explanation artifacts; retrain with ml/train_big.py"}), 404
+    summary = g["summary"]
+    out = {"model_version": model.version, "base_value": summary["base_value"]}
+    if 'employee_id' in request.args:
+        eid = int(request.args['employee_id'])
+        if eid not in g["row"]: return jsonify({"error": f"employee {eid} not in training snapshot"}), 404
+        row = g["values"][g["row"][eid]]
+        return jsonify({**out, "employee_id": eid, "shap": dict(zip(summary["feature_order"], row.astype(float).tolist()))})
+    org = request.args.get('org_unit')
+    if org is not None:
+        if org not in summary["by_org_unit"]: return jsonify({"error": f"unknown org_unit {org}"}), 404
+        summary = summary["by_org_unit"][org]
+        out["org_unit"] = org
+    else:
+        out["org_units"] = sorted(summary["by_org_unit"])
+    return jsonify({**out, "n_employees": summary["n"], "features": ranked(summary)})
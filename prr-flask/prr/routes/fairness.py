@@ -1,5 +1,16 @@
-from flask import Blueprint, jsonify
+import time
+from flask import Blueprint, request, jsonify
+from config import Config
+from prr.services.fairness import FairnessService
+from prr.utils.dates import parse_as_of
 bp = Blueprint('fairness', __name__)
 @bp.route('/summary', methods=['GET'])
 def summary():
-    return jsonify({"promotion_rate_overall":0.31,"parity_gap":0.06,"status":"within_threshold"})
+    try:
+        as_of = parse_as_of(request.args.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result, error = FairnessService.summary(as_of)
+    if result is None:
+        return jsonify({"status": "computing", "as_of": as_of, "error": error}), 202
+    return jsonify({**result, "stale": time.time() - result["computed_at"] > Config.FAIRNESS_TTL})
@@ -1,5 +1,16 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
+from prr.utils.cache import readiness_cache, catalog_cache
+from prr.services.ingest import SCHEMAS, ingest_stream
 bp = Blueprint('ingest', __name__)
+STREAM_TYPES = {"application/x-ndjson", "application/jsonl", "application/json", "text/csv"}
 @bp.route('/health', methods=['GET'])
 def health():
-    return jsonify({'status':'ok'})
+    return jsonify({'status':'ok', 'cache': {'readiness': readiness_cache.stats(), 'catalog': catalog_cache.stats()}})
+@bp.route('/<table>', methods=['POST'])
+def ingest(table):
+    if table not in SCHEMAS:
+        return jsonify({"error": f"unknown table {table}", "tables": sorted(SCHEMAS)}), 404
+    if request.mimetype not in STREAM_TYPES:
+        return jsonify({"error": f"unsupported content type {request.mimetype!r}", "accepted": sorted(STREAM_TYPES)}), 415
+    report = ingest_stream(table, request.stream, request.mimetype, request.args.get('batch_size', type=int))
+    return jsonify(report), 500 if "error" in report else 200
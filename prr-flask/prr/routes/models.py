@@ -0,0 +1,20 @@
+from flask import Blueprint, request, jsonify
+from prr.utils.auth import require_admin
+from prr.services.model import ModelService
+from prr.services.registry import ModelRegistry
+bp = Blueprint("models", __name__)
+@bp.route('', methods=['GET'])
+def versions():
+    ModelService.load()
+    return jsonify({**ModelService.status(), "versions": ModelRegistry.versions()})
+@bp.route('/<version>/promote', methods=['POST'])
+@require_admin
+def promote(version):
+    if ModelRegistry.path(version) is None:
+        return jsonify({"error": f"unknown model version {version}"}), 404
+    wait = request.args.get('wait', '0') == '1'
+    ModelService.promote(version, wait=wait)
+    status = ModelService.status()
+    if wait and status["serving"] != version:
+        return jsonify({**status, "error": status["last_error"] or "another load is in progress"}), 500
+    return jsonify(status), 200 if status["serving"] == version else 202
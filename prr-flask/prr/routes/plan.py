@@ -1,26 +1,50 @@
 from flask import Blueprint, request, jsonify
-from sqlalchemy import text
-from prr.utils.db import db
-from prr.services.features import build_features
+from prr.utils.dates import parse_as_of
 from prr.services.model import ModelService
-from prr.services.recommender import infer_gaps, recommend_courses, mentor_suggestion
+from prr.services.readiness import features_for, score_for, employee_for
+from prr.services.recommender import infer_gaps, recommend_courses
+from prr.services.mentors import MentorService
 bp = Blueprint("plan", __name__)
 @bp.route('/recommend', methods=['POST'])
 def plan():
     data = request.get_json(force=True)
     eid = int(data['employee_id'])
-    as_of = data.get('as_of','2014-12-31')
-    feats = build_features(eid, as_of)
-    emp = db.session.execute(text("SELECT org_unit FROM employee WHERE id=:eid"), {"eid": eid}).mappings().first()
-    org = emp['org_unit'] if emp else ''
-    score = ModelService.score(feats)
-    gaps = infer_gaps(feats, org)
-    courses = recommend_courses(gaps)
+    try:
+        as_of = parse_as_of(data.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    model = ModelService.current()
+    gaps = _gaps(eid, as_of, model)
+    score = score_for(eid, as_of, model)
+    mentor = next(iter(MentorService.suggest(eid, gaps, k=1)), None)
+    return jsonify(plan_payload(eid, score, model.version, gaps, recommend_courses(gaps), mentor))
+@bp.route('/mentor', methods=['POST'])
+def mentor():
+    """Stores the mentee's mentor: `mentor_id` when given, otherwise the plan's suggestion."""
+    data = request.get_json(force=True)
+    eid = int(data['employee_id'])
+    mentor_id = int(data['mentor_id']) if data.get('mentor_id') is not None else None
+    try:
+        as_of = parse_as_of(data.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    gaps = _gaps(eid, as_of, ModelService.current())
+    try:
+        assigned = MentorService.assign(eid, gaps, mentor_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+    if assigned is None:
+        return jsonify({"error": f"no eligible mentor for employee {eid}"}), 404
+    return jsonify({"employee_id": eid, "mentor": assigned})
+def _gaps(eid, as_of, model) -> list[str]:
+    emp = employee_for(eid, as_of, model)
+    return infer_gaps(features_for(eid, as_of, model), emp['org_unit'] if emp else '')
+def plan_payload(eid, score, version, gaps, courses, mentor) -> dict:
     plan = {
         "milestones": [{"day":30,"goal":"Lead a cross-functional meeting"},
                        {"day":60,"goal":"Run a postmortem & publish actions"},
                        {"day":90,"goal":"Deliver an approved design/plan"}],
-        "items": [{"type":"course", **c} for c in courses] + [{"type":"mentor", **mentor_suggestion(org)}],
+        "items": [{"type":"course", **c} for c in courses] + ([{"type":"mentor", **mentor}] if mentor else []),
         "expected_readiness_gain": 0.08
     }
-    return jsonify({"employee_id": eid,"readiness_score": round(score,3),"gaps": gaps, "plan": plan})
+    return {"employee_id": eid,"readiness_score": round(score,3), "model_version": version,"gaps": gaps, "plan": plan}
@@ -1,21 +1,88 @@
 from flask import Blueprint, request, jsonify, current_app
-from sqlalchemy import text
-from prr.utils.db import db
-from prr.services.features import build_features
+from sqlalchemy import text, bindparam
+from prr.utils.db import db, in_chunks
+from prr.utils.pagination import decode_cursor
+from prr.utils.dates import parse_as_of
+from prr.utils.metrics import timed
+from prr.services.features import build_features_batch
 from prr.services.model import ModelService
+from prr.services.readiness import score_for, employee_for
+from prr.services.leaderboard import LeaderboardService, maintained
 bp = Blueprint("promotion", __name__)
 def decide(score, promote_thresh, borderline_low):
     if score >= promote_thresh: return "PROMOTE"
     if score >= borderline_low: return "BORDERLINE"
     return "HOLD"
+def _payload(eid, name, as_of, p, version):
+    decision = decide(p, current_app.config['PROMOTE_THRESH'], current_app.config['BORDERLINE_LOW'])
+    confidence = round(0.8 + min(0.16, abs(p-0.5)), 2)
+    return {"employee_id": eid, "employee": name, "as_of": as_of, "readiness_score": round(p,3), "decision": decision, "confidence": confidence, "model_version": version}
+@timed("employee")
+def _employee_names(ids=None, org_unit=None) -> dict:
+    if org_unit is not None:
+        rows = db.session.execute(text("SELECT id, name FROM employee WHERE org_unit=:org ORDER BY id"), {"org": org_unit}).all()
+        return {r[0]: r[1] for r in rows}
+    stmt = text("SELECT id, name FROM employee WHERE id IN :eids").bindparams(bindparam("eids", expanding=True))
+    names = {}
+    for chunk in in_chunks(ids):
+        names.update({r[0]: r[1] for r in db.session.execute(stmt, {"eids": chunk}).all()})
+    return {eid: names.get(eid) for eid in ids}
 @bp.route('/score', methods=['POST'])
 def score():
     data = request.get_json(force=True)
     eid = int(data['employee_id'])
-    as_of = data.get('as_of','2014-12-31')
-    feats = build_features(eid, as_of)
-    p = ModelService.score(feats)
-    emp = db.session.execute(text("SELECT name FROM employee WHERE id=:eid"), {"eid":eid}).mappings().first()
-    decision = decide(p, current_app.config['PROMOTE_THRESH'], current_app.config['BORDERLINE_LOW'])
-    confidence = round(0.8 + min(0.16, abs(p-0.5)), 2)
-    return jsonify({"employee_id": eid, "employee": emp["name"] if emp else None, "as_of": as_of, "readiness_score": round(p,3), "decision": decision, "confidence": confidence})
+    try:
+        as_of = parse_as_of(data.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    model = ModelService.current()
+    p = score_for(eid, as_of, model)
+    emp = employee_for(eid, as_of, model)
+    return jsonify(_payload(eid, emp["name"] if emp else None, as_of, p, model.version))
+@bp.route('/score:batch', methods=['POST'])
+def score_batch():
+    data = request.get_json(force=True)
+    try:
+        as_of = parse_as_of(data.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data.get('employee_ids') is not None:
+        names = _employee_names(ids=list(dict.fromkeys(int(e) for e in data['employee_ids'])))
+    elif data.get('org_unit') is not None:
+        names = _employee_names(org_unit=data['org_unit'])
+    else:
+        return jsonify({"error": "employee_ids or org_unit is required"}), 400
+    eids = list(names)
+    feats = build_features_batch(eids, as_of)
+    model = ModelService.current()
+    probs = model.score_batch([feats[e] for e in eids])
+    results = [_payload(e, names[e], as_of, float(p), model.version) for e, p in zip(eids, probs)]
+    return jsonify({"as_of": as_of, "model_version": model.version, "count": len(results), "results": results})
+@bp.route('/leaderboard', methods=['GET'])
+def leaderboard():
+    """Top candidates from the materialized promotion_scores table; never scores on the request path."""
+    try:
+        as_of = parse_as_of(request.args.get('as_of'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if as_of not in maintained():
+        return jsonify({"error": f"no leaderboard for as_of {as_of}", "maintained": maintained()}), 404
+    decision = request.args.get('decision')
+    if decision is not None and decision not in ("PROMOTE", "BORDERLINE", "HOLD"):
+        return jsonify({"error": "decision must be PROMOTE, BORDERLINE or HOLD"}), 400
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+    try:
+        cursor = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    rows, next_cursor = LeaderboardService.listing(as_of, request.args.get('org_unit'), decision, limit, cursor)
+    if not rows and cursor is None and not LeaderboardService.has_rows(as_of):
+        LeaderboardService.mark(as_of=as_of)
+        return jsonify({"status": "computing", "as_of": as_of, **LeaderboardService.status(as_of)}), 202
+    serving = ModelService.current().version
+    stale = any(r["model_version"] != serving for r in rows)
+    if stale: LeaderboardService.mark(as_of=as_of)
+    results = [{**_payload(r["employee_id"], r["name"], as_of, r["readiness_score"], r["model_version"]), "org_unit": r["org_unit"]}
+               for r in rows]
+    return jsonify({"as_of": as_of, "count": len(results), "results": results, "next_cursor": next_cursor, "stale": stale,
+                    "refreshed_at": max((r["scored_at"] for r in rows), default=None), **LeaderboardService.status(as_of)})
@@ -0,0 +1,132 @@
+"""Async counterparts of the readiness reads, for the ASGI entry point (asgi.py).
+
+Queries that do not depend on each other run concurrently, each on its own pooled connection, and model
+inference runs on a bounded thread pool so the event loop keeps multiplexing other requests. The statements and
+the merging of their rows come from the sync modules (feature_queries, cache_entry, recommender's index helpers);
+only their execution differs here. Results go into the same caches, so either entry point serves what the other
+computed.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import text, event
+from sqlalchemy.engine import make_url
+from config import Config
+from prr.utils import metrics
+from prr.utils.db import engine_options, sqlite_pragmas, apply_pragmas
+from prr.services.features import feature_queries
+from prr.services.feature_store import FeatureStore
+from prr.services.model import ModelService
+from prr.services.readiness import cache_entry, EMPLOYEE_SQL
+from prr.services import recommender
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+def async_url(uri: str) -> str:
+    """DATABASE_URL with its driver swapped for an asyncio one (ASYNC_DATABASE_URL overrides)."""
+    if Config.ASYNC_DATABASE_URL: return Config.ASYNC_DATABASE_URL
+    url = make_url(uri)
+    if url.get_backend_name() not in ASYNC_DRIVERS: raise ValueError(f"no async driver for {url.get_backend_name()}")
+    return url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]).render_as_string(hide_password=False)
+
+class AsyncDB:
+    _engine = None
+    _executor = None
+
+    @classmethod
+    def engine(cls):
+        if cls._engine is None:
+            from sqlalchemy.ext.asyncio import create_async_engine
+            from sqlalchemy.pool import AsyncAdaptedQueuePool
+            url = async_url(Config.SQLALCHEMY_DATABASE_URI)
+            if make_url(url).get_backend_name() == "sqlite":
+                # aiosqlite defaults to NullPool (a fresh connection and thread per checkout); keep a pool instead.
+                # Only SELECTs run here and pysqlite opens no transaction for them, so skip the rollback on checkin
+                opts = {"poolclass": AsyncAdaptedQueuePool, "pool_size": Config.DB_POOL_SIZE, "pool_reset_on_return": None,
+                        "max_overflow": Config.DB_MAX_OVERFLOW, "pool_timeout": Config.DB_POOL_TIMEOUT}
+                engine = create_async_engine(url, **opts)
+                pragmas = sqlite_pragmas(memory=make_url(url).database in (None, "", ":memory:"))
+                event.listen(engine.sync_engine, "connect", lambda conn, record: apply_pragmas(conn, pragmas))
+            else:
+                engine = create_async_engine(url, **engine_options(url))
+            if metrics.ENABLED: metrics.instrument_engine(engine.sync_engine)
+            cls._engine = engine
+        return cls._engine
+
+    @classmethod
+    def executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(Config.ASYNC_INFERENCE_THREADS, thread_name_prefix="inference")
+        return cls._executor
+
+    @classmethod
+    async def dispose(cls):
+        if cls._engine is not None: await cls._engine.dispose()
+        if cls._executor is not None: cls._executor.shutdown(wait=False)
+        cls._engine = cls._executor = None
+
+async def offload(fn, *args):
+    """Runs blocking work (model load/inference, index builds) on the inference pool."""
+    return await asyncio.get_running_loop().run_in_executor(AsyncDB.executor(), fn, *args)
+
+async def current_model():
+    """ModelService.current(); only the first (loading) call leaves the event loop."""
+    return ModelService.current() if ModelService.ready() else await offload(ModelService.current)
+
+async def rows(sql, params: dict | None = None) -> list:
+    async with AsyncDB.engine().connect() as conn:
+        return (await conn.execute(sql if not isinstance(sql, str) else text(sql), params or {})).mappings().all()
+
+async def run(queries: list) -> list:
+    """feature_store.run() with every (statement, params) pair issued concurrently."""
+    return await asyncio.gather(*(rows(stmt, params) for stmt, params in queries))
+
+async def store_ready() -> bool:
+    """FeatureStore.ready() with the probe read on the async engine; shares its cached answer."""
+    known = FeatureStore.known_ready()
+    if known is not None: return known
+    try:
+        found = bool(await rows(FeatureStore.READY_SQL))
+    except Exception:   # no feature_monthly table yet
+        found = False
+    return FeatureStore.mark_ready(found)
+
+async def features_batch(employee_ids: list[int], as_of: str) -> dict[int, dict]:
+    """build_features_batch over the async engine."""
+    if not employee_ids: return {}
+    # no metrics.stage here: its stack is per thread, and coroutines interleave on the event loop's thread
+    _, queries, merge = feature_queries(employee_ids, as_of, Config.FEATURE_STORE and await store_ready())
+    return merge(await run(queries))
+
+async def features_for(eid: int, as_of: str, model) -> dict:
+    entry = cache_entry(eid, as_of, model)
+    if "features" not in entry: entry["features"] = (await features_batch([eid], as_of))[eid]
+    return entry["features"]
+
+async def employee_for(eid: int, as_of: str, model) -> dict | None:
+    entry = cache_entry(eid, as_of, model)
+    if "employee" not in entry:
+        found = await rows(EMPLOYEE_SQL, {"eid": eid})
+        entry["employee"] = dict(found[0]) if found else None
+    return entry["employee"]
+
+async def score_for(eid: int, as_of: str, model) -> float:
+    entry = cache_entry(eid, as_of, model)
+    if "score" not in entry:
+        feats = await features_for(eid, as_of, model)
+        # a native single-row score takes microseconds, less than the hand-off to the pool would
+        entry["score"] = model.score(feats) if model.native else await offload(model.score, feats)
+    return entry["score"]
+
+async def explanation_for(eid: int, as_of: str, model) -> tuple[list[float], float]:
+    entry = cache_entry(eid, as_of, model)
+    if "shap" not in entry:
+        values, base = await offload(model.explain_batch, [await features_for(eid, as_of, model)])
+        entry["shap"] = (values[0].tolist(), base)
+    return entry["shap"]
+
+async def skill_index() -> "recommender.SkillIndex":
+    """recommender.skill_index(): the catalog read is async; hashing and any rebuild run on the pool."""
+    idx = recommender.cached_index()
+    if idx is not None: return idx
+    catalog = [dict(r) for r in await rows(recommender.CATALOG_SQL)]
+    return await offload(recommender.index_from, catalog)
@@ -0,0 +1,59 @@
+import numpy as np
+
+class FoldEnsemble:
+    """The cross-validation fold models (each cut at its early-stopped iteration) averaged, then one isotonic
+    calibrator fit on the out-of-fold predictions. Scores a batch with one predict per fold model."""
+    classes_ = np.array([0, 1])
+
+    def __init__(self, models: list, calibrator=None, best_iterations: list[int] | None = None):
+        self.models = list(models)            # lightgbm.Booster objects
+        self.calibrator = calibrator          # sklearn IsotonicRegression(out_of_bounds="clip") or None
+        self.best_iterations = list(best_iterations or [m.current_iteration() for m in self.models])
+
+    @classmethod
+    def from_folds(cls, estimators: list, best_iterations: list[int], oof_prob: np.ndarray, y: np.ndarray):
+        """Trims fitted LGBMClassifiers to their best iteration and calibrates on the OOF probabilities."""
+        from lightgbm import Booster
+        from sklearn.isotonic import IsotonicRegression
+        boosters = []
+        for est, it in zip(estimators, best_iterations):
+            b = Booster(model_str=est.booster_.model_to_string(num_iteration=it))
+            b.params = dict(est.booster_.params)   # a Booster rebuilt from text has none; SHAP reads the objective
+            boosters.append(b)
+        calibrator = IsotonicRegression(out_of_bounds="clip", y_min=0.0, y_max=1.0).fit(oof_prob, y)
+        return cls(boosters, calibrator, best_iterations)
+
+    def raw(self, X) -> np.ndarray:
+        """Uncalibrated probability: the mean of the fold models' predictions."""
+        X = np.asarray(X, dtype=float)
+        return np.mean([m.predict(X) for m in self.models], axis=0)
+
+    def predict_proba(self, X) -> np.ndarray:
+        p = self.raw(X)
+        if self.calibrator is not None: p = self.calibrator.predict(p)
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.predict_proba(X)[:, 1] >= 0.5).astype(int)
+
+def base_estimators(model) -> list:
+    """The fitted models behind any calibration/ensemble wrapper (sklearn estimators or lightgbm Boosters)."""
+    if isinstance(model, FoldEnsemble): return model.models
+    if hasattr(model, "calibrated_classifiers_"): return [c.estimator for c in model.calibrated_classifiers_]
+    return [model]
+
+def booster(est):
+    """The lightgbm Booster of an estimator, or None for non-tree models."""
+    b = getattr(est, "booster_", est)
+    return b if type(b).__name__ == "Booster" else None
+
+def shap_values(explainers: list, X) -> tuple[np.ndarray, float]:
+    """SHAP values (n x features, log-odds) averaged over one explainer per base estimator, plus the base value.
+    Shared by training (ml/train_big.py's stored matrix) and serving (LoadedModel.explain_batch)."""
+    values, base = [], []
+    for e in explainers:
+        v = e.shap_values(X)
+        v = v[-1] if isinstance(v, list) else v
+        values.append(v[..., -1] if np.ndim(v) == 3 else v)
+        base.append(float(np.ravel(e.expected_value)[-1]))
+    return np.mean(values, axis=0), float(np.mean(base))
@@ -1 +1,98 @@
-# placeholder for bias metrics
+from __future__ import annotations   # pandas is only imported when a summary is computed
+import os, threading, time
+import numpy as np
+from sqlalchemy import text
+from config import Config
+from prr.utils.db import db
+from prr.utils.background import run_in_background
+from prr.utils.cache import TTLCache
+from prr.services.features import build_features_batch
+from prr.services.model import ModelService
+
+ATTRIBUTES = ["org_unit", "location", "employment_type", "current_rank"]
+# groups smaller than this are reported but left out of the gap calculations
+MIN_GROUP_SIZE = 10
+# summaries kept per process, LRU beyond that; a stale one (older than FAIRNESS_TTL) is still served while it refreshes
+CACHE_SIZE = 32
+
+def _labels() -> pd.DataFrame:
+    import pandas as pd
+    if not os.path.exists(Config.LABELS_PATH): return pd.DataFrame(columns=["employee_id", "label"])
+    return pd.read_csv(Config.LABELS_PATH, usecols=["employee_id", "label"])
+
+def population(as_of: str, model=None) -> pd.DataFrame:
+    """Every employee with group attributes, a batch-computed score and (where known) the label."""
+    import pandas as pd
+    emp = pd.DataFrame(db.session.execute(text(f"SELECT id AS employee_id, {', '.join(ATTRIBUTES)} FROM employee")).mappings().all(),
+                       columns=["employee_id", *ATTRIBUTES])
+    feats = build_features_batch(emp["employee_id"].tolist(), as_of)
+    emp["score"] = (model or ModelService.current()).score_batch([feats[e] for e in emp["employee_id"]])
+    return emp.merge(_labels(), on="employee_id", how="left")
+
+def _gap(rates: pd.Series) -> float | None:
+    rates = rates.dropna()
+    return float(rates.max() - rates.min()) if len(rates) > 1 else None
+
+def metrics(df: pd.DataFrame, promote_thresh: float) -> dict:
+    """Promotion rate, demographic-parity gap, equal-opportunity gap and calibration per group."""
+    df = df.assign(promoted=(df["score"] >= promote_thresh).astype(float))
+    labelled = df[df["label"].notna()]
+    out = {"promotion_rate_overall": round(float(df["promoted"].mean()), 4) if len(df) else None, "by_attribute": {}}
+    for attr in ATTRIBUTES:
+        g = df.groupby(attr, dropna=False).agg(n=("promoted", "size"), promotion_rate=("promoted", "mean"), mean_score=("score", "mean"))
+        lab = labelled.groupby(attr, dropna=False).agg(label_rate=("label", "mean"))
+        tpr = labelled[labelled["label"] == 1].groupby(attr, dropna=False)["promoted"].mean().rename("tpr")
+        g = g.join(lab).join(tpr)
+        g["calibration_gap"] = g["mean_score"] - g["label_rate"]
+        big = g[g["n"] >= MIN_GROUP_SIZE]
+        groups = g.reset_index().rename(columns={attr: "group"}).round(4).replace({np.nan: None})
+        out["by_attribute"][attr] = {"parity_gap": _gap(big["promotion_rate"]), "equal_opportunity_gap": _gap(big["tpr"]),
+                                     "groups": groups.to_dict(orient="records")}
+    gaps = [v["parity_gap"] for v in out["by_attribute"].values() if v["parity_gap"] is not None]
+    eo = [v["equal_opportunity_gap"] for v in out["by_attribute"].values() if v["equal_opportunity_gap"] is not None]
+    out["parity_gap"] = round(max(gaps), 4) if gaps else 0.0
+    out["equal_opportunity_gap"] = round(max(eo), 4) if eo else 0.0
+    out["status"] = "within_threshold" if out["parity_gap"] <= Config.FAIRNESS_GAP_THRESH else "review_required"
+    return out
+
+class FairnessService:
+    """Caches one summary per (model_version, as_of) and recomputes it off the request path, at most one
+    full-population rescore per model version at a time."""
+    _results = TTLCache(CACHE_SIZE, 4 * Config.FAIRNESS_TTL)
+    _errors = TTLCache(CACHE_SIZE, Config.FAIRNESS_TTL)
+    _pending = set()        # model versions with a rescore in flight
+    _lock = threading.Lock()
+
+    @classmethod
+    def compute(cls, as_of: str, model=None) -> dict:
+        model = model or ModelService.current()
+        key = (model.version, as_of)
+        try:
+            summary = {**metrics(population(as_of, model), Config.PROMOTE_THRESH),
+                       "model_version": key[0], "as_of": as_of, "computed_at": time.time()}
+            cls._results.set(key, summary)
+            cls._errors.invalidate(lambda k: k == key)
+            return summary
+        except Exception as e:
+            cls._errors.set(key, str(e))
+            raise
+        finally:
+            with cls._lock: cls._pending.discard(model.version)
+
+    @classmethod
+    def refresh_async(cls, as_of: str) -> bool:
+        model = ModelService.current()
+        with cls._lock:
+            if model.version in cls._pending: return False
+            cls._pending.add(model.version)
+        run_in_background(cls.compute, as_of, model, name=f"fairness-{as_of}")
+        return True
+
+    @classmethod
+    def summary(cls, as_of: str) -> tuple[dict | None, str | None]:
+        """Cached summary (possibly stale, refreshed in the background) and the last refresh error."""
+        key = (ModelService.version(), as_of)
+        hit = cls._results.get(key)
+        if hit is None or time.time() - hit["computed_at"] > Config.FAIRNESS_TTL:
+            cls.refresh_async(as_of)
+        return hit, cls._errors.get(key)
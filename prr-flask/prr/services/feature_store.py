@@ -0,0 +1,226 @@
+import calendar, datetime as dt, time
+from collections import defaultdict
+from collections.abc import Callable
+from sqlalchemy import text, bindparam, inspect
+from prr.utils.db import db, in_chunks
+from prr.utils.cache import readiness_cache, invalidate_employees
+from prr.models.feature_store import FeatureMonthly
+from prr.utils.metrics import timed, add_rows
+
+COLUMNS = ["on_time_n", "on_time_sum", "quality_n", "quality_sum", "velocity_sum", "impact_sum",
+           "rating_n", "rating_sum", "recognitions", "incident_weight", "completions"]
+SEVERITY_WEIGHT = {"Low": 1, "Medium": 2, "High": 4}
+_SEVERITY_SQL = "CASE severity WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 WHEN 'High' THEN 4 END"
+# source table -> (event date column, {store column: SQL aggregate})
+SOURCES = {
+    "project_activity": ("date", {"on_time_n": "COUNT(on_time)", "on_time_sum": "SUM(CASE WHEN on_time THEN 1 ELSE 0 END)",
+                                  "quality_n": "COUNT(quality_score)", "quality_sum": "SUM(quality_score)",
+                                  "velocity_sum": "SUM(velocity)", "impact_sum": "SUM(customer_impact)"}),
+    "feedback360": ("date", {"rating_n": "COUNT(rating)", "rating_sum": "SUM(rating)"}),
+    "recognition": ("date", {"recognitions": "COUNT(*)"}),
+    "incidents": ("date", {"incident_weight": f"SUM({_SEVERITY_SQL})"}),
+    "learning_history": ("end_dt", {"completions": "SUM(CASE WHEN completion THEN 1 ELSE 0 END)"}),
+}
+# Python mirror of the SQL aggregates, used to fold freshly written rows into the store
+ROW_DELTAS = {
+    "project_activity": lambda r: {"on_time_n": int(r.get("on_time") is not None), "on_time_sum": int(bool(r.get("on_time"))),
+                                   "quality_n": int(r.get("quality_score") is not None), "quality_sum": r.get("quality_score") or 0,
+                                   "velocity_sum": r.get("velocity") or 0, "impact_sum": r.get("customer_impact") or 0},
+    "feedback360": lambda r: {"rating_n": int(r.get("rating") is not None), "rating_sum": r.get("rating") or 0},
+    "recognition": lambda r: {"recognitions": 1},
+    "incidents": lambda r: {"incident_weight": SEVERITY_WEIGHT.get(r.get("severity"), 0)},
+    "learning_history": lambda r: {"completions": int(bool(r.get("completion")))},
+}
+
+def source_sql(table: str, by_month=False, since=False, until=True) -> str:
+    """Per-employee (optionally per-month) aggregate of one source table over a date window."""
+    date_col, aggs = SOURCES[table]
+    where = ["employee_id IN :eids"]
+    if since: where.append(f"{date_col} >= :since")
+    if until: where.append(f"{date_col} <= :until")
+    month = f", substr({date_col}, 1, 7) AS month" if by_month else ""
+    cols = ", ".join(f"{expr} AS {col}" for col, expr in aggs.items())
+    return (f"SELECT employee_id{month}, {cols} FROM {table} WHERE {' AND '.join(where)} "
+            f"GROUP BY employee_id{', month' if by_month else ''}")
+
+def lookup_sql(before_month=False) -> str:
+    """Latest running totals at or (when `before_month`) strictly before :month, per employee."""
+    cols = ", ".join(f"f.{c}" for c in COLUMNS)
+    return f"""SELECT f.employee_id, {cols} FROM feature_monthly f
+               JOIN (SELECT employee_id, MAX(month) AS month FROM feature_monthly
+                     WHERE employee_id IN :eids AND month {'<' if before_month else '<='} :month
+                     GROUP BY employee_id) l
+               ON f.employee_id = l.employee_id AND f.month = l.month"""
+
+def _is_month_end(day: str) -> bool:
+    d = dt.date.fromisoformat(day[:10])
+    return d.day == calendar.monthrange(d.year, d.month)[1]
+
+# Reads are split into the statements to run and a `merge` taking their rows (in statement order), so the sync path
+# (run() below) and prr.services.aio, which issues the same statements concurrently, share everything but execution.
+def aggregate_queries(employee_ids: list[int], until: str, since: str | None = None) -> tuple[list, Callable]:
+    """Per-table, per-chunk aggregates for events in [since, until]; merge gives {employee_id: totals}."""
+    params, tables, queries = {"until": until, "since": since}, [], []
+    for table in SOURCES:
+        stmt = text(source_sql(table, since=since is not None)).bindparams(bindparam("eids", expanding=True))
+        for chunk in in_chunks(employee_ids):
+            tables.append(table)
+            queries.append((stmt, {**params, "eids": chunk}))
+    def merge(results: list) -> dict[int, dict]:
+        out = defaultdict(lambda: dict.fromkeys(COLUMNS, 0))
+        for table, rows in zip(tables, results):
+            for r in rows:
+                acc = out[r["employee_id"]]
+                for col in SOURCES[table][1]: acc[col] += r[col] or 0
+        return dict(out)
+    return queries, merge
+
+def lookup_queries(employee_ids: list[int], as_of: str) -> tuple[list, Callable]:
+    """Store reads for events up to and including `as_of`; merge gives {employee_id: totals}.
+
+    Month-end dates are answered from the store alone; other dates read the last complete
+    month from the store and aggregate only the partial month on top.
+    """
+    month, partial = as_of[:7], not _is_month_end(as_of)
+    stmt = text(lookup_sql(partial)).bindparams(bindparam("eids", expanding=True))
+    queries = [(stmt, {"eids": chunk, "month": month}) for chunk in in_chunks(employee_ids)]
+    tail, merge_tail = aggregate_queries(employee_ids, until=as_of, since=f"{month}-01") if partial else ([], None)
+    n = len(queries)
+    def merge(results: list) -> dict[int, dict]:
+        out = {r["employee_id"]: {c: r[c] for c in COLUMNS} for rows in results[:n] for r in rows}
+        if partial:
+            for eid, t in merge_tail(results[n:]).items():
+                acc = out.setdefault(eid, dict.fromkeys(COLUMNS, 0))
+                for c in COLUMNS: acc[c] += t[c]
+        return out
+    return queries + tail, merge
+
+def run(queries: list) -> list:
+    """Executes (statement, params) pairs on the session, in order; the rows of each."""
+    out = []
+    for stmt, params in queries:
+        out.append(db.session.execute(stmt, params).mappings().all())
+        add_rows(len(out[-1]))
+    return out
+
+class FeatureStore:
+    """Monthly prefix sums of every feature input, so an `as_of` lookup is one indexed read."""
+    _ready = False
+    _checked = 0.0
+    RECHECK_S = 30
+
+    READY_SQL = "SELECT 1 FROM feature_monthly LIMIT 1"
+
+    @classmethod
+    def known_ready(cls) -> bool | None:
+        """The cached answer of ready(), or None when it is due to be (re)checked with READY_SQL."""
+        if cls._ready: return True
+        if cls._checked and time.monotonic() - cls._checked < cls.RECHECK_S: return False
+        return None
+
+    @classmethod
+    def mark_ready(cls, found: bool) -> bool:
+        cls._ready, cls._checked = found, time.monotonic()
+        return found
+
+    @classmethod
+    def ready(cls) -> bool:
+        known = cls.known_ready()
+        if known is not None: return known
+        exists = inspect(db.engine).has_table(FeatureMonthly.__tablename__)
+        return cls.mark_ready(exists and db.session.execute(text(cls.READY_SQL)).first() is not None)
+
+    @classmethod
+    @timed("features.aggregate")
+    def aggregate(cls, employee_ids: list[int], until: str, since: str | None = None) -> dict[int, dict]:
+        """Totals straight from the source tables for events in [since, until]."""
+        queries, merge = aggregate_queries(employee_ids, until, since)
+        return merge(run(queries))
+
+    @classmethod
+    @timed("features.store")
+    def lookup(cls, employee_ids: list[int], as_of: str) -> dict[int, dict]:
+        """Totals for events up to and including `as_of` (see lookup_queries)."""
+        queries, merge = lookup_queries(employee_ids, as_of)
+        return merge(run(queries))
+
+    @classmethod
+    def rebuild(cls, employee_ids: list[int] | None = None) -> int:
+        """Backfills running totals from the source tables, for everyone or just `employee_ids`."""
+        FeatureMonthly.__table__.create(db.engine, checkfirst=True)
+        existing = [t for t in SOURCES if inspect(db.engine).has_table(t)]
+        selects = []
+        for table in existing:
+            date_col, aggs = SOURCES[table]
+            cols = ", ".join(f"COALESCE({aggs[c]}, 0) AS {c}" if c in aggs else f"0 AS {c}" for c in COLUMNS)
+            scope = " AND employee_id IN :eids" if employee_ids is not None else ""
+            selects.append(f"SELECT employee_id, substr({date_col}, 1, 7) AS month, {cols} FROM {table} "
+                           f"WHERE {date_col} IS NOT NULL{scope} GROUP BY employee_id, month")
+        running = ", ".join(f"SUM(SUM({c})) OVER w" for c in COLUMNS)
+        insert = (f"INSERT INTO feature_monthly (employee_id, month, {', '.join(COLUMNS)}) "
+                  f"SELECT employee_id, month, {running} FROM ({' UNION ALL '.join(selects)}) d "
+                  f"GROUP BY employee_id, month WINDOW w AS (PARTITION BY employee_id ORDER BY month)")
+        written = 0
+        if employee_ids is None:
+            db.session.execute(text("DELETE FROM feature_monthly"))
+            if selects: written = db.session.execute(text(insert)).rowcount
+        else:
+            delete = text("DELETE FROM feature_monthly WHERE employee_id IN :eids").bindparams(bindparam("eids", expanding=True))
+            for chunk in in_chunks(sorted(set(employee_ids))):
+                db.session.execute(delete, {"eids": chunk})
+                if selects: written += db.session.execute(text(insert).bindparams(bindparam("eids", expanding=True)), {"eids": chunk}).rowcount
+        db.session.commit()
+        cls._ready, cls._checked = False, 0.0
+        if employee_ids is None: readiness_cache.clear()
+        else: invalidate_employees(employee_ids)
+        return written
+
+    @classmethod
+    def record(cls, table: str, rows: list[dict], sign: int = 1):
+        """Folds rows just written to (sign=1) or removed from (sign=-1) `table` into the store.
+
+        Runs in the caller's transaction; the caller commits.
+        """
+        date_col = SOURCES[table][0]
+        deltas = defaultdict(lambda: dict.fromkeys(COLUMNS, 0))
+        for r in rows:
+            if r.get("employee_id") is None or not r.get(date_col): continue
+            acc = deltas[(int(r["employee_id"]), str(r[date_col])[:7])]
+            for col, v in ROW_DELTAS[table](r).items(): acc[col] += sign * v
+        cls.apply(deltas)
+
+    @classmethod
+    def apply(cls, deltas: dict):
+        """Adds {(employee_id, month): {column: delta}} to that month and every later one.
+
+        Set-based: two chunked reads find which months are missing, the missing ones are opened in one executemany,
+        and the range updates go out as one more; the statement count does not grow with the number of pairs.
+        """
+        if not deltas: return
+        cols = ", ".join(COLUMNS)
+        eids, months = sorted({eid for eid, _ in deltas}), sorted({m for _, m in deltas})
+        present = text("SELECT employee_id, month FROM feature_monthly WHERE employee_id IN :eids AND month IN :months"
+                       ).bindparams(bindparam("eids", expanding=True), bindparam("months", expanding=True))
+        first = text("SELECT employee_id, MIN(month) FROM feature_monthly WHERE employee_id IN :eids GROUP BY employee_id"
+                     ).bindparams(bindparam("eids", expanding=True))
+        stored, earliest = set(), {}
+        for chunk in in_chunks(eids):
+            stored.update((r[0], r[1]) for r in db.session.execute(present, {"eids": chunk, "months": months}))
+            earliest.update((r[0], r[1]) for r in db.session.execute(first, {"eids": chunk}))
+        carry, fresh = [], []
+        for eid, month in sorted(deltas):
+            if (eid, month) in stored: continue
+            (carry if eid in earliest and earliest[eid] < month else fresh).append({"eid": eid, "month": month})
+        if carry:
+            # open the month by carrying the previous running totals forward; every carry reads pre-update totals,
+            # so the order among them does not matter (the casts let Postgres type the select-list parameters)
+            db.session.execute(text(f"""INSERT INTO feature_monthly (employee_id, month, {cols})
+                SELECT CAST(:eid AS INTEGER), CAST(:month AS VARCHAR(7)), {cols} FROM feature_monthly
+                WHERE employee_id=:eid AND month<:month ORDER BY month DESC LIMIT 1"""), carry)
+        if fresh:
+            db.session.execute(text(f"INSERT INTO feature_monthly (employee_id, month, {cols}) "
+                                    f"VALUES (:eid, :month, {', '.join('0' for _ in COLUMNS)})"), fresh)
+        sets = ", ".join(f"{c} = {c} + :{c}" for c in COLUMNS)
+        db.session.execute(text(f"UPDATE feature_monthly SET {sets} WHERE employee_id=:eid AND month>=:month"),
+                           [{"eid": eid, "month": month, **d} for (eid, month), d in sorted(deltas.items())])
+        invalidate_employees(eid for eid, _ in deltas)
@@ -1,21 +1,48 @@
-from sqlalchemy import text
-from prr.utils.db import db
-def build_features(employee_id: int, as_of: str) -> dict:
-    proj = db.session.execute(text("""SELECT AVG(on_time) on_time_ratio, AVG(quality_score) qmean,
-                                    SUM(velocity) vtot, SUM(customer_impact) itot
-                                    FROM project_activity WHERE employee_id=:eid"""), {"eid": employee_id}).mappings().first()
-    fb = db.session.execute(text("SELECT AVG(rating) fbmean FROM feedback360 WHERE employee_id=:eid"), {"eid": employee_id}).mappings().first()
-    rec = db.session.execute(text("SELECT COUNT(*) rcount FROM recognition WHERE employee_id=:eid"), {"eid": employee_id}).mappings().first()
-    inc = db.session.execute(text("SELECT SUM(CASE severity WHEN 'Low' THEN 1 WHEN 'Medium' THEN 2 WHEN 'High' THEN 4 END) iw FROM incidents WHERE employee_id=:eid"), {"eid": employee_id}).mappings().first()
-    lrn = db.session.execute(text("SELECT SUM(CASE WHEN completion THEN 1 ELSE 0 END) AS courses_completed FROM learning_history WHERE employee_id=:eid"), {"eid": employee_id}).mappings().first()
+from collections.abc import Callable
+from config import Config
+from prr.services.feature_store import FeatureStore, aggregate_queries, lookup_queries, run
+from prr.utils.metrics import timed, stage
+
+DEFAULTS = {"okr_attainment": 0.95, "on_time_ratio": 0.9, "quality_mean": 0.85, "velocity_total": 0,
+            "impact_total": 0, "feedback_mean": 4.1, "recognitions": 0, "incidents_weight": 0,
+            "courses_completed": 0}
+
+def _ratio(t: dict, total: str, count: str):
+    return t[total] / t[count] if t[count] else None
+
+def from_totals(t: dict | None) -> dict:
+    """Feature vector from the running totals kept by FeatureStore."""
+    if not t: return dict(DEFAULTS)
     return {
-        "okr_attainment": 0.95,
-        "on_time_ratio": (proj["on_time_ratio"] or 0.9) if proj else 0.9,
-        "quality_mean": (proj["qmean"] or 0.85) if proj else 0.85,
-        "velocity_total": (proj["vtot"] or 0) if proj else 0,
-        "impact_total": (proj["itot"] or 0) if proj else 0,
-        "feedback_mean": (fb["fbmean"] or 4.1) if fb else 4.1,
-        "recognitions": (rec["rcount"] or 0) if rec else 0,
-        "incidents_weight": (inc["iw"] or 0) if inc else 0,
-        "courses_completed": (lrn["courses_completed"] or 0) if lrn else 0
+        "okr_attainment": DEFAULTS["okr_attainment"],
+        "on_time_ratio": _ratio(t, "on_time_sum", "on_time_n") or DEFAULTS["on_time_ratio"],
+        "quality_mean": _ratio(t, "quality_sum", "quality_n") or DEFAULTS["quality_mean"],
+        "velocity_total": t["velocity_sum"] or 0,
+        "impact_total": t["impact_sum"] or 0,
+        "feedback_mean": _ratio(t, "rating_sum", "rating_n") or DEFAULTS["feedback_mean"],
+        "recognitions": t["recognitions"] or 0,
+        "incidents_weight": t["incident_weight"] or 0,
+        "courses_completed": t["completions"] or 0
     }
+
+def feature_queries(employee_ids: list[int], as_of: str, use_store: bool) -> tuple[str, list, Callable]:
+    """build_features_batch as (stage name, statements, merge); merge turns their rows into {employee_id: features}."""
+    eids = sorted(set(int(e) for e in employee_ids))
+    name, (queries, totals) = (("features.store", lookup_queries(eids, as_of)) if use_store
+                               else ("features.aggregate", aggregate_queries(eids, until=as_of)))
+    def merge(results: list) -> dict[int, dict]:
+        t = totals(results)
+        return {eid: from_totals(t.get(eid)) for eid in eids}
+    return name, queries, merge
+
+@timed("features")
+def build_features_batch(employee_ids: list[int], as_of: str) -> dict[int, dict]:
+    """Features for many employees, counting only events on or before `as_of`."""
+    if not employee_ids: return {}
+    name, queries, merge = feature_queries(employee_ids, as_of, Config.FEATURE_STORE and FeatureStore.ready())
+    with stage(name):
+        rows = run(queries)
+    return merge(rows)
+
+def build_features(employee_id: int, as_of: str) -> dict:
+    return build_features_batch([employee_id], as_of)[int(employee_id)]
@@ -0,0 +1,159 @@
+import csv, io, json
+from marshmallow import Schema, fields, validate, post_load, EXCLUDE, ValidationError
+from sqlalchemy import text, bindparam
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from prr.utils.db import db, import_models, in_chunks
+from prr.utils.cache import invalidate_employees
+from prr.services.feature_store import FeatureStore
+from prr.services.leaderboard import LeaderboardService
+from prr.services.mentors import MentorService
+
+class _EventSchema(Schema):
+    class Meta:
+        unknown = EXCLUDE
+    employee_id = fields.Int(required=True)
+    @post_load
+    def iso_dates(self, data, **kwargs):
+        # the tables store dates as ISO strings
+        return {k: v.isoformat() if hasattr(v, "isoformat") else v for k, v in data.items()}
+
+class ProjectActivitySchema(_EventSchema):
+    date = fields.Date(required=True)
+    project_id = fields.Str(required=True)
+    role = fields.Str(required=True)
+    hours = fields.Float(required=True, validate=validate.Range(min=0))
+    velocity = fields.Int(required=True, validate=validate.Range(min=0))
+    quality_score = fields.Float(required=True, validate=validate.Range(0, 1))
+    on_time = fields.Bool(required=True)
+    customer_impact = fields.Int(required=True, validate=validate.Range(min=0))
+
+class Feedback360Schema(_EventSchema):
+    rater_id = fields.Int(required=True)
+    date = fields.Date(required=True)
+    dimension = fields.Str(required=True)
+    rating = fields.Int(required=True, validate=validate.Range(1, 5))
+    relationship = fields.Str(required=True)
+    comment_redacted = fields.Str(load_default="")
+
+class IncidentSchema(_EventSchema):
+    date = fields.Date(required=True)
+    type = fields.Str(required=True)
+    severity = fields.Str(required=True, validate=validate.OneOf(["Low", "Medium", "High"]))
+
+class RecognitionSchema(_EventSchema):
+    date = fields.Date(required=True)
+    badge_type = fields.Str(required=True)
+    nominator_id = fields.Int(required=True)
+
+class LearningHistorySchema(_EventSchema):
+    course_id = fields.Str(required=True)
+    start_dt = fields.Date(required=True)
+    end_dt = fields.Date(required=True)
+    completion = fields.Bool(required=True)
+    assessment_score = fields.Int(load_default=None, allow_none=True)
+    hours = fields.Int(required=True, validate=validate.Range(min=0))
+
+SCHEMAS = {"project_activity": ProjectActivitySchema(), "feedback360": Feedback360Schema(), "incidents": IncidentSchema(),
+           "recognition": RecognitionSchema(), "learning_history": LearningHistorySchema()}
+MAX_REPORTED_ERRORS = 100
+
+def natural_key(table: str) -> tuple[str, ...] | None:
+    """Columns of the table's unique natural-key index, if the model declares one."""
+    for ix in import_models().tables[table].indexes:
+        if ix.unique: return tuple(c.name for c in ix.columns)
+    return None
+
+def _duplicates(table: str, key: tuple[str, ...], rows: list[dict]) -> set[int]:
+    """Positions in `rows` whose natural key repeats an earlier row or one already stored. Only the batch's own keys
+    are looked up, one IN list per key column so the unique index is searched rather than scanned; the cross-product
+    that can match is filtered back to the exact keys, so the cost follows the upload, not the stored history."""
+    wanted = {tuple(r[c] for c in key) for r in rows}
+    lookup = text(f"SELECT {', '.join(key)} FROM {table} WHERE " + " AND ".join(f"{c} IN :{c}" for c in key)
+                  ).bindparams(*(bindparam(c, expanding=True) for c in key))
+    stored = set()
+    for chunk in in_chunks(sorted(wanted, key=repr)):
+        params = {c: sorted({k[j] for k in chunk}, key=repr) for j, c in enumerate(key)}
+        stored.update(k for k in map(tuple, db.session.execute(lookup, params)) if k in wanted)
+    dups = set()
+    for i, r in enumerate(rows):
+        k = tuple(r[c] for c in key)
+        if k in stored: dups.add(i)
+        stored.add(k)
+    return dups
+
+def _records(stream, content_type: str):
+    """Yields (line_no, dict | error message) from an NDJSON or CSV byte stream, one line at a time."""
+    textio = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    if "csv" in content_type:
+        reader = csv.DictReader(textio)
+        for row in reader:
+            yield reader.line_num, {k: (v if v != "" else None) for k, v in row.items() if k is not None}
+        return
+    for n, line in enumerate(textio, 1):
+        if not line.strip(): continue
+        try:
+            rec = json.loads(line)
+        except ValueError as e:
+            yield n, f"invalid JSON: {e}"
+            continue
+        yield n, rec if isinstance(rec, dict) else "expected a JSON object"
+
+def _reject(report: dict, line: int, error):
+    report["rejected"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"line": line, "error": error})
+
+def _write_batch(table: str, insert, batch: list[tuple[int, dict]], report: dict):
+    """One bounded transaction: insert rows, fold them into the feature store, commit."""
+    key = natural_key(table)
+    for attempt in range(2):
+        dups = _duplicates(table, key, [r for _, r in batch]) if key else set()
+        rows = [r for i, (_, r) in enumerate(batch) if i not in dups]
+        if not rows: break
+        try:
+            db.session.execute(insert, rows)
+            if Config.FEATURE_STORE and FeatureStore.ready():
+                FeatureStore.record(table, rows)
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            # a concurrent ingest stored some of these keys after the check: look again, then retry the rest
+            if attempt or not key: raise
+        except Exception:
+            db.session.rollback()
+            raise
+    for i in sorted(dups):
+        _reject(report, batch[i][0], f"duplicate of an existing ({', '.join(key)})")
+    if not rows: return
+    invalidate_employees(r["employee_id"] for r in rows)
+    LeaderboardService.mark(r["employee_id"] for r in rows)
+    MentorService.record(table, rows)
+    report["inserted"] += len(rows)
+    report["batches"] += 1
+
+def ingest_stream(table: str, stream, content_type: str, batch_size: int | None = None) -> dict:
+    """Validates and inserts a streamed upload in batches; memory is bounded by the batch size."""
+    schema, size = SCHEMAS[table], batch_size or Config.INGEST_BATCH_SIZE
+    cols = list(schema.fields)
+    insert = text(f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join(':' + c for c in cols)})")
+    batch, report = [], {"table": table, "received": 0, "inserted": 0, "rejected": 0, "batches": 0, "errors": []}
+    try:
+        for line, rec in _records(stream, content_type):
+            report["received"] += 1
+            try:
+                if isinstance(rec, str): raise ValidationError(rec)
+                batch.append((line, schema.load(rec)))
+            except ValidationError as e:
+                _reject(report, line, e.messages)
+                continue
+            if len(batch) >= size:
+                _write_batch(table, insert, batch, report)
+                batch = []
+        if batch:
+            _write_batch(table, insert, batch, report)
+    except Exception as e:
+        # earlier batches stay committed; report how far the upload got
+        report["error"] = f"write failed after {report['inserted']} rows: {e}"
+    return report
@@ -0,0 +1,135 @@
+import threading, time
+from sqlalchemy import text, bindparam
+from config import Config
+from prr.utils.db import db, in_chunks
+from prr.utils.background import run_in_background
+from prr.utils.pagination import keyset_clause, cursor_params, page
+from prr.utils.metrics import timed, add_rows
+from prr.services.features import build_features_batch
+from prr.services.model import ModelService
+
+ALL = "all"              # pending marker: rescore everyone
+REFRESH_CHUNK = 2000     # employees featurized and scored per pass
+COLUMNS = ["employee_id", "as_of", "name", "org_unit", "readiness_score", "model_version", "scored_at"]
+
+def maintained() -> list[str]:
+    """as_of dates the promotion_scores table is kept current for."""
+    return [d.strip() for d in Config.LEADERBOARD_AS_OF.split(",") if d.strip()]
+
+def score_range(decision: str) -> tuple[float | None, float | None]:
+    """[low, high) readiness_score bounds of a decision under the current thresholds."""
+    return {"PROMOTE": (Config.PROMOTE_THRESH, None), "BORDERLINE": (Config.BORDERLINE_LOW, Config.PROMOTE_THRESH),
+            "HOLD": (None, Config.BORDERLINE_LOW)}[decision]
+
+class LeaderboardService:
+    """Materialized scores: a full rescore when the serving model changes, a rescore of just the touched
+    employees when their data changes. Refreshes run off the request path, one job per as_of at a time;
+    changes arriving meanwhile are merged and picked up when it finishes."""
+    _app = None
+    _pending = {}          # as_of -> set of employee ids, or ALL
+    _running = set()
+    _errors = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        if cls._app is None:
+            ModelService.on_swap(lambda model: cls.mark())
+        cls._app = app
+
+    @classmethod
+    @timed("leaderboard.refresh")
+    def refresh(cls, as_of: str, employee_ids: list[int] | None = None, model=None, force: bool = False) -> int:
+        """Rescores everyone (or just `employee_ids`) for `as_of` and rewrites their rows; returns rows written."""
+        model = model or ModelService.current()
+        if employee_ids is not None and not cls.has_rows(as_of):
+            employee_ids = None    # nothing materialized yet: a partial table would rank a handful of employees
+        if employee_ids is None and not force:
+            current = db.session.execute(text("SELECT DISTINCT model_version FROM promotion_scores WHERE as_of=:as_of"),
+                                         {"as_of": as_of}).scalars().all()
+            # another worker that followed the same promote may already have done it
+            if current == [model.version]: return 0
+        if employee_ids is None:
+            emp = db.session.execute(text("SELECT id, name, org_unit FROM employee ORDER BY id")).all()
+        else:
+            stmt = text("SELECT id, name, org_unit FROM employee WHERE id IN :eids").bindparams(bindparam("eids", expanding=True))
+            emp = [r for chunk in in_chunks(sorted(set(employee_ids))) for r in db.session.execute(stmt, {"eids": chunk}).all()]
+        now, rows = time.time(), []
+        for i in range(0, len(emp), REFRESH_CHUNK):
+            part = emp[i:i + REFRESH_CHUNK]
+            feats = build_features_batch([r[0] for r in part], as_of)
+            probs = model.score_batch([feats[r[0]] for r in part])
+            rows += [dict(zip(COLUMNS, (r[0], as_of, r[1], r[2], float(p), model.version, now))) for r, p in zip(part, probs)]
+        insert = text(f"INSERT INTO promotion_scores ({', '.join(COLUMNS)}) VALUES ({', '.join(':' + c for c in COLUMNS)})")
+        try:
+            if employee_ids is None:
+                db.session.execute(text("DELETE FROM promotion_scores WHERE as_of=:as_of"), {"as_of": as_of})
+            else:
+                delete = text("DELETE FROM promotion_scores WHERE as_of=:as_of AND employee_id IN :eids").bindparams(bindparam("eids", expanding=True))
+                for chunk in in_chunks(sorted(set(employee_ids))):
+                    db.session.execute(delete, {"as_of": as_of, "eids": chunk})
+            if rows: db.session.execute(insert, rows)
+            add_rows(len(rows))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
+
+    @classmethod
+    def mark(cls, employee_ids=None, as_of: str | None = None):
+        """Queues a background rescore of `employee_ids` (None: everyone) for one or all maintained dates.
+        A no-op until init_app, so scripts and tests without the app pay nothing."""
+        if cls._app is None: return
+        ids = None if employee_ids is None else {int(e) for e in employee_ids}
+        if ids is not None and not ids: return
+        for d in ([as_of] if as_of else maintained()):
+            with cls._lock:
+                cur = cls._pending.get(d, set())
+                cls._pending[d] = ALL if ids is None or cur == ALL else cur | ids
+                if d in cls._running: continue
+                cls._running.add(d)
+            run_in_background(cls._drain, d, name=f"leaderboard-{d}", app=cls._app)
+
+    @classmethod
+    def _drain(cls, as_of: str):
+        while True:
+            with cls._lock:
+                todo = cls._pending.pop(as_of, None)
+                if todo is None:
+                    cls._running.discard(as_of)
+                    return
+            try:
+                cls.refresh(as_of, None if todo == ALL else sorted(todo))
+                cls._errors.pop(as_of, None)
+            except Exception as e:
+                cls._errors[as_of] = str(e)
+
+    @classmethod
+    def listing(cls, as_of: str, org_unit: str | None = None, decision: str | None = None,
+                limit: int = 50, cursor: list | None = None) -> tuple[list[dict], str | None]:
+        """One page in (readiness_score, employee_id) descending order, as a range read on the rank indexes."""
+        where, params = ["as_of = :as_of"], {"as_of": as_of}
+        if org_unit is not None:
+            where.append("org_unit = :org_unit"); params["org_unit"] = org_unit
+        if decision is not None:
+            low, high = score_range(decision)
+            if low is not None: where.append("readiness_score >= :low"); params["low"] = low
+            if high is not None: where.append("readiness_score < :high"); params["high"] = high
+        if cursor is not None:
+            where.append(keyset_clause(["readiness_score", "employee_id"])); params.update(cursor_params(cursor))
+        rows = db.session.execute(text(f"SELECT {', '.join(COLUMNS)} FROM promotion_scores WHERE {' AND '.join(where)} "
+                                       f"ORDER BY readiness_score DESC, employee_id DESC LIMIT :n"),
+                                  {**params, "n": limit + 1}).mappings().all()
+        return page([dict(r) for r in rows], limit, lambda r: (r["readiness_score"], r["employee_id"]))
+
+    @classmethod
+    def has_rows(cls, as_of: str) -> bool:
+        return db.session.execute(text("SELECT 1 FROM promotion_scores WHERE as_of=:as_of LIMIT 1"), {"as_of": as_of}).first() is not None
+
+    @classmethod
+    def status(cls, as_of: str) -> dict:
+        with cls._lock:
+            pending = cls._pending.get(as_of)
+            return {"refreshing": as_of in cls._running, "error": cls._errors.get(as_of),
+                    "pending": pending if pending == ALL else len(pending or ())}
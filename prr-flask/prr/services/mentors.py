@@ -0,0 +1,239 @@
+import threading, time
+import numpy as np
+from sqlalchemy import text, inspect
+from config import Config
+from prr.utils.db import db
+from prr.utils.background import run_in_background
+from prr.utils.metrics import timed
+
+RATING_TABLES = ("feedback360", "manager_review")
+RANKS = ["IC", "Senior", "Lead", "Manager"]     # seniority order; a mentor must rank above the mentee
+# plan gaps -> the competency dimensions they draw on; a gap that names a dimension maps to itself
+GAP_DIMENSIONS = {"Time Management": ["Execution", "Ownership"], "Attention to Detail": ["Craft", "Execution"],
+                  "System Design": ["Craft", "Impact"]}
+ORG_BONUS = 0.25        # same org_unit, in z-score units of the match
+LOAD_PENALTY = 0.5      # per mentee already assigned to the mentor
+MAX_CHAIN = 64          # manager links followed; guards against cycles in bad data
+
+class MentorIndex:
+    """Per-employee competency vectors (mean rating per dimension over feedback360 and manager_review, z-scored
+    per dimension) in one float32 matrix, plus rank, org, manager row and mentee load arrays. A lookup is one
+    matrix-vector product, a few in-place vector ops and k argmax passes, so its cost does not depend on the database."""
+    def __init__(self, ids, names, orgs, ranks, managers, dims, sums, counts, assigned=None, n_ratings=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.names, self.orgs = list(names), list(orgs)
+        codes = {o: c for c, o in enumerate(dict.fromkeys(self.orgs))}
+        self.org = np.array([codes[o] for o in self.orgs], dtype=np.int32)
+        self.rank = np.array([RANKS.index(r) if r in RANKS else 0 for r in ranks], dtype=np.int8)
+        rows = [self.row(m) if m is not None else None for m in managers]
+        self.manager = np.array([-1 if r is None else r for r in rows], dtype=np.int64)
+        self.dims, self.col = list(dims), {d: j for j, d in enumerate(dims)}
+        self.sums, self.counts = np.asarray(sums, dtype=np.float64), np.asarray(counts, dtype=np.float64)
+        # base[r]: -inf where the employee does not outrank rank r, else the load penalty; kept current by assign()
+        self.base = np.where(self.rank[None, :] > np.arange(len(RANKS))[:, None], 0, -np.inf).astype(np.float32)
+        self.assigned, self.load = {}, np.zeros(len(self.ids), dtype=np.int32)
+        for mentee, mentor in (assigned or {}).items(): self.assign(mentee, mentor)
+        self.n_ratings = dict(n_ratings or {})
+        seen = self.counts > 0
+        means = np.divide(self.sums, self.counts, out=np.zeros_like(self.sums), where=seen)
+        n = np.maximum(seen.sum(axis=0), 1)
+        self.mu = (means * seen).sum(axis=0) / n
+        self.sd = np.sqrt((((means - self.mu) * seen) ** 2).sum(axis=0) / n)
+        self.sd[self.sd == 0] = 1.0
+        # stored dimension-major: the per-lookup product then streams contiguous rows
+        self.zT = np.zeros(self.sums.shape[::-1], dtype=np.float32)
+        self.z = self.zT.T
+        self._zscore(np.arange(len(self.ids)))
+
+    @classmethod
+    def build(cls) -> "MentorIndex":
+        emp = db.session.execute(text("SELECT id, name, org_unit, manager_id, current_rank FROM employee ORDER BY id")).all()
+        pos = {r[0]: i for i, r in enumerate(emp)}
+        tables = [t for t in RATING_TABLES if inspect(db.engine).has_table(t)]
+        ratings = {t: db.session.execute(text(f"SELECT employee_id, dimension, SUM(rating), COUNT(rating) FROM {t} "
+                                              f"GROUP BY employee_id, dimension")).all() for t in tables}
+        dims = sorted({r[1] for rows in ratings.values() for r in rows if r[1]})
+        col = {d: j for j, d in enumerate(dims)}
+        sums, counts = np.zeros((len(emp), len(dims))), np.zeros((len(emp), len(dims)))
+        for rows in ratings.values():
+            for eid, dim, total, n in rows:
+                if eid in pos and dim in col:
+                    sums[pos[eid], col[dim]] += total or 0
+                    counts[pos[eid], col[dim]] += n
+        assigned = dict(db.session.execute(text("SELECT mentee_id, mentor_id FROM mentor_assignment")).all())
+        return cls([r[0] for r in emp], [r[1] for r in emp], [r[2] for r in emp], [r[4] for r in emp], [r[3] for r in emp],
+                   dims, sums, counts, assigned, n_ratings={t: sum(r[3] for r in rows) for t, rows in ratings.items()})
+
+    def row(self, eid) -> int | None:
+        i = int(np.searchsorted(self.ids, eid))
+        return i if i < len(self.ids) and self.ids[i] == eid else None
+
+    def _zscore(self, rows: np.ndarray):
+        seen = self.counts[rows] > 0
+        means = np.divide(self.sums[rows], self.counts[rows], out=np.zeros_like(self.sums[rows]), where=seen)
+        # no ratings in a dimension reads as average, neither strength nor gap
+        self.z[rows] = np.where(seen, (means - self.mu) / self.sd, 0.0)
+
+    def fold(self, table: str, rows: list[dict]) -> bool:
+        """Adds freshly written rating rows in place; False if they need a rebuild (unknown employee or dimension)."""
+        at = [(self.row(r.get("employee_id")), self.col.get(r.get("dimension"))) for r in rows]
+        if any(i is None or j is None for i, j in at): return False
+        for (i, j), r in zip(at, rows):
+            self.sums[i, j] += r.get("rating") or 0
+            self.counts[i, j] += r.get("rating") is not None
+        # column statistics are left as built; the periodic rebuild re-centres them
+        self._zscore(np.unique([i for i, _ in at]))
+        self.n_ratings[table] = self.n_ratings.get(table, 0) + len(rows)
+        return True
+
+    def assign(self, mentee: int, mentor: int):
+        old, new = self.row(self.assigned[mentee]) if mentee in self.assigned else None, self.row(mentor)
+        if old is not None:
+            self.load[old] -= 1
+            self.base[:, old] += LOAD_PENALTY
+        self.assigned[mentee] = mentor
+        if new is not None:
+            self.load[new] += 1
+            self.base[:, new] -= LOAD_PENALTY
+
+    def chain(self, i: int) -> list[int]:
+        """Row `i` and its manager chain upward."""
+        out = [i]
+        while self.manager[out[-1]] >= 0 and len(out) <= MAX_CHAIN and self.manager[out[-1]] not in out:
+            out.append(int(self.manager[out[-1]]))
+        return out
+
+    def weights(self, gaps: list[str], i: int) -> np.ndarray:
+        w = np.zeros(len(self.dims), dtype=np.float32)
+        for g in gaps:
+            for d in GAP_DIMENSIONS.get(g, [g]):
+                if d in self.col: w[self.col[d]] = 1.0
+        if not w.any(): w[:] = 1.0
+        # lean on the dimensions the mentee is furthest below average in
+        w *= 1 + np.maximum(0, -self.z[i])
+        return w / w.sum()
+
+    def eligible(self, mentor: int | None, mentee: int) -> bool:
+        m, i = (self.row(mentor) if mentor is not None else None), self.row(mentee)
+        return m is not None and i is not None and self.rank[m] > self.rank[i] and m not in self.chain(i)
+
+    def suggest(self, eid: int, gaps: list[str], k: int = 3, capacity: int | None = None) -> list[int]:
+        """Rows of the best `k` mentors for `eid`'s gaps: more senior, outside the manager chain, under capacity."""
+        i = self.row(eid)
+        if i is None or not len(self.dims): return []
+        capacity = Config.MENTOR_CAPACITY if capacity is None else capacity
+        score = self.weights(gaps, i) @ self.zT
+        score += self.base[self.rank[i]]
+        score += (self.org == self.org[i]) * np.float32(ORG_BONUS)
+        score[self.load >= capacity] = -np.inf
+        score[self.chain(i)] = -np.inf
+        top = []
+        for _ in range(min(k, len(score))):     # k is small: k argmax passes beat a full argpartition
+            m = int(score.argmax())
+            if not np.isfinite(score[m]): break
+            top.append(m)
+            score[m] = -np.inf
+        return top
+
+    def describe(self, m: int, gaps: list[str]) -> dict:
+        dims = [d for g in gaps for d in GAP_DIMENSIONS.get(g, [g]) if d in self.col]
+        strong = sorted(dict.fromkeys(dims), key=lambda d: -self.z[m, self.col[d]])
+        return {"employee_id": int(self.ids[m]), "name": self.names[m], "role": RANKS[self.rank[m]],
+                "org_unit": self.orgs[m], "strengths": strong[:3]}
+
+class MentorService:
+    """Serves the MentorIndex and sticky, load-balanced mentor assignments (one mentor per mentee, kept while the
+    mentor stays eligible). Reads never write: the plan shows the current assignment or the best suggestion, and an
+    assignment is only stored by assign(). Ingested ratings are folded into the matrix in place; changes made by
+    other processes are picked up by a background check (every CACHE_TTL seconds) that rebuilds when row counts move."""
+    _index = None
+    _app = None
+    _checked_at = 0.0
+    _rebuilding = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def init_app(cls, app):
+        cls._app = app
+
+    @classmethod
+    def index(cls) -> MentorIndex:
+        if cls._index is None:
+            with cls._lock:
+                if cls._index is None:
+                    cls._index, cls._checked_at = MentorIndex.build(), time.monotonic()
+        elif time.monotonic() - cls._checked_at > Config.CACHE_TTL:
+            cls._checked_at = time.monotonic()
+            cls.rebuild_async(check=True)
+        return cls._index
+
+    @classmethod
+    def _stale(cls, idx: MentorIndex) -> bool:
+        counts = {t: db.session.execute(text(f"SELECT COUNT(rating) FROM {t}")).scalar() for t in idx.n_ratings}
+        employees = db.session.execute(text("SELECT COUNT(*) FROM employee")).scalar()
+        return counts != idx.n_ratings or employees != len(idx.ids)
+
+    @classmethod
+    def rebuild_async(cls, check: bool = False):
+        """Rebuilds the index off the request path; with `check`, only if the row counts no longer match."""
+        with cls._lock:
+            if cls._rebuilding: return
+            cls._rebuilding = True
+        def target():
+            try:
+                if not check or cls._stale(cls._index): cls._index = MentorIndex.build()
+            finally: cls._rebuilding = False
+        if cls._app is None: target()
+        else: run_in_background(target, name="mentor-index", app=cls._app)
+
+    @classmethod
+    def record(cls, table: str, rows: list[dict]):
+        """Write-path hook for rating rows that were just committed."""
+        if table not in RATING_TABLES or cls._index is None: return
+        with cls._lock:
+            ok = cls._index.fold(table, rows)
+        if not ok: cls.rebuild_async()
+
+    @classmethod
+    @timed("mentor")
+    def suggest(cls, eid: int, gaps: list[str], k: int = 3) -> list[dict]:
+        """The mentee's current mentor (while still eligible) followed by the best candidates; read-only."""
+        idx = cls.index()
+        current = idx.row(idx.assigned[eid]) if idx.eligible(idx.assigned.get(eid), eid) else None
+        rows = ([current] if current is not None else []) + [m for m in idx.suggest(eid, gaps, k) if m != current]
+        return [idx.describe(m, gaps) for m in rows[:k]]
+
+    @classmethod
+    def assign(cls, eid: int, gaps: list[str], mentor_id: int | None = None) -> dict | None:
+        """Stores the mentee's mentor: `mentor_id` if given (must be eligible and under capacity), else the current
+        assignment while it stays eligible, else the best suggestion. None when nobody is eligible."""
+        idx = cls.index()
+        current = idx.assigned.get(eid)
+        if mentor_id is None:
+            if idx.eligible(current, eid): return idx.describe(idx.row(current), gaps)
+            best = idx.suggest(eid, gaps, k=1)
+            if not best: return None
+            mentor_id = int(idx.ids[best[0]])
+        elif mentor_id != current:
+            m = idx.row(mentor_id)
+            if not idx.eligible(mentor_id, eid) or idx.load[m] >= Config.MENTOR_CAPACITY:
+                raise ValueError(f"employee {mentor_id} cannot mentor employee {eid}")
+        else:
+            return idx.describe(idx.row(current), gaps)
+        params = {"eid": eid, "mentor": mentor_id, "current": current, "at": time.time()}
+        try:
+            if current is None:
+                won = db.session.execute(text("INSERT INTO mentor_assignment (mentee_id, mentor_id, assigned_at) "
+                                              "VALUES (:eid, :mentor, :at) ON CONFLICT (mentee_id) DO NOTHING"), params).rowcount
+            else:
+                won = db.session.execute(text("UPDATE mentor_assignment SET mentor_id=:mentor, assigned_at=:at "
+                                              "WHERE mentee_id=:eid AND mentor_id=:current"), params).rowcount
+            if not won:     # another process assigned this mentee first; theirs stands
+                mentor_id = db.session.execute(text("SELECT mentor_id FROM mentor_assignment WHERE mentee_id=:eid"), params).scalar()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        with cls._lock: idx.assign(eid, mentor_id)
+        m = idx.row(mentor_id)
+        return idx.describe(m, gaps) if m is not None else None
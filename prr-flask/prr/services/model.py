@@ -1,21 +1,199 @@
-import os, json, joblib, numpy as np
+import os, json, threading, time, numpy as np
 from config import Config
+from prr.services.ensemble import base_estimators, booster, shap_values
+from prr.services.native import NativeScorer
+from prr.services.registry import ModelRegistry
+from prr.utils.metrics import timed
+
+class ExplanationUnsupported(RuntimeError):
+    """The serving model has no SHAP explainer (e.g. an estimator type TreeSHAP/LinearSHAP cannot handle)."""
+
+class LoadedModel:
+    """One model version's artifacts. Never mutated after loading (bar the lazy global SHAP summary), so a
+    request that holds a reference keeps scoring with that version even if another one is swapped in."""
+    @timed("model.load")
+    def __init__(self, md: str):
+        import joblib   # unpickling pulls in sklearn/lightgbm; keep them off the app import path
+        path = os.path.join(md, "model.pkl")
+        self.model = joblib.load(path)
+        self.model_dir, self._global = md, None
+        with open(os.path.join(md, "features.json")) as f:
+            meta = json.load(f)
+        self.feat_order = meta["feature_order"]
+        self.version = str(meta.get("version") or f"{os.path.basename(os.path.abspath(md))}@{int(os.path.getmtime(path))}")
+        self.explainers = self._build_explainers(md)
+        # boosters + isotonic tables scored directly; None keeps the sklearn path (e.g. sigmoid calibration)
+        self.native = NativeScorer.from_model(self.model, len(self.feat_order)) if Config.NATIVE_PREDICT else None
+    def base_estimators(self) -> list:
+        """The fitted classifiers behind any calibration or fold-ensemble wrapper."""
+        return base_estimators(self.model)
+    def _build_explainers(self, md):
+        try:
+            import shap
+        except ImportError:
+            return None
+        bg_path = os.path.join(md, "shap_background.npy")
+        background = np.load(bg_path) if os.path.exists(bg_path) else None
+        explainers = []
+        for est in self.base_estimators():
+            # path-dependent TreeSHAP needs no background pass, which keeps a row in the low milliseconds
+            if booster(est) is not None: explainers.append(shap.TreeExplainer(booster(est)))
+            elif hasattr(est, "coef_") and background is not None: explainers.append(shap.LinearExplainer(est, background))
+            else: return None
+        return explainers
+    def global_explanation(self) -> dict | None:
+        """Training-time SHAP summary plus the per-employee matrix, memory-mapped rather than read."""
+        if self._global is None:
+            summary = os.path.join(self.model_dir, "explain_global.json")
+            if not os.path.exists(summary): return None
+            with open(summary) as f:
+                meta = json.load(f)
+            values = np.load(os.path.join(self.model_dir, "shap_values.npy"), mmap_mode="r")
+            ids = np.load(os.path.join(self.model_dir, "shap_employee_ids.npy"))
+            self._global = {"summary": meta, "values": values, "row": {int(e): i for i, e in enumerate(ids)}}
+        return self._global
+    def matrix(self, rows: list[dict]) -> np.ndarray:
+        return np.array([[r.get(k,0) for k in self.feat_order] for r in rows], dtype=float).reshape(len(rows), len(self.feat_order))
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        if self.native: return self.native.predict(x)
+        if hasattr(self.model, "predict_proba"):
+            return self.model.predict_proba(x)[:,1]
+        return np.asarray(self.model.predict(x), dtype=float).reshape(-1)
+    @timed("model.predict")
+    def score(self, features: dict) -> float:
+        if self.native: return self.native.predict_row([features.get(k, 0) for k in self.feat_order])
+        return float(self.predict(self.matrix([features]))[0])
+    @timed("model.explain")
+    def explain_batch(self, rows: list[dict]) -> tuple[np.ndarray, float]:
+        """SHAP values (n x features, log-odds) averaged over the calibrated base models, plus the base value."""
+        x = self.matrix(rows)
+        if not self.explainers: raise ExplanationUnsupported("loaded model does not support SHAP explanations")
+        if not len(x): return np.zeros((0, len(self.feat_order))), 0.0
+        return shap_values(self.explainers, x)
+    def warm_up(self):
+        """Throw-away scores, so first-call costs (lazy C handles, buffers) are not paid by a real request."""
+        self.score({})
+        self.score_batch([{}, {}])
+    @timed("model.predict")
+    def score_batch(self, rows: list[dict]) -> np.ndarray:
+        """Scores many feature dicts with a single predict call."""
+        if self.native and rows:
+            x = self.native.buffer(len(rows))
+            for i, r in enumerate(rows): x[i] = [r.get(k, 0) for k in self.feat_order]
+            return self.native.predict(x)
+        x = self.matrix(rows)
+        if not len(x): return np.zeros(0)
+        return self.predict(x)
+
 class ModelService:
-    _model = None
-    _feat_order = None
+    """Holds the serving LoadedModel. Swaps replace the single `_current` reference, so in-flight requests finish on
+    the version they started with; new versions load on a background thread. Each process also follows the
+    registry's CURRENT pointer (checked every MODEL_POLL_S seconds), which is how a promote reaches every worker."""
+    _current = None
+    _lock = threading.Lock()
+    _loading = None        # version (or directory) being loaded in the background
+    _last_error = None
+    _checked_at = 0.0
+    _failed = None         # directory whose load last failed; not retried by the pointer poll
+    _warm = False
+    _listeners = []        # called with the new LoadedModel after every swap
     @classmethod
     def load(cls, model_dir=None):
-        if cls._model: return
-        md = model_dir or Config.MODEL_DIR
-        cls._model = joblib.load(os.path.join(md, "model.pkl"))
-        with open(os.path.join(md, "features.json")) as f:
-            cls._feat_order = json.load(f)["feature_order"]
+        if cls._current: return
+        with cls._lock:
+            if not cls._current: cls._current = LoadedModel(model_dir or ModelRegistry.resolve())
     @classmethod
-    def score(cls, features: dict) -> float:
+    def current(cls) -> LoadedModel:
+        """The serving model; take it once per request and use it throughout for a consistent version."""
         cls.load()
-        x = np.array([[features.get(k,0) for k in cls._feat_order]])
-        if hasattr(cls._model, "predict_proba"):
-            return float(cls._model.predict_proba(x)[0,1])
-        p = cls._model.predict(x)
-        try: return float(p[0])
-        except Exception: return float(p)
+        if Config.MODEL_POLL_S >= 0 and time.monotonic() - cls._checked_at > Config.MODEL_POLL_S:
+            cls._checked_at = time.monotonic()
+            pointer = ModelRegistry.current()
+            md = ModelRegistry.path(pointer)
+            if md and md != cls._failed and os.path.abspath(md) != os.path.abspath(cls._current.model_dir):
+                cls.swap_async(pointer)
+        return cls._current
+    @classmethod
+    def swap(cls, version: str, promote: bool = False) -> LoadedModel:
+        """Loads a registry version and makes it the serving model (blocking; the old one keeps serving meanwhile).
+        With `promote`, the registry pointer moves only once the version has loaded and warmed up."""
+        md = ModelRegistry.path(version)
+        if md is None: raise KeyError(version)
+        try:
+            loaded = LoadedModel(md)
+            loaded.warm_up()
+            if promote: ModelRegistry.set_current(version)
+            cls._current, cls._last_error, cls._failed = loaded, None, None
+            for fn in cls._listeners: fn(loaded)
+            return loaded
+        except Exception as e:
+            cls._last_error, cls._failed = f"{version}: {e}", md
+            raise
+        finally:
+            with cls._lock: cls._loading = None
+    @classmethod
+    def on_swap(cls, fn):
+        cls._listeners.append(fn)
+    @classmethod
+    def swap_async(cls, version: str, promote: bool = False) -> threading.Thread | None:
+        """swap() on a daemon thread; None when a load is already in flight."""
+        with cls._lock:
+            if cls._loading: return None
+            cls._loading = version
+        def target():
+            try: cls.swap(version, promote)
+            except Exception: pass     # recorded in _last_error; the previous version keeps serving
+        t = threading.Thread(target=target, name=f"model-load-{version}", daemon=True)
+        t.start()
+        return t
+    @classmethod
+    def promote(cls, version: str, wait: bool = False) -> threading.Thread | None:
+        """Starts loading `version` here and points the registry at it once it serves; other processes follow via the
+        pointer, so a version that fails to load never reaches them."""
+        t = cls.swap_async(version, promote=True)
+        if t and wait: t.join()
+        return t
+    @classmethod
+    def warm(cls):
+        """Loads and warms the model; /ready reports ready from then on."""
+        cls.current().warm_up()
+        cls._warm = True
+    @classmethod
+    def warm_async(cls) -> threading.Thread | None:
+        with cls._lock:
+            if cls._warm or cls._loading: return None
+            cls._loading = "(startup)"
+        def target():
+            try: cls.warm()
+            except Exception as e: cls._last_error = f"warm-up: {e}"
+            finally:
+                with cls._lock: cls._loading = None
+        t = threading.Thread(target=target, name="model-warm", daemon=True)
+        t.start()
+        return t
+    @classmethod
+    def ready(cls) -> bool:
+        return cls._warm and cls._current is not None
+    @classmethod
+    def status(cls) -> dict:
+        return {"serving": cls._current.version if cls._current else None, "ready": cls.ready(), "loading": cls._loading,
+                "last_error": cls._last_error, "registry": ModelRegistry.root(), "pointer": ModelRegistry.current()}
+    # convenience wrappers over the current model, for callers that make a single call
+    @classmethod
+    def version(cls) -> str:
+        return cls.current().version
+    @classmethod
+    def global_explanation(cls) -> dict | None:
+        return cls.current().global_explanation()
+    @classmethod
+    def matrix(cls, rows: list[dict]) -> np.ndarray:
+        return cls.current().matrix(rows)
+    @classmethod
+    def score(cls, features: dict) -> float:
+        return cls.current().score(features)
+    @classmethod
+    def explain_batch(cls, rows: list[dict]) -> tuple[np.ndarray, float]:
+        return cls.current().explain_batch(rows)
+    @classmethod
+    def score_batch(cls, rows: list[dict]) -> np.ndarray:
+        return cls.current().score_batch(rows)
@@ -0,0 +1,108 @@
+import ctypes, threading
+import numpy as np
+from prr.services.ensemble import FoldEnsemble, booster
+
+_CAPI = None
+def _capi():
+    """lightgbm's private C bindings, imported on first use (lightgbm drags in sklearn and scipy).
+    None when the private API has moved; single rows then go through Booster.predict too."""
+    global _CAPI
+    if _CAPI is None:
+        try:
+            from lightgbm.basic import _LIB, _safe_call, _c_str
+            _CAPI = (_LIB, _safe_call, _c_str)
+        except ImportError:
+            _CAPI = False
+    return _CAPI or None
+
+# below this many rows OpenMP start-up costs more than it saves
+SMALL_BATCH = 256
+
+def _isotonic(cal):
+    """(x, y) thresholds of a fitted IsotonicRegression(out_of_bounds="clip"), so np.interp reproduces predict()."""
+    if type(cal).__name__ != "IsotonicRegression" or getattr(cal, "out_of_bounds", None) != "clip": return None
+    return np.asarray(cal.X_thresholds_, dtype=float), np.asarray(cal.y_thresholds_, dtype=float)
+
+class _FastRow:
+    """Per-thread handles for LightGBM's single-row C entry point (the handles are not thread-safe)."""
+    def __init__(self, boosters, n_features):
+        self.lib, self.call, c_str = _capi()
+        self.row = np.zeros(n_features, dtype=np.float64)
+        self.out = np.zeros(1, dtype=np.float64)
+        self.n = ctypes.c_int64(0)
+        self.configs = []
+        for b, it in boosters:
+            cfg = ctypes.c_void_p()
+            self.call(self.lib.LGBM_BoosterPredictForMatSingleRowFastInit(
+                b._handle, ctypes.c_int(0), ctypes.c_int(0), ctypes.c_int(it or -1), ctypes.c_int(1),
+                ctypes.c_int32(n_features), c_str("num_threads=1"), ctypes.byref(cfg)))
+            self.configs.append(cfg)
+        self.row_ptr = self.row.ctypes.data_as(ctypes.c_void_p)
+        self.out_ptr = self.out.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+
+    def predict(self, i: int) -> float:
+        self.call(self.lib.LGBM_BoosterPredictForMatSingleRowFast(self.configs[i], self.row_ptr, ctypes.byref(self.n), self.out_ptr))
+        return float(self.out[0])
+
+    def __del__(self):
+        for cfg in self.configs:
+            self.lib.LGBM_FastConfigFree(cfg)
+
+class NativeScorer:
+    """Scores straight through the LightGBM boosters plus isotonic lookup tables, skipping the sklearn wrappers.
+
+    p = post(mean_i(calibrate_i(booster_i(x)))), which covers a bare LGBMClassifier, an isotonic
+    CalibratedClassifierCV and a FoldEnsemble.
+    """
+    def __init__(self, members: list, post, n_features: int):
+        self.members = members            # [(Booster, num_iteration | None, (x, y) | None)]
+        self.post = post                  # (x, y) applied to the mean, or None
+        self.n_features = n_features
+        self._local = threading.local()
+
+    @classmethod
+    def from_model(cls, model, n_features: int):
+        """None when the model has a part the lean path cannot reproduce (e.g. sigmoid calibration, non-tree models)."""
+        if isinstance(model, FoldEnsemble):
+            post = _isotonic(model.calibrator) if model.calibrator is not None else None
+            if model.calibrator is not None and post is None: return None
+            members = [(b, None, None) for b in model.models]
+        elif hasattr(model, "calibrated_classifiers_"):
+            members, post = [], None
+            for c in model.calibrated_classifiers_:
+                if len(c.calibrators) != 1 or _isotonic(c.calibrators[0]) is None: return None
+                members.append((booster(c.estimator), None, _isotonic(c.calibrators[0])))
+        else:
+            members, post = [(booster(model), None, None)], None
+        members = [(b, it if it is not None else (b.best_iteration or None) if b is not None else None, cal) for b, it, cal in members]
+        if any(b is None for b, _, _ in members): return None
+        return cls(members, post, n_features)
+
+    def _finish(self, raw: list) -> np.ndarray:
+        p = np.mean([np.interp(r, *cal) if cal else r for r, (_, _, cal) in zip(raw, self.members)], axis=0)
+        return np.interp(p, *self.post) if self.post else p
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """Positive-class probabilities for an (n, features) float matrix."""
+        kw = {"num_threads": 1} if len(x) <= SMALL_BATCH else {}
+        return self._finish([b.predict(x, num_iteration=it, **kw) for b, it, _ in self.members])
+
+    def buffer(self, n: int) -> np.ndarray:
+        """A per-thread, reused (n, features) input buffer."""
+        buf = getattr(self._local, "buf", None)
+        if buf is None or len(buf) < n:
+            buf = self._local.buf = np.zeros((max(n, 2 * len(buf) if buf is not None else 64), self.n_features))
+        return buf[:n]
+
+    def predict_row(self, values) -> float:
+        """One row through the single-row C API (no per-call input validation or array conversion)."""
+        if _capi() is None:
+            row = self.buffer(1)
+            row[0] = values
+            return float(self.predict(row)[0])
+        fast = getattr(self._local, "fast", None)
+        if fast is None:
+            fast = self._local.fast = _FastRow([(b, it) for b, it, _ in self.members], self.n_features)
+        fast.row[:] = values
+        raw = [fast.predict(i) for i in range(len(self.members))]
+        return float(self._finish(raw))
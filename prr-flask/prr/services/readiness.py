@@ -0,0 +1,46 @@
+from sqlalchemy import text
+from prr.utils.db import db
+from prr.utils.cache import readiness_cache
+from prr.utils.metrics import stage
+from prr.services.features import build_features
+from prr.services.model import ModelService
+
+EMPLOYEE_SQL = "SELECT name, org_unit FROM employee WHERE id=:eid"
+
+def cache_entry(eid: int, as_of: str, model=None) -> dict:
+    """Cached record for one employee/date/model; fields are filled in lazily."""
+    key = (eid, as_of, (model or ModelService.current()).version)
+    entry = readiness_cache.get(key)
+    if entry is None:
+        entry = {}
+        readiness_cache.set(key, entry)
+    return entry
+
+def features_for(eid: int, as_of: str, model=None) -> dict:
+    entry = cache_entry(eid, as_of, model)
+    if "features" not in entry: entry["features"] = build_features(eid, as_of)
+    return entry["features"]
+
+def score_for(eid: int, as_of: str, model=None) -> float:
+    """Pass the request's `model` (ModelService.current()) so score and reported version always agree."""
+    model = model or ModelService.current()
+    entry = cache_entry(eid, as_of, model)
+    if "score" not in entry: entry["score"] = model.score(features_for(eid, as_of, model))
+    return entry["score"]
+
+def employee_for(eid: int, as_of: str, model=None) -> dict | None:
+    entry = cache_entry(eid, as_of, model)
+    if "employee" not in entry:
+        with stage("employee"):
+            row = db.session.execute(text(EMPLOYEE_SQL), {"eid": eid}).mappings().first()
+        entry["employee"] = dict(row) if row else None
+    return entry["employee"]
+
+def explanation_for(eid: int, as_of: str, model=None) -> tuple[list[float], float]:
+    """Per-feature SHAP values (in the model's feature order) and the base value."""
+    model = model or ModelService.current()
+    entry = cache_entry(eid, as_of, model)
+    if "shap" not in entry:
+        values, base = model.explain_batch([features_for(eid, as_of, model)])
+        entry["shap"] = (values[0].tolist(), base)
+    return entry["shap"]
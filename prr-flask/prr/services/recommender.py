@@ -1,5 +1,9 @@
+import hashlib, heapq, json, re, threading
+from collections import defaultdict
 from sqlalchemy import text
 from prr.utils.db import db
+from prr.utils.cache import catalog_cache
+from prr.utils.metrics import timed
 def infer_gaps(features: dict, org_unit: str) -> list[str]:
     gaps = []
     if features.get("feedback_mean", 4.1) < 4.0: gaps.append("Leadership")
@@ -7,14 +11,97 @@ def infer_gaps(features: dict, org_unit: str) -> list[str]:
     if features.get("quality_mean", 0.85) < 0.78: gaps.append("Attention to Detail")
     if "Software" in org_unit and features.get("velocity_total", 0) < 20000: gaps.append("System Design")
     return gaps[:3] or ["Leadership"]
-def recommend_courses(gaps: list[str]) -> list[dict]:
-    rows = db.session.execute(text("SELECT course_id,title,provider,duration_h,skills_json FROM catalog")).mappings().all()
-    out = []
-    for r in rows:
+_STOP = {"a", "an", "and", "for", "in", "of", "on", "the", "to", "&"}
+# per skill/token, only this many courses (already in tie-break order) are considered, so a plan's cost does not
+# grow with the catalog; a course can only be missed if it ranks beyond this in every skill it shares with the gaps
+MAX_POSTINGS = 500
+
+def normalize(skill: str) -> str:
+    return " ".join(tokens(skill))
+def tokens(text_: str) -> list[str]:
+    return [t for t in re.sub(r"[^a-z0-9+#]+", " ", str(text_).lower()).split() if t not in _STOP]
+
+class SkillIndex:
+    """Inverted index over the catalog: normalized skill phrase -> courses, and skill token -> courses for
+    partial matches ("Detail" against "Attention to Detail"). Posting lists are pre-sorted internal first,
+    then shortest, so a lookup only touches the head of each list."""
+    def __init__(self, rows: list[dict]):
+        self.courses = []
+        phrases, words = defaultdict(list), defaultdict(list)
+        for r in rows:
+            try:
+                skills = [s for s in json.loads(r["skills_json"] or "[]") if isinstance(s, str)]
+            except (TypeError, ValueError):
+                skills = []
+            i = len(self.courses)
+            self.courses.append({"course_id": r["course_id"], "title": r["title"], "provider": r["provider"],
+                                 "duration_h": r["duration_h"], "internal": bool(r["internal_flag"])})
+            for phrase in {normalize(s) for s in skills} - {""}: phrases[phrase].append(i)
+            # courses without usable skills are still reachable through their title words
+            for t in {t for s in skills for t in tokens(s)} or set(tokens(r["title"])): words[t].append(i)
+        # tie-break rank of every course, computed once so posting lists sort on an int
+        self.rank = [0] * len(self.courses)
+        key = lambda i: (not self.courses[i]["internal"], self.courses[i]["duration_h"] or 0, self.courses[i]["course_id"])
+        for r, i in enumerate(sorted(range(len(self.courses)), key=key)): self.rank[i] = r
+        self.phrases = {k: sorted(v, key=self.rank.__getitem__)[:MAX_POSTINGS] for k, v in phrases.items()}
+        self.words = {k: sorted(v, key=self.rank.__getitem__)[:MAX_POSTINGS] for k, v in words.items()}
+
+    def search(self, gaps: list[str], k: int = 3) -> list[dict]:
+        """Top-k courses by skill overlap with the gaps (an exact skill counts 1, a partial one its share of
+        the gap's words, at most half), then internal courses, then shorter ones."""
+        overlap, matched = defaultdict(float), defaultdict(list)
         for g in gaps:
-            if g.lower().split()[0] in (r["title"].lower() + " " + r["skills_json"].lower()):
-                out.append({"course_id": r["course_id"], "title": r["title"], "provider": r["provider"], "duration_h": r["duration_h"]})
-                break
-    return out[:3]
-def mentor_suggestion(org_unit: str) -> dict:
-    return {"name": "Mary Johnson", "role": "Senior PM" if "Software" in org_unit else "Senior Manager"}
+            words = tokens(g)
+            if not words: continue
+            hits = {i: 1.0 for i in self.phrases.get(" ".join(words), ())}
+            partial = defaultdict(int)
+            for w in words:
+                for i in self.words.get(w, ()): partial[i] += 1
+            for i, n in partial.items():
+                hits.setdefault(i, 0.5 * n / len(words))
+            for i, v in hits.items():
+                overlap[i] += v
+                matched[i].append(g)
+        best = heapq.nsmallest(k, overlap, key=lambda i: (-overlap[i], self.rank[i]))
+        return [{**{c: self.courses[i][c] for c in ("course_id", "title", "provider", "duration_h")}, "matched_skills": matched[i]}
+                for i in best]
+
+CATALOG_SQL = "SELECT course_id,title,provider,duration_h,skills_json,internal_flag FROM catalog ORDER BY course_id"
+_index = (None, None)   # (content hash, SkillIndex) of the last build
+_build_lock = threading.Lock()
+
+def catalog_hash(rows: list[dict]) -> str:
+    h = hashlib.sha1()
+    for r in rows: h.update(repr(tuple(r.values())).encode())
+    return h.hexdigest()
+
+def cached_index() -> SkillIndex | None:
+    return catalog_cache.get("index")
+
+def index_from(rows: list[dict]) -> SkillIndex:
+    """The SkillIndex of these catalog rows: the last build while their content hash is unchanged, else a new one."""
+    global _index
+    digest = catalog_hash(rows)
+    with _build_lock:
+        if digest != _index[0]: _index = (digest, SkillIndex(rows))
+        idx = _index[1]
+    catalog_cache.set("index", idx)
+    return idx
+
+def reset_index():
+    """Drops the built index; the next plan re-reads the catalog and rebuilds."""
+    global _index
+    with _build_lock:
+        _index = (None, None)
+    catalog_cache.clear()
+
+def skill_index() -> SkillIndex:
+    """The catalog's SkillIndex. Once CACHE_TTL lapses the catalog is re-read and hashed; the index is rebuilt only
+    when its content changed. invalidate_catalog() forces the rebuild right away."""
+    idx = cached_index()
+    if idx is not None: return idx
+    return index_from([dict(r) for r in db.session.execute(text(CATALOG_SQL)).mappings()])
+
+@timed("recommend")
+def recommend_courses(gaps: list[str], k: int = 3) -> list[dict]:
+    return skill_index().search(gaps, k)
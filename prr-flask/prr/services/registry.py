@@ -0,0 +1,73 @@
+import os, json, re, shutil, time
+from config import Config
+
+# artifacts a version directory must contain to be servable
+REQUIRED = ("model.pkl", "features.json")
+POINTER = "CURRENT"
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+class ModelRegistry:
+    """Directory-per-version model store: <MODEL_REGISTRY>/<version>/{model.pkl, features.json, ...} plus a
+    CURRENT file naming the version to serve. Without a CURRENT pointer the app serves Config.MODEL_DIR as before."""
+
+    @staticmethod
+    def root() -> str:
+        return Config.MODEL_REGISTRY
+
+    @classmethod
+    def path(cls, version: str) -> str | None:
+        """Directory of a servable version, or None for unknown/malformed names."""
+        if not version or not _NAME.match(version): return None
+        d = os.path.join(cls.root(), version)
+        return d if all(os.path.exists(os.path.join(d, f)) for f in REQUIRED) else None
+
+    @classmethod
+    def current(cls) -> str | None:
+        try:
+            with open(os.path.join(cls.root(), POINTER)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    @classmethod
+    def resolve(cls) -> str:
+        """The model directory to serve: the registry's CURRENT version, else Config.MODEL_DIR."""
+        return cls.path(cls.current()) or Config.MODEL_DIR
+
+    @classmethod
+    def set_current(cls, version: str):
+        if cls.path(version) is None: raise KeyError(version)
+        tmp = os.path.join(cls.root(), f".{POINTER}.{os.getpid()}")
+        with open(tmp, "w") as f:
+            f.write(version + "\n")
+        os.replace(tmp, os.path.join(cls.root(), POINTER))   # readers see the old or the new pointer, never half
+
+    @classmethod
+    def versions(cls) -> list[dict]:
+        if not os.path.isdir(cls.root()): return []
+        current, out = cls.current(), []
+        for name in sorted(os.listdir(cls.root())):
+            d = cls.path(name)
+            if d is None: continue
+            with open(os.path.join(d, "features.json")) as f:
+                meta = json.load(f)
+            out.append({"version": name, "current": name == current, "created_at": os.path.getmtime(os.path.join(d, "model.pkl")),
+                        **{k: meta[k] for k in ("model_type", "calibrated", "oof") if k in meta}})
+        return out
+
+    @classmethod
+    def publish(cls, src_dir, version: str | None = None) -> str:
+        """Copies a trained artifacts directory in as a new version (not promoted); returns the version name."""
+        version = version or time.strftime("%Y%m%d-%H%M%S")
+        if not _NAME.match(version): raise ValueError(f"invalid version name {version!r}")
+        os.makedirs(cls.root(), exist_ok=True)
+        dest = os.path.join(cls.root(), version)
+        if os.path.exists(dest): raise FileExistsError(dest)
+        tmp = os.path.join(cls.root(), f".{version}.tmp")
+        shutil.copytree(src_dir, tmp)
+        with open(os.path.join(tmp, "features.json")) as f:
+            meta = json.load(f)
+        with open(os.path.join(tmp, "features.json"), "w") as f:
+            json.dump({**meta, "version": version}, f)
+        os.replace(tmp, dest)
+        return version
@@ -1 +1,18 @@
 # optional JWT/OIDC hooks
+import hmac
+from functools import wraps
+from flask import current_app, jsonify, request
+
+def require_admin(fn):
+    """Bearer ADMIN_TOKEN check for admin routes; with no token configured they are open only in debug/testing."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = current_app.config.get("ADMIN_TOKEN")
+        if not token:
+            if current_app.debug or current_app.testing: return fn(*args, **kwargs)
+            return jsonify({"error": "admin endpoints are disabled; set ADMIN_TOKEN"}), 403
+        given = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if not hmac.compare_digest(given.encode(), token.encode()):
+            return jsonify({"error": "admin token required"}), 401
+        return fn(*args, **kwargs)
+    return wrapper
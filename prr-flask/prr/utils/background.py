@@ -0,0 +1,12 @@
+import threading
+from flask import current_app
+
+def run_in_background(fn, *args, name: str | None = None, app=None) -> threading.Thread:
+    """Runs fn(*args) on a daemon thread inside `app`'s context (default: the current app)."""
+    app = app or current_app._get_current_object()
+    def target():
+        with app.app_context():
+            fn(*args)
+    t = threading.Thread(target=target, name=name, daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,61 @@
+import threading, time
+from collections import OrderedDict
+from config import Config
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire `ttl` seconds after being stored."""
+    def __init__(self, maxsize: int = 4096, ttl: float = 300.0):
+        self.maxsize, self.ttl = maxsize, ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.monotonic():
+                if item is not None: del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value):
+        if self.maxsize <= 0: return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate) -> int:
+        """Drops every entry whose key satisfies `predicate`; returns how many were dropped."""
+        with self._lock:
+            stale = [k for k in self._data if predicate(k)]
+            for k in stale: del self._data[k]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"size": len(self._data), "maxsize": self.maxsize, "ttl_s": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+# Per-request readiness data keyed on (employee_id, as_of, model_version), shared by all blueprints
+readiness_cache = TTLCache(Config.CACHE_MAXSIZE, Config.CACHE_TTL)
+catalog_cache = TTLCache(1, Config.CACHE_TTL)
+
+def invalidate_employees(employee_ids) -> int:
+    """Write-path hook: forget everything cached for employees that just got new rows."""
+    eids = {int(e) for e in employee_ids}
+    return readiness_cache.invalidate(lambda k: k[0] in eids) if eids else 0
+
+def invalidate_catalog():
+    """Write-path hook for catalog edits: drops the cached skill index and the built one behind it."""
+    from prr.services.recommender import reset_index   # recommender imports this module
+    reset_index()
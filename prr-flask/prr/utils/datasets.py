@@ -0,0 +1,153 @@
+"""Training/generation datasets: partitioned Parquet when pyarrow is installed, CSV otherwise (and for import/export).
+
+Parquet datasets live in `<root>/<name>/` with hive partitions (e.g. `year=2014/org_unit=IT/`), so readers can
+project columns and prune partitions instead of parsing whole files. The CSV names are the historical ones.
+"""
+import time
+from pathlib import Path
+from urllib.parse import quote
+import numpy as np, pandas as pd
+
+DATA_DIR = Path("data")
+# the nine model inputs, in training order
+FEATURES = ["okr_attainment","feedback_mean","recognitions","courses_completed",
+            "on_time_ratio","quality_mean","velocity_total","impact_total","incidents_weight"]
+# name -> csv file, hive partition columns, and the date column the derived `year` partition comes from
+DATASETS = {
+    "employees": {"csv": "employees_500.csv", "partition_cols": ["org_unit"]},
+    "monthly_activity": {"csv": "monthly_activity_2005_2014.csv", "partition_cols": ["year", "org_unit"], "date_col": "year_month"},
+    "training_features": {"csv": "training_features_2005_2014.csv", "partition_cols": []},
+    "promotion_labels": {"csv": "promotion_labels_2014.csv", "partition_cols": []},
+    "full_project_tasks": {"csv": "full_project_tasks.csv", "partition_cols": ["year"], "date_col": "date"},
+}
+OPS = {"==": "eq", "!=": "ne", "<": "lt", "<=": "le", ">": "gt", ">=": "ge"}
+
+def has_pyarrow() -> bool:
+    try:
+        import pyarrow.dataset  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def default_format() -> str:
+    return "parquet" if has_pyarrow() else "csv"
+
+def parquet_path(name: str, root=DATA_DIR) -> Path:
+    return Path(root) / name
+
+def csv_path(name: str, root=DATA_DIR) -> Path:
+    return Path(root) / DATASETS[name]["csv"]
+
+def exists(name: str, root=DATA_DIR) -> bool:
+    return parquet_path(name, root).is_dir() or csv_path(name, root).exists()
+
+def date_filters(name: str, start=None, end=None) -> list[tuple]:
+    """Filters for a date range on the dataset's date column, plus the matching `year` partition bounds."""
+    col, out = DATASETS[name]["date_col"], []
+    if start is not None: out += [("year", ">=", int(str(start)[:4])), (col, ">=", str(start))]
+    if end is not None: out += [("year", "<=", int(str(end)[:4])), (col, "<=", str(end))]
+    return out
+
+def _with_partitions(name: str, df: pd.DataFrame) -> pd.DataFrame:
+    spec = DATASETS[name]
+    if "year" in spec["partition_cols"] and "year" not in df:
+        df = df.assign(year=df[spec["date_col"]].astype(str).str[:4].astype(int))
+    return df
+
+def write(name: str, df: pd.DataFrame, root=DATA_DIR, fmt: str | None = None, append: bool = False) -> Path:
+    """Writes a dataset, replacing it, or with append=True adds one more chunk of rows to it."""
+    fmt = fmt or default_format()
+    if fmt == "csv":
+        path = csv_path(name, root)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(path, mode="a" if append else "w", header=not (append and path.exists()), index=False)
+        return path
+    import pyarrow as pa, pyarrow.parquet as pq
+    path = parquet_path(name, root)
+    if not append and path.exists():
+        import shutil; shutil.rmtree(path)
+    parts, df = DATASETS[name]["partition_cols"], _with_partitions(name, df)
+    # one file per hive partition, written directly: pyarrow's threaded dataset writer can abort the
+    # interpreter at exit after a scan, and plain write_table also keeps row order
+    stamp = f"part-{time.time_ns():020d}.parquet"
+    groups = df.groupby(parts, sort=False, dropna=False) if parts else [((), df)]
+    for key, group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        target = path.joinpath(*(f"{c}={quote(str(v), safe='')}" for c, v in zip(parts, key)))
+        target.mkdir(parents=True, exist_ok=True)
+        pq.write_table(pa.Table.from_pandas(group.drop(columns=parts), preserve_index=False), target / stamp)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def _expression(filters):
+    import pyarrow.dataset as ds
+    expr = None
+    for col, op, val in filters or []:
+        f = ds.field(col).isin(list(val)) if op == "in" else getattr(ds.field(col), f"__{OPS[op]}__")(val)
+        expr = f if expr is None else expr & f
+    return expr
+
+def _parquet_dataset(name: str, root):
+    import pyarrow.dataset as ds
+    return ds.dataset(parquet_path(name, root), format="parquet", partitioning="hive")
+
+def _columns(name: str, schema_names, columns):
+    # the derived year partition is an implementation detail unless asked for
+    derived = {"year"} if "date_col" in DATASETS[name] else set()
+    return list(columns) if columns is not None else [c for c in schema_names if c not in derived]
+
+def _to_pandas(table) -> pd.DataFrame:
+    df = table.to_pandas()
+    # hive partition values come back dictionary-encoded
+    for c in df.columns[df.dtypes == "category"]:
+        df[c] = df[c].astype(df[c].cat.categories.dtype)
+    return df
+
+def _usecols(name, columns, filters):
+    if columns is None: return None
+    wanted = {*columns, *(c for c, _, _ in filters or [])}
+    if "year" in wanted and "date_col" in DATASETS[name]: wanted |= {DATASETS[name]["date_col"]}
+    return sorted(wanted - {"year"})
+
+def _csv_frame(name, df, filters, columns) -> pd.DataFrame:
+    """CSV fallback: derive partitions, then apply `filters` in pandas (Parquet pushes them down instead)."""
+    df = _with_partitions(name, df) if "date_col" in DATASETS[name] else df
+    mask = np.ones(len(df), dtype=bool)
+    for col, op, val in filters or []:
+        mask &= (df[col].isin(list(val)) if op == "in" else getattr(df[col], f"__{OPS[op]}__")(val)).to_numpy()
+    return df.loc[mask, _columns(name, df.columns, columns)]
+
+def read(name: str, root=DATA_DIR, columns=None, filters=None) -> pd.DataFrame:
+    """Loads `columns` of the rows matching `filters` ([(col, op, value)], ANDed; ops ==, !=, <, <=, >, >=, in)."""
+    if has_pyarrow() and parquet_path(name, root).is_dir():
+        dataset = _parquet_dataset(name, root)
+        cols = _columns(name, dataset.schema.names, columns)
+        return _to_pandas(dataset.to_table(columns=cols, filter=_expression(filters)))
+    df = pd.read_csv(csv_path(name, root), usecols=_usecols(name, columns, filters))
+    return _csv_frame(name, df, filters, columns).reset_index(drop=True)
+
+def iter_batches(name: str, root=DATA_DIR, columns=None, filters=None, batch_rows: int = 1_000_000):
+    """Same as `read`, but yields DataFrames of at most `batch_rows` rows so memory stays bounded."""
+    if has_pyarrow() and parquet_path(name, root).is_dir():
+        dataset = _parquet_dataset(name, root)
+        cols = _columns(name, dataset.schema.names, columns)
+        for batch in dataset.to_batches(columns=cols, filter=_expression(filters), batch_size=batch_rows):
+            if batch.num_rows: yield _to_pandas(batch)
+        return
+    for chunk in pd.read_csv(csv_path(name, root), usecols=_usecols(name, columns, filters), chunksize=batch_rows):
+        chunk = _csv_frame(name, chunk, filters, columns)
+        if len(chunk): yield chunk
+
+def export_csv(name: str, root=DATA_DIR, dest=None) -> Path:
+    """Writes a Parquet dataset back out as its historical CSV file, batch by batch."""
+    dest = Path(dest) if dest else csv_path(name, root)
+    for i, batch in enumerate(iter_batches(name, root)):
+        batch.to_csv(dest, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return dest
+
+def import_csv(name: str, root=DATA_DIR, src=None, batch_rows: int = 1_000_000) -> Path:
+    """Converts a CSV file into the partitioned Parquet dataset."""
+    path = None
+    for i, chunk in enumerate(pd.read_csv(Path(src) if src else csv_path(name, root), chunksize=batch_rows)):
+        path = write(name, chunk, root, fmt="parquet", append=i > 0)
+    return path
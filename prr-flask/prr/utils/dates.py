@@ -0,0 +1,15 @@
+# request date parameters: parsed once at the route, so services only ever see valid YYYY-MM-DD strings
+import datetime as dt, re
+
+DEFAULT_AS_OF = "2014-12-31"
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+def parse_as_of(value) -> str:
+    """The `as_of` parameter as YYYY-MM-DD (DEFAULT_AS_OF when absent); ValueError if it is not such a date."""
+    if value is None: return DEFAULT_AS_OF
+    if isinstance(value, str) and _ISO_DATE.match(value):
+        try:
+            return dt.date.fromisoformat(value).isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"as_of must be a date as YYYY-MM-DD, got {value!r}")
@@ -1,16 +1,58 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from config import Config
 db = SQLAlchemy()
+def import_models():
+    """Registers every ORM table on Base.metadata and returns it."""
+    from prr.models.base import Base
+    from prr.models.employee import Employee
+    from prr.models.okr import OKR
+    from prr.models.project_activity import ProjectActivity
+    from prr.models.feedback360 import Feedback360
+    from prr.models.manager_review import ManagerReview
+    from prr.models.learning import LearningHistory
+    from prr.models.incidents import Incident
+    from prr.models.recognition import Recognition
+    from prr.models.competency import CompetencyFramework
+    from prr.models.catalog import Catalog
+    from prr.models.feature_store import FeatureMonthly
+    from prr.models.promotion_score import PromotionScore
+    from prr.models.mentor_assignment import MentorAssignment
+    return Base.metadata
+def sqlite_pragmas(memory: bool = False) -> list[str]:
+    """PRAGMAs run on every new SQLite connection (the seed script's raw sqlite3 ones included)."""
+    pragmas = [f"busy_timeout={Config.SQLITE_BUSY_TIMEOUT_MS}", f"synchronous={Config.SQLITE_SYNCHRONOUS}",
+               f"cache_size={-1024 * Config.SQLITE_CACHE_MB}", f"mmap_size={2**20 * Config.SQLITE_MMAP_MB}", "temp_store=MEMORY"]
+    # WAL: readers keep their snapshot while a writer commits; NORMAL sync is durable there except on power loss
+    if Config.SQLITE_WAL and not memory: pragmas.insert(0, "journal_mode=WAL")
+    return pragmas
+
+def apply_pragmas(dbapi_conn, pragmas: list[str]):
+    cur = dbapi_conn.cursor()
+    try:
+        for p in pragmas: cur.execute(f"PRAGMA {p}")
+    finally:
+        cur.close()
+
+def engine_options(uri: str) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database."""
+    if make_url(uri).get_backend_name() == "sqlite": return {}
+    return {"pool_size": Config.DB_POOL_SIZE, "max_overflow": Config.DB_MAX_OVERFLOW, "pool_recycle": Config.DB_POOL_RECYCLE,
+            "pool_timeout": Config.DB_POOL_TIMEOUT, "pool_pre_ping": True}
+
 def init_db(app):
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config["SQLALCHEMY_DATABASE_URI"]))
     db.init_app(app)
     with app.app_context():
-        from prr.models.employee import Employee
-        from prr.models.okr import OKR
-        from prr.models.project_activity import ProjectActivity
-        from prr.models.feedback360 import Feedback360
-        from prr.models.manager_review import ManagerReview
-        from prr.models.learning import LearningHistory
-        from prr.models.incidents import Incident
-        from prr.models.recognition import Recognition
-        from prr.models.competency import CompetencyFramework
-        from prr.models.catalog import Catalog
-        db.create_all()
+        if db.engine.dialect.name == "sqlite":
+            pragmas = sqlite_pragmas(memory=db.engine.url.database in (None, "", ":memory:"))
+            event.listen(db.engine, "connect", lambda conn, record: apply_pragmas(conn, pragmas))
+        # models live on their own declarative Base, not db.Model, so create them explicitly
+        import_models().create_all(db.engine)
+
+# SQLite caps bound parameters per statement; keep expanding IN lists well below it
+IN_CHUNK = 500
+def in_chunks(values: list, size: int = IN_CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
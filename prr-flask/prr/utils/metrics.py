@@ -0,0 +1,235 @@
+"""In-process metrics: per-stage duration histograms, SQL statement counts/time per stage, rows per stage.
+
+Rendered in Prometheus text format at /metrics (and written as a node_exporter textfile by the scripts).
+Under several worker processes (METRICS_DIR set), each worker dumps its registry to its own file there and
+/metrics adds the other workers' files to the live registry, so a scrape sees server-wide totals whichever
+worker answers it. Files of exited workers are kept, so counters never go backwards.
+With METRICS=0 `timed` returns the function untouched and `stage` a shared no-op context, so the hot path
+carries no instrumentation at all.
+"""
+import bisect, glob, json, os, threading, time
+from contextlib import nullcontext
+from functools import wraps
+from config import Config
+
+ENABLED = Config.METRICS
+# seconds; spans a cached dict lookup up to a full training pass
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+HELP = {
+    "prr_request_seconds": ("histogram", "HTTP request duration by endpoint"),
+    "prr_stage_seconds": ("histogram", "Duration of instrumented stages (features, model, recommender, seeding, training)"),
+    "prr_sql_seconds": ("histogram", "SQL statement duration by the stage that issued it"),
+    "prr_sql_queries_total": ("counter", "SQL statements executed, by the stage that issued them"),
+    "prr_stage_rows_total": ("counter", "Rows read or written by a stage"),
+}
+
+class Histogram:
+    __slots__ = ("counts", "sum")
+    def __init__(self):
+        self.counts, self.sum = [0] * (len(BUCKETS) + 1), 0.0
+    def observe(self, v: float):
+        self.counts[bisect.bisect_left(BUCKETS, v)] += 1
+        self.sum += v
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hist, self._counters = {}, {}
+
+    def observe(self, name: str, labels: tuple, value: float):
+        with self._lock:
+            h = self._hist.get((name, labels))
+            if h is None: h = self._hist[(name, labels)] = Histogram()
+            h.observe(value)
+
+    def inc(self, name: str, labels: tuple, value: float = 1):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._hist.clear(); self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """{(name, labels): Histogram | number} copy, for tests and reports."""
+        hist, counters = self.copy()
+        return {**hist, **counters}
+
+    def copy(self) -> tuple[dict, dict]:
+        """({(name, labels): (bucket counts, sum)}, {(name, labels): value})"""
+        with self._lock:
+            return {k: (list(h.counts), h.sum) for k, h in self._hist.items()}, dict(self._counters)
+
+    def render(self) -> str:
+        return render(*self.copy())
+
+def render(hist: dict, counters: dict) -> str:
+    lines = []
+    for name, (kind, text_) in HELP.items():
+        series = sorted((k, v) for k, v in (hist if kind == "histogram" else counters).items() if k[0] == name)
+        if not series: continue
+        lines += [f"# HELP {name} {text_}", f"# TYPE {name} {kind}"]
+        for (_, labels), v in series:
+            if kind == "counter":
+                lines.append(f"{name}{_labels(labels)} {_num(v)}")
+                continue
+            counts, total = v
+            running = 0
+            for le, c in zip([*BUCKETS, "+Inf"], counts):
+                running += c
+                lines.append(f"{name}_bucket{_labels(labels + (('le', str(le)),))} {running}")
+            lines += [f"{name}_sum{_labels(labels)} {_num(total)}", f"{name}_count{_labels(labels)} {running}"]
+    return "\n".join(lines) + "\n"
+
+def _labels(labels: tuple) -> str:
+    esc = lambda s: str(s).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels) + "}" if labels else ""
+
+def _num(v) -> str:
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+REGISTRY = Registry()
+_local = threading.local()   # .stack: open stage names; .timings: {stage: seconds} for Server-Timing, or absent
+
+def current_stage() -> str:
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else "other"
+
+class _Stage:
+    """Times one block; a plain class rather than @contextmanager, since it sits on the per-row scoring path."""
+    __slots__ = ("name", "t")
+    def __init__(self, name: str):
+        self.name = name
+    def __enter__(self):
+        stack = _local.__dict__.get("stack")
+        if stack is None: stack = _local.stack = []
+        stack.append(self.name)
+        self.t = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        dt = time.perf_counter() - self.t
+        _local.stack.pop()
+        REGISTRY.observe("prr_stage_seconds", (("stage", self.name),), dt)
+        timings = _local.__dict__.get("timings")
+        if timings is not None: timings[self.name] = timings.get(self.name, 0.0) + dt
+        return False
+
+_NULL = nullcontext()
+def stage(name: str):
+    """`with stage("features"):` times the block (and attributes its SQL) when metrics are enabled."""
+    return _Stage(name) if ENABLED else _NULL
+
+def timed(name: str):
+    """Decorator form of `stage`; a no-op (returns the function itself) when metrics are disabled."""
+    def wrap(fn):
+        if not ENABLED: return fn
+        @wraps(fn)
+        def inner(*args, **kwargs):
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+def add_rows(n: int):
+    """Counts rows read/written by the current stage."""
+    if ENABLED and n: REGISTRY.inc("prr_stage_rows_total", (("stage", current_stage()),), n)
+
+def instrument_engine(engine):
+    """Counts and times every SQL statement against the stage that issued it."""
+    from sqlalchemy import event
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("prr_sql_t", []).append(time.perf_counter())
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        dt = time.perf_counter() - conn.info["prr_sql_t"].pop()
+        labels = (("stage", current_stage()),)
+        REGISTRY.inc("prr_sql_queries_total", labels)
+        REGISTRY.observe("prr_sql_seconds", labels, dt)
+        timings = getattr(_local, "timings", None)
+        if timings is not None: timings["sql"] = timings.get("sql", 0.0) + dt
+
+_worker = {"pid": None, "file": None}   # this process's dump file under METRICS_DIR
+
+def _worker_file() -> str:
+    if _worker["pid"] != os.getpid():     # forked: a new worker gets its own file (and flusher)
+        # the start time keeps a recycled pid from overwriting an exited worker's totals
+        _worker.update(pid=os.getpid(), file=os.path.join(Config.METRICS_DIR, f"worker-{os.getpid()}-{time.time_ns()}.json"))
+        threading.Thread(target=_flush_loop, name="metrics-flush", daemon=True).start()
+    return _worker["file"]
+
+def flush():
+    """Dumps this worker's registry to its METRICS_DIR file."""
+    hist, counters = REGISTRY.copy()
+    path = _worker_file()
+    with open(f"{path}.tmp", "w") as f:
+        json.dump({"hist": [[n, l, c, s] for (n, l), (c, s) in hist.items()],
+                   "counters": [[n, l, v] for (n, l), v in counters.items()]}, f)
+    os.replace(f"{path}.tmp", path)
+
+def _flush_loop():
+    pid = os.getpid()
+    while _worker["pid"] == pid:
+        time.sleep(Config.METRICS_FLUSH_S)
+        try: flush()
+        except OSError: pass    # directory removed under us; retried on the next tick
+
+def collect() -> tuple[dict, dict]:
+    """The live registry plus every other worker's last dump (Registry.copy() format)."""
+    hist, counters = REGISTRY.copy()
+    if not Config.METRICS_DIR: return hist, counters
+    own = _worker_file()
+    for path in glob.glob(os.path.join(Config.METRICS_DIR, "worker-*.json")):
+        if path == own: continue
+        try:
+            with open(path) as f:
+                dump = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for name, labels, counts, total in dump["hist"]:
+            key = (name, tuple(map(tuple, labels)))
+            mine = hist.get(key, ([0] * len(counts), 0.0))
+            hist[key] = ([a + b for a, b in zip(mine[0], counts)], mine[1] + total)
+        for name, labels, value in dump["counters"]:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+    return hist, counters
+
+def init_app(app):
+    """Request histograms, the optional Server-Timing header and GET /metrics."""
+    if not ENABLED: return
+    from flask import Response, g, request
+    from prr.utils.db import db
+    with app.app_context():
+        instrument_engine(db.engine)
+
+    @app.before_request
+    def _start():
+        g.metrics_t0 = time.perf_counter()
+        if Config.METRICS_DIR and _worker["pid"] != os.getpid(): _worker_file()
+        if Config.SERVER_TIMING: _local.timings = {}
+
+    @app.after_request
+    def _finish(response):
+        dt = time.perf_counter() - g.pop("metrics_t0", time.perf_counter())
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        REGISTRY.observe("prr_request_seconds", (("endpoint", endpoint), ("method", request.method), ("status", str(response.status_code))), dt)
+        timings = _local.__dict__.pop("timings", None)
+        if timings is not None:
+            parts = [f"{k.replace('.', '-')};dur={v * 1000:.3f}" for k, v in timings.items()]
+            response.headers["Server-Timing"] = ", ".join([*parts, f"total;dur={dt * 1000:.3f}"])
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(render(*collect()), mimetype="text/plain; version=0.0.4")
+
+def write_textfile(path: str | None = None) -> str | None:
+    """Writes the registry for node_exporter's textfile collector (METRICS_TEXTFILE); returns the path written."""
+    path = path or Config.METRICS_TEXTFILE
+    if not ENABLED or not path: return None
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp, path)   # the collector never reads a half-written file
+    return path
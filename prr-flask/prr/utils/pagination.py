@@ -1 +1,28 @@
-# pagination helpers (optional)
+# keyset (seek) pagination: the cursor is the sort key of the last row served, so every page is an index range read
+import base64, json
+
+def encode_cursor(values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values), separators=(",", ":")).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, n: int) -> list:
+    """Sort-key values from a cursor; ValueError if it is malformed or has the wrong arity."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(values, list) or len(values) != n: raise ValueError("invalid cursor")
+    return values
+
+def keyset_clause(columns: list[str], descending: bool = True, prefix: str = "after") -> str:
+    """Row-value predicate selecting rows strictly past the cursor for ORDER BY columns (all in one direction)."""
+    params = ", ".join(f":{prefix}_{i}" for i in range(len(columns)))
+    return f"({', '.join(columns)}) {'<' if descending else '>'} ({params})"
+
+def cursor_params(values: list, prefix: str = "after") -> dict:
+    return {f"{prefix}_{i}": v for i, v in enumerate(values)}
+
+def page(rows: list, limit: int, key) -> tuple[list, str | None]:
+    """Splits a limit+1 fetch into the page and the cursor for the next one (None on the last page)."""
+    if len(rows) <= limit: return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(key(rows[-1]))
@@ -0,0 +1,87 @@
+from sqlalchemy import inspect, text, bindparam
+from sqlalchemy.exc import IntegrityError
+from prr.utils.db import import_models
+
+class QueryPlanError(RuntimeError):
+    """A hot-path query would scan a whole table instead of using an index."""
+
+def migrate(engine) -> list[str]:
+    """Brings an existing database up to the ORM schema: missing tables, then missing indexes.
+
+    Only additive DDL is issued, so it is safe to re-run against a live database.
+    """
+    metadata = import_models()
+    insp = inspect(engine)
+    existing = set(insp.get_table_names())
+    applied = []
+    for table in metadata.sorted_tables:
+        if table.name not in existing:
+            table.create(engine)
+            applied.append(f"create table {table.name}")
+            continue
+        have = {ix["name"] for ix in insp.get_indexes(table.name)}
+        cols = {c["name"] for c in insp.get_columns(table.name)}
+        # tables created by pandas.to_sql carry the key columns but no primary key
+        pk = [c.name for c in table.primary_key.columns]
+        pk_name = f"ix_{table.name}_{'_'.join(pk)}"
+        if pk and pk_name not in have and set(pk) <= cols and insp.get_pk_constraint(table.name)["constrained_columns"] != pk:
+            with engine.begin() as conn:
+                conn.execute(text(f"CREATE INDEX {pk_name} ON {table.name} ({', '.join(pk)})"))
+            applied.append(f"create index {pk_name}")
+        for ix in table.indexes:
+            if ix.name in have: continue
+            missing = [c.name for c in ix.columns if c.name not in cols]
+            if missing:
+                applied.append(f"skip index {ix.name}: {table.name} lacks {', '.join(missing)}")
+                continue
+            try:
+                ix.create(engine)
+            except IntegrityError:
+                # a natural-key index over rows that already contain duplicates; leave it for the operator
+                applied.append(f"skip index {ix.name}: {table.name} has duplicate keys")
+                continue
+            applied.append(f"create index {ix.name}")
+    if applied and engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+    return applied
+
+def hot_path_queries() -> dict[str, tuple[str, dict]]:
+    """Queries run on every scoring request, with representative parameters."""
+    from prr.services.feature_store import SOURCES, source_sql, lookup_sql
+    queries = {f"features:{t}": (source_sql(t), {"eids": [1, 2], "until": "2014-12-31"}) for t in SOURCES}
+    queries["features:partial_month"] = (source_sql("project_activity", since=True), {"eids": [1], "since": "2014-06-01", "until": "2014-06-15"})
+    queries["feature_store:lookup"] = (lookup_sql(), {"eids": [1, 2], "month": "2014-12"})
+    queries["employee:by_id"] = ("SELECT name, org_unit FROM employee WHERE id=:eid", {"eid": 1})
+    queries["employee:by_org_unit"] = ("SELECT id, name FROM employee WHERE org_unit=:org", {"org": "Finance"})
+    page = ("SELECT employee_id FROM promotion_scores WHERE as_of=:as_of{} AND (readiness_score, employee_id) < (:s, :e) "
+            "ORDER BY readiness_score DESC, employee_id DESC LIMIT 50")
+    queries["leaderboard:page"] = (page.format(""), {"as_of": "2014-12-31", "s": 0.9, "e": 10})
+    queries["leaderboard:org_unit_page"] = (page.format(" AND org_unit=:org"), {"as_of": "2014-12-31", "org": "Finance", "s": 0.9, "e": 10})
+    return queries
+
+def _table_scans(conn, sql: str, params: dict, tables: set[str]) -> list[str]:
+    sqlite = conn.dialect.name == "sqlite"
+    stmt = text(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + sql)
+    if "eids" in params: stmt = stmt.bindparams(bindparam("eids", expanding=True))
+    if sqlite:
+        details = [r[-1] for r in conn.execute(stmt, params)]
+        # "SCAN <table>" without an index is a full table scan; SEARCH/COVERING INDEX are fine
+        return [d for d in details if d.startswith("SCAN ") and d.split()[1] in tables and "INDEX" not in d]
+    with conn.begin():
+        # small tables make seq scans legitimately cheaper; ask whether an index is usable at all
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        details = [r[0] for r in conn.execute(stmt, params)]
+    return [d.strip() for d in details if "Seq Scan on" in d]
+
+def check_query_plans(engine) -> list[str]:
+    """Raises QueryPlanError if any hot-path query plans a full table scan; returns the queries checked."""
+    tables = set(inspect(engine).get_table_names())
+    bad, queries = {}, hot_path_queries()
+    with engine.connect() as conn:
+        for name, (sql, params) in queries.items():
+            scans = _table_scans(conn, sql, params, tables)
+            if scans: bad[name] = scans
+    if bad:
+        raise QueryPlanError("; ".join(f"{name}: {', '.join(scans)}" for name, scans in bad.items()))
+    return list(queries)
@@ -0,0 +1,135 @@
+# Endpoint latency benchmark over throwaway SQLite databases seeded at several scales.
+#   python scripts/bench_endpoints.py                                       # 500 and 10000 employees, compared with the baseline
+#   python scripts/bench_endpoints.py --scales 100000 --save-baseline       # (re-)record a scale into the baseline
+# Each scale runs in its own interpreter (Config reads DATABASE_URL at import). Databases are cached in --workdir.
+import argparse, json, os, random, statistics, subprocess, sys, tempfile, time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+BASELINE = ROOT / "scripts" / "bench_baseline.json"
+AS_OF = "2014-12-31"
+
+def _pct(values: list[float], q: float) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q / 100 * (len(s) - 1))))]
+
+def cases(n_employees: int, batch: int, rng: random.Random) -> dict:
+    """endpoint name -> zero-arg callable building (method, url, json body) for one request."""
+    eid = lambda: rng.randint(1, n_employees)
+    ids = lambda: rng.sample(range(1, n_employees + 1), min(batch, n_employees))
+    return {
+        "score": lambda: ("POST", "/v1/promotion/score", {"employee_id": eid(), "as_of": AS_OF}),
+        "score:batch": lambda: ("POST", "/v1/promotion/score:batch", {"employee_ids": ids(), "as_of": AS_OF}),
+        "plan": lambda: ("POST", "/v1/plan/recommend", {"employee_id": eid(), "as_of": AS_OF}),
+        "explain": lambda: ("GET", f"/v1/explain/local?employee_id={eid()}&as_of={AS_OF}", None),
+        "explain:batch": lambda: ("POST", "/v1/explain/local:batch", {"employee_ids": ids()[:20], "as_of": AS_OF}),
+        "leaderboard": lambda: ("GET", f"/v1/promotion/leaderboard?limit=50&as_of={AS_OF}", None),
+    }
+
+def worker(n_employees: int, requests: int, batch: int, warmup: int, seed: int) -> dict:
+    """Runs inside the scale's interpreter: drives every endpoint through the Flask test client."""
+    sys.path.insert(0, str(ROOT))
+    from sqlalchemy import event
+    from app import app
+    from prr.utils.db import db
+    from prr.utils.cache import readiness_cache
+    from prr.services.leaderboard import LeaderboardService
+    client, rng, out = app.test_client(), random.Random(seed), {}
+    statements = []
+    with app.app_context():
+        LeaderboardService.refresh(AS_OF, force=True)
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(1))
+    for name, build in cases(n_employees, batch, rng).items():
+        lat, sql = [], []
+        for i in range(warmup + requests):
+            method, url, body = build()
+            readiness_cache.clear()   # measure the uncached path; cache hits are not what regresses
+            del statements[:]
+            t = time.perf_counter()
+            r = client.open(url, method=method, json=body)
+            dt = time.perf_counter() - t
+            if r.status_code != 200: raise RuntimeError(f"{name}: {r.status_code} {r.get_data(as_text=True)[:200]}")
+            if i >= warmup:
+                lat.append(dt * 1000)
+                sql.append(len(statements))
+        out[name] = {"p50_ms": round(_pct(lat, 50), 3), "p95_ms": round(_pct(lat, 95), 3), "p99_ms": round(_pct(lat, 99), 3),
+                     "mean_ms": round(statistics.fmean(lat), 3), "rps": round(1000 * len(lat) / sum(lat), 1),
+                     "sql_per_request": round(statistics.fmean(sql), 2), "requests": len(lat)}
+    return out
+
+def build_db(path: Path, n_employees: int, env: dict):
+    """Seeds a database with the existing seed script (CSV employees plus synthetic clones beyond 500)."""
+    if path.exists(): return
+    tmp = path.with_suffix(".tmp")
+    tmp.unlink(missing_ok=True)
+    subprocess.run([sys.executable, "scripts/seed_all_from_csv.py", "--employees", str(n_employees)], cwd=ROOT, check=True,
+                   env={**env, "DATABASE_URL": f"sqlite:///{tmp}"}, stdout=subprocess.DEVNULL)
+    tmp.rename(path)
+
+def run_scale(n_employees: int, args, env: dict) -> dict:
+    db = Path(args.workdir) / f"bench_{n_employees}.db"
+    t = time.perf_counter()
+    build_db(db, n_employees, env)
+    seeded_s = time.perf_counter() - t
+    cmd = [sys.executable, __file__, "--worker", "--scales", str(n_employees), "--requests", str(args.requests),
+           "--batch-size", str(args.batch_size), "--warmup", str(args.warmup), "--seed", str(args.seed)]
+    p = subprocess.run(cmd, cwd=ROOT, env={**env, "DATABASE_URL": f"sqlite:///{db}"}, capture_output=True, text=True)
+    if p.returncode: raise RuntimeError(f"scale {n_employees} failed:\n{p.stderr[-2000:]}")
+    return {"seed_s": round(seeded_s, 1), "endpoints": json.loads(p.stdout.strip().splitlines()[-1])}
+
+def regressions(current: dict, baseline: dict, threshold: float, floor_ms: float) -> list[str]:
+    """p95 slower than baseline by more than `threshold` (and `floor_ms`), more SQL statements per request, or a
+    measurement the baseline has nothing to compare with."""
+    found = []
+    for scale, res in current.items():
+        for name, m in res["endpoints"].items():
+            b = baseline.get(scale, {}).get("endpoints", {}).get(name)
+            if b is None:
+                found.append(f"{scale} {name}: not in the baseline (record it with --save-baseline)")
+                continue
+            if m["p95_ms"] > b["p95_ms"] * (1 + threshold) and m["p95_ms"] - b["p95_ms"] > floor_ms:
+                found.append(f"{scale} {name}: p95 {b['p95_ms']:.2f} -> {m['p95_ms']:.2f} ms")
+            if m["sql_per_request"] > b["sql_per_request"]:
+                found.append(f"{scale} {name}: SQL/request {b['sql_per_request']} -> {m['sql_per_request']}")
+    return found
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the API endpoints at several database scales")
+    ap.add_argument("--scales", type=int, nargs="+", default=[500, 10_000], help="employee counts")
+    ap.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    ap.add_argument("--warmup", type=int, default=10)
+    ap.add_argument("--batch-size", type=int, default=100, help="employees per score:batch request")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "prr-bench"), help="where seeded DBs are cached")
+    ap.add_argument("--baseline", default=str(BASELINE))
+    ap.add_argument("--save-baseline", action="store_true", help="record these scales in the baseline")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed p95 slowdown vs the baseline (fraction)")
+    ap.add_argument("--floor-ms", type=float, default=1.0, help="ignore p95 slowdowns smaller than this")
+    ap.add_argument("--out", default=None, help="also write the results to this JSON file")
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.worker:
+        print(json.dumps(worker(args.scales[0], args.requests, args.batch_size, args.warmup, args.seed)))
+        return
+    Path(args.workdir).mkdir(parents=True, exist_ok=True)
+    # one scoring thread, no startup preload: numbers should reflect the request path only
+    env = {**os.environ, "PRELOAD_MODEL": "0", "OMP_NUM_THREADS": os.getenv("OMP_NUM_THREADS", "1")}
+    results = {str(n): run_scale(n, args, env) for n in args.scales}
+    print(json.dumps(results, indent=2))
+    if args.out: Path(args.out).write_text(json.dumps(results, indent=2))
+    if args.save_baseline:
+        # merged, so re-recording one scale keeps the others
+        saved = json.loads(Path(args.baseline).read_text()) if Path(args.baseline).exists() else {}
+        Path(args.baseline).write_text(json.dumps({**saved, **results}, indent=2))
+        print(f"Saved baseline to {args.baseline}")
+        return
+    if not Path(args.baseline).exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+        return
+    found = regressions(results, json.loads(Path(args.baseline).read_text()), args.threshold, args.floor_ms)
+    for line in found: print("REGRESSION", line)
+    if found: sys.exit(1)
+    print("No regressions against", args.baseline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Cold-start and per-worker memory benchmark: app import, first requests, and gunicorn with/without preload.
+#   python scripts/bench_startup.py --workers 4 --out startup.json
+import argparse, json, os, signal, socket, statistics, subprocess, sys, time, urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+HEAVY = ["pandas", "pyarrow", "sklearn", "scipy", "lightgbm", "shap", "joblib"]
+
+IMPORT_PROBE = """
+import time, sys, resource, json
+t = time.perf_counter()
+import app
+out = {"import_s": time.perf_counter() - t}
+c = app.app.test_client()
+for name, call in [("health", lambda: c.get("/v1/ingest/health")),
+                   ("score", lambda: c.post("/v1/promotion/score", json={"employee_id": %d}))]:
+    t = time.perf_counter(); r = call()
+    out[f"first_{name}_s"], out[f"first_{name}_status"] = time.perf_counter() - t, r.status_code
+    if name == "health": out["heavy_after_health"] = [m for m in %r if m in sys.modules]
+out["maxrss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(out))
+"""
+
+def in_process(employee_id: int, repeat: int, env: dict) -> dict:
+    runs = []
+    for _ in range(repeat):
+        p = subprocess.run([sys.executable, "-c", IMPORT_PROBE % (employee_id, HEAVY)], cwd=ROOT, env=env,
+                           capture_output=True, text=True, check=True)
+        runs.append(json.loads(p.stdout.strip().splitlines()[-1]))
+    out = {k: round(statistics.median(r[k] for r in runs), 4) for k in runs[0] if k.endswith(("_s", "_mb"))}
+    return {**out, **{k: runs[0][k] for k in runs[0] if k not in out}}
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _get(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=2) as r: return r.status
+    except urllib.error.HTTPError as e: return e.code
+    except OSError: return 0
+
+def gunicorn(workers: int, preload: bool, env: dict, timeout: float = 120.0) -> dict:
+    """Seconds until /ready answers 200 on every worker, then per-worker USS/PSS (unique/proportional set size)."""
+    import psutil
+    port = _free_port()
+    env = {**env, "PRELOAD_APP": "1" if preload else "0", "PRELOAD_MODEL": "1", "WEB_CONCURRENCY": str(workers),
+           "BIND": f"127.0.0.1:{port}"}
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:application"],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        master, ready_s = psutil.Process(proc.pid), None
+        while time.perf_counter() - t0 < timeout:
+            kids = master.children()
+            # every worker has its own accept loop; a streak of 200s across them means all are warm
+            if len(kids) == workers and all(_get(f"http://127.0.0.1:{port}/ready") == 200 for _ in range(3 * workers)):
+                ready_s = time.perf_counter() - t0
+                break
+            time.sleep(0.05)
+        mem = [k.memory_full_info() for k in master.children()]
+        m = master.memory_full_info()
+        mb = lambda v: round(v / 2**20, 1)
+        return {"preload": preload, "workers": workers, "ready_s": round(ready_s, 3) if ready_s else None,
+                "master_rss_mb": mb(m.rss), "worker_rss_mb": [mb(x.rss) for x in mem],
+                "worker_uss_mb": [mb(x.uss) for x in mem], "worker_pss_mb": [mb(x.pss) for x in mem],
+                "total_pss_mb": mb(m.pss + sum(x.pss for x in mem))}
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(30)
+
+def main():
+    ap = argparse.ArgumentParser(description="Measure cold start and per-worker memory")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=3, help="fresh interpreters for the import/first-request timings")
+    ap.add_argument("--employee-id", type=int, default=1, help="employee scored by the first-score probe")
+    ap.add_argument("--skip-gunicorn", action="store_true")
+    ap.add_argument("--out", default=None, help="also write the results to this JSON file")
+    args = ap.parse_args()
+    env = {**os.environ, "PRELOAD_MODEL": "0"}
+    result = {"in_process": in_process(args.employee_id, args.repeat, env)}
+    if not args.skip_gunicorn:
+        result["gunicorn"] = [gunicorn(args.workers, preload, env) for preload in (False, True)]
+    print(json.dumps(result, indent=2))
+    if args.out: Path(args.out).write_text(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+# Backfills the monthly feature store (feature_monthly) from the activity tables.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import create_app
+from prr.services.feature_store import FeatureStore
+app = create_app()
+with app.app_context():
+    n = FeatureStore.rebuild()
+    print(f"✓ Built feature_monthly ({n:,} rows)")
@@ -1,122 +1,180 @@
-# Generates 2005-2014 monthly aggregates, features, labels.
+# Generates monthly aggregates, features and labels (2005-2014 by default) for any number of employees.
 import numpy as np, pandas as pd
 from pathlib import Path
-import argparse, datetime as dt
+import argparse, sys
 
-ap = argparse.ArgumentParser()
-ap.add_argument("--full-tasks", action="store_true", help="Also write massive per-task CSV (10 tasks/day)")
-args = ap.parse_args()
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from prr.utils import datasets
 
-DATA = Path("data"); DATA.mkdir(parents=True, exist_ok=True)
-np.random.seed(123)
-N_EMP = 500
 ORG_UNITS = ["IT","Engineering","Sales","HR","Finance","Marketing","Operations","Software Development"]
+# per org unit: velocity per task (mean, sd), quality (mean, sd), customer impact per task (mean)
+ORG_PARAMS = np.array([
+    (1.0,0.5,0.84,0.06,2.0),   # IT
+    (1.2,0.6,0.86,0.06,2.0),   # Engineering
+    (1.8,0.7,0.80,0.07,2.4),   # Sales
+    (0.9,0.5,0.85,0.05,1.9),   # HR
+    (0.8,0.5,0.87,0.05,1.8),   # Finance
+    (0.9,0.5,0.84,0.06,2.0),   # Marketing
+    (1.1,0.5,0.83,0.06,2.1),   # Operations
+    (1.3,0.6,0.86,0.06,2.2),   # Software Development
+])
+MONTHLY_COLS = ["employee_id","year_month","org_unit","tasks","hours","velocity",
+                "quality_mean","on_time_ratio","customer_impact"]
+FSET = datasets.FEATURES
+TASK_COLS = ["employee_id","date","task_id","project_id","hours","velocity","quality","on_time","impact"]
+TASKS_PER_DAY = 10
 
-# employees
-emp = pd.DataFrame({
-    "employee_id": np.arange(1, N_EMP+1),
-    "name": [f"Emp {i:03d}" for i in range(1, N_EMP+1)],
-    "org_unit": np.random.choice(ORG_UNITS, size=N_EMP),
-    "current_rank": np.random.choice(["IC","Senior","Lead","Manager"], size=N_EMP, p=[0.55,0.28,0.12,0.05]),
-    "last_promotion_date": np.random.choice(pd.date_range("2007-01-01","2013-12-31",freq="D").astype(str), size=N_EMP)
-})
-emp.to_csv(DATA/"employees_500.csv", index=False)
+def employees(n, months, rng):
+    # promotions fall after the first two years and before the last one, as in the original 2007-2013 window
+    lo = months[min(24, len(months) - 1)].start_time
+    hi = months[max(len(months) - 13, 0)].end_time.normalize()
+    if lo > hi: lo, hi = months[0].start_time, months[-1].end_time.normalize()
+    days = pd.date_range(lo, hi, freq="D")
+    ids = np.arange(1, n + 1)
+    return pd.DataFrame({
+        "employee_id": ids,
+        "name": np.char.add("Emp ", np.char.zfill(ids.astype(str), 3)),
+        "org_unit": rng.choice(ORG_UNITS, size=n),
+        "current_rank": rng.choice(["IC","Senior","Lead","Manager"], size=n, p=[0.55,0.28,0.12,0.05]),
+        "last_promotion_date": days[rng.integers(0, len(days), n)].strftime("%Y-%m-%d"),
+    })
 
-# monthly activity
-months = pd.period_range("2005-01-01","2014-12-31",freq="M")
-rows = []
-rng = np.random.default_rng(42)
-org_params = {
-    "Sales":(1.8,0.7,0.80,0.07,2.4),
-    "Engineering":(1.2,0.6,0.86,0.06,2.0),
-    "Software Development":(1.3,0.6,0.86,0.06,2.2),
-    "IT":(1.0,0.5,0.84,0.06,2.0),
-    "Operations":(1.1,0.5,0.83,0.06,2.1),
-    "Marketing":(0.9,0.5,0.84,0.06,2.0),
-    "Finance":(0.8,0.5,0.87,0.05,1.8),
-    "HR":(0.9,0.5,0.85,0.05,1.9)
-}
-for _, e in emp.iterrows():
-    p = org_params[e["org_unit"]]
-    for m in months:
-        dim = m.to_timestamp(how='end').day
-        tasks = 10 * dim
-        vel = max(0, rng.normal(p[0], p[1])) * tasks
-        qual = float(np.clip(rng.normal(p[2], p[3]), 0, 1))
-        ontime = float(np.clip(rng.normal(0.90, 0.05), 0, 1))
-        impact = np.clip(rng.normal(p[4], 0.8), 0, 5) * tasks
-        hours_task = rng.uniform(1.0,2.0)
-        rows.append([
-            int(e["employee_id"]), str(m), e["org_unit"], tasks,
-            round(hours_task*tasks,1), int(vel), round(qual,3),
-            round(ontime,3), int(np.clip(impact,0,5*tasks))
-        ])
-monthly = pd.DataFrame(rows, columns=[
-    "employee_id","year_month","org_unit","tasks","hours","velocity",
-    "quality_mean","on_time_ratio","customer_impact"
-])
-monthly.to_csv(DATA/"monthly_activity_2005_2014.csv", index=False)
+def monthly_block(emp, months, rng):
+    """(employees x months) activity arrays for one block of employees, plus the long-format frame."""
+    e, m = len(emp), len(months)
+    p = ORG_PARAMS[pd.Categorical(emp["org_unit"], categories=ORG_UNITS).codes][:, None, :]
+    tasks = np.broadcast_to(TASKS_PER_DAY * months.days_in_month.to_numpy(), (e, m))
+    vel = (np.maximum(0, rng.normal(p[..., 0], p[..., 1], (e, m))) * tasks).astype(int)
+    qual = np.clip(rng.normal(p[..., 2], p[..., 3], (e, m)), 0, 1).round(3)
+    ontime = np.clip(rng.normal(0.90, 0.05, (e, m)), 0, 1).round(3)
+    impact = np.clip(np.clip(rng.normal(p[..., 4], 0.8, (e, m)), 0, 5) * tasks, 0, 5 * tasks).astype(int)
+    hours = (rng.uniform(1.0, 2.0, (e, m)) * tasks).round(1)
+    arrays = {"tasks": tasks, "hours": hours, "velocity": vel, "quality_mean": qual,
+              "on_time_ratio": ontime, "customer_impact": impact}
+    frame = pd.DataFrame({
+        "employee_id": np.repeat(emp["employee_id"].to_numpy(), m),
+        "year_month": np.tile(months.astype(str).to_numpy(), e),
+        "org_unit": np.repeat(emp["org_unit"].to_numpy(), m),
+        **{k: v.ravel() for k, v in arrays.items()},
+    })
+    return arrays, frame[MONTHLY_COLS]
+
+def since_promotion(emp, months, arrays):
+    """Activity totals/means over the months ending on or after each employee's last promotion."""
+    ends = months.to_timestamp(how="end").to_numpy()
+    mask = ends[None, :] >= pd.to_datetime(emp["last_promotion_date"]).to_numpy()[:, None]
+    n = mask.sum(1)
+    total = lambda k: np.where(mask, arrays[k], 0).sum(1)
+    feat = pd.DataFrame({
+        "employee_id": emp["employee_id"].to_numpy(),
+        "hours_total": total("hours"),
+        "velocity_total": total("velocity"),
+        "on_time_ratio": total("on_time_ratio") / np.maximum(n, 1),
+        "quality_mean": total("quality_mean") / np.maximum(n, 1),
+        "impact_total": total("customer_impact"),
+        "tasks_total": total("tasks"),
+    })
+    return feat[n > 0]
+
+def training_features(feat, rng):
+    feat = feat.copy()
+    feat["recognitions"] = rng.poisson(lam=np.clip(feat["impact_total"]/feat["tasks_total"]/1.5, 0.2, 5.0))
+    feat["feedback_mean"] = np.clip(rng.normal(4.1, 0.3, size=len(feat)), 3.0, 5.0)
+    feat["incidents_weight"] = rng.choice([0,1,2,4], size=len(feat), p=[0.78,0.15,0.06,0.01])
+    feat["courses_completed"] = rng.poisson(lam=2.6, size=len(feat))
+    def nz_norm(s):
+        s = s.astype(float); return (s - s.min())/(s.max()-s.min()+1e-9)
+    feat["okr_attainment"] = np.clip(
+        0.75 + 0.2 * nz_norm(feat["velocity_total"]) + 0.03*rng.standard_normal(len(feat)),
+        0, 1.2
+    )
+    return feat[["employee_id"] + FSET].reset_index(drop=True)
+
+def labels(train_df, as_of):
+    # labels top-20%
+    comp = (0.22*train_df['okr_attainment'] + 0.18*(train_df['feedback_mean']/5.0) +
+            0.12*train_df['recognitions'] + 0.12*train_df['courses_completed'] +
+            0.12*train_df['on_time_ratio'] + 0.12*train_df['quality_mean'] +
+            0.07*train_df['velocity_total'] + 0.05*train_df['impact_total'] -
+            0.12*(train_df['incidents_weight']>0).astype(int))
+    q = float(comp.quantile(0.8))
+    return pd.DataFrame({
+        "employee_id": train_df["employee_id"],
+        "as_of": as_of,
+        "readiness_score": comp.round(3),
+        "decision": np.where(comp >= q, "PROMOTE", np.where(comp >= q - 0.05, "BORDERLINE", "HOLD")),
+        "label": (comp >= q).astype(int),
+    })
+
+def task_chunks(n_emp, first_day, last_day, chunk_rows, seed=1234):
+    """Per-task rows (10 per employee per day) as DataFrames of at most ~chunk_rows rows each."""
+    rng = np.random.default_rng(seed)
+    days = np.arange(np.datetime64(first_day, "D"), np.datetime64(last_day, "D") + 1)
+    emp_block = max(1, min(n_emp, chunk_rows // TASKS_PER_DAY))
+    day_block = max(1, chunk_rows // (emp_block * TASKS_PER_DAY))
+    for d0 in range(0, len(days), day_block):
+        d = days[d0:d0 + day_block]
+        for e0 in range(1, n_emp + 1, emp_block):
+            eids = np.arange(e0, min(e0 + emp_block, n_emp + 1))
+            per_day = len(eids) * TASKS_PER_DAY
+            n = len(d) * per_day
+            eid = np.tile(np.repeat(eids, TASKS_PER_DAY), len(d))
+            yield pd.DataFrame({
+                "employee_id": eid,
+                "date": np.repeat(np.datetime_as_string(d, unit="D"), per_day),
+                "task_id": np.tile(np.arange(1, TASKS_PER_DAY + 1), len(d) * len(eids)),
+                "project_id": np.char.add("P", ((eid % 50) + 1).astype(str)),
+                "hours": rng.uniform(0.3, 1.2, n).round(2),
+                "velocity": rng.integers(0, 3, n),
+                "quality": rng.uniform(0.6, 1.0, n).round(2),
+                "on_time": rng.integers(0, 2, n),
+                "impact": rng.integers(0, 6, n),
+            }, columns=TASK_COLS)
+
+def write_tasks(out_dir, n_emp, first_day, last_day, fmt="csv", chunk_rows=1_000_000):
+    """Streams full_project_tasks chunk by chunk, so memory stays bounded by `chunk_rows`."""
+    out, rows = None, 0
+    for i, chunk in enumerate(task_chunks(n_emp, first_day, last_day, chunk_rows)):
+        out = datasets.write("full_project_tasks", chunk, out_dir, fmt, append=i > 0)
+        rows += len(chunk)
+    return out, rows
 
-# features since last promotion
-emp["last_promotion_date"] = pd.to_datetime(emp["last_promotion_date"])
-monthly["period_end"] = pd.PeriodIndex(monthly["year_month"], freq="M").to_timestamp(how="end")
-monthly["period_end"] = pd.to_datetime(monthly["period_end"])
-j = monthly.merge(emp[["employee_id","org_unit","current_rank","last_promotion_date"]],
-                  on=["employee_id","org_unit"], how="left")
-mask = (j["period_end"] >= j["last_promotion_date"]) & (j["period_end"] <= pd.Timestamp("2014-12-31"))
-j = j[mask]
-feat = j.groupby("employee_id", as_index=False).agg(
-    hours_total=("hours","sum"),
-    velocity_total=("velocity","sum"),
-    on_time_ratio=("on_time_ratio","mean"),
-    quality_mean=("quality_mean","mean"),
-    impact_total=("customer_impact","sum"),
-    tasks_total=("tasks","sum")
-)
-feat["recognitions"] = np.random.poisson(lam=np.clip(feat["impact_total"]/feat["tasks_total"]/1.5, 0.2, 5.0))
-feat["feedback_mean"] = np.clip(np.random.normal(4.1, 0.3, size=len(feat)), 3.0, 5.0)
-feat["incidents_weight"] = np.random.choice([0,1,2,4], size=len(feat), p=[0.78,0.15,0.06,0.01])
-feat["courses_completed"] = np.random.poisson(lam=2.6, size=len(feat))
-def nz_norm(s):
-    s = s.astype(float); return (s - s.min())/(s.max()-s.min()+1e-9)
-feat["okr_attainment"] = np.clip(
-    0.75 + 0.2 * nz_norm(feat["velocity_total"]) + 0.03*np.random.randn(len(feat)),
-    0, 1.2
-)
-FSET = ["okr_attainment","feedback_mean","recognitions","courses_completed",
-        "on_time_ratio","quality_mean","velocity_total","impact_total","incidents_weight"]
-train_df = feat[["employee_id"] + FSET].copy()
-train_df.to_csv(DATA/"training_features_2005_2014.csv", index=False)
+def generate(out_dir, n_emp=500, start="2005-01", end="2014-12", block=10_000, seed=123, fmt="csv"):
+    out_dir = Path(out_dir); out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    months = pd.period_range(start, end, freq="M")
+    emp = employees(n_emp, months, rng)
+    datasets.write("employees", emp, out_dir, fmt)
+    # monthly activity, generated and written one block of employees at a time
+    feats = []
+    for b in range(0, n_emp, block):
+        part = emp.iloc[b:b + block]
+        arrays, frame = monthly_block(part, months, rng)
+        datasets.write("monthly_activity", frame, out_dir, fmt, append=b > 0)
+        feats.append(since_promotion(part, months, arrays))
+    train_df = training_features(pd.concat(feats, ignore_index=True), rng)
+    datasets.write("training_features", train_df, out_dir, fmt)
+    datasets.write("promotion_labels", labels(train_df, str(months[-1].end_time.date())), out_dir, fmt)
+    return emp, months
 
-# labels top-20%
-comp = (0.22*train_df['okr_attainment'] + 0.18*(train_df['feedback_mean']/5.0) +
-        0.12*train_df['recognitions'] + 0.12*train_df['courses_completed'] +
-        0.12*train_df['on_time_ratio'] + 0.12*train_df['quality_mean'] +
-        0.07*train_df['velocity_total'] + 0.05*train_df['impact_total'] -
-        0.12*(train_df['incidents_weight']>0).astype(int))
-q = float(comp.quantile(0.8))
-labels = (comp >= q).astype(int)
-lbl = pd.DataFrame({
-    "employee_id":train_df["employee_id"],
-    "as_of":"2014-12-31",
-    "readiness_score":comp.round(3),
-    "decision":[ "PROMOTE" if c>=q else ("BORDERLINE" if c>=q-0.05 else "HOLD") for c in comp ],
-    "label": labels
-})
-lbl.to_csv(DATA/"promotion_labels_2014.csv", index=False)
+def main():
+    ap = argparse.ArgumentParser(description="Generate synthetic employees, monthly activity, features and labels")
+    ap.add_argument("--employees", type=int, default=500)
+    ap.add_argument("--start", default="2005-01", help="first month (YYYY-MM)")
+    ap.add_argument("--end", default="2014-12", help="last month (YYYY-MM); labels are as of its last day")
+    ap.add_argument("--out", default="data", help="output directory (file names are kept for the seed/train scripts)")
+    ap.add_argument("--full-tasks", action="store_true", help="Also write the massive per-task file (10 tasks/day)")
+    ap.add_argument("--format", choices=["csv", "parquet"], default=datasets.default_format(),
+                    help="parquet (partitioned by year/org_unit; default when pyarrow is installed) or csv")
+    ap.add_argument("--chunk-rows", type=int, default=1_000_000, help="rows per written task chunk / row group")
+    args = ap.parse_args()
+    out_dir = Path(args.out)
+    emp, months = generate(out_dir, args.employees, args.start, args.end, fmt=args.format)
+    if args.full_tasks:
+        out, rows = write_tasks(out_dir, len(emp), months[0].start_time.date(), months[-1].end_time.date(),
+                                args.format, args.chunk_rows)
+        print(f"Wrote {out} ({rows:,} rows)")
+    print("✅ Data generated.")
 
-# optional huge per-task CSV
-if args.full_tasks:
-    out = DATA/"full_project_tasks.csv"
-    with open(out, "w") as f:
-        f.write("employee_id,date,task_id,project_id,hours,velocity,quality,on_time,impact\n")
-        start, end = dt.date(2005,1,1), dt.date(2014,12,31)
-        day = start
-        rng = np.random.default_rng(1234)
-        while day <= end:
-            for eid in range(1, N_EMP+1):
-                for t in range(10):
-                    f.write(f"{eid},{day},{t+1},P{(eid%50)+1},{rng.uniform(0.3,1.2):.2f},{rng.integers(0,3)},{rng.uniform(0.6,1.0):.2f},{rng.integers(0,2)},{rng.integers(0,6)}\n")
-            day += dt.timedelta(days=1)
-    print("Wrote", out)
-print("✅ Data generated.")
+if __name__ == "__main__":
+    main()
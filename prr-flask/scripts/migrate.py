@@ -0,0 +1,25 @@
+# Applies pending schema changes (new tables, hot-path indexes) to an existing database,
+# then verifies the hot-path queries still plan as index searches.
+import sys, os, argparse
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import create_app
+from prr.utils.db import db
+from prr.utils.schema import migrate, check_query_plans, QueryPlanError
+
+ap = argparse.ArgumentParser()
+ap.add_argument("--check-only", action="store_true", help="Only run the query-plan check, change nothing")
+args = ap.parse_args()
+
+app = create_app()
+with app.app_context():
+    if not args.check_only:
+        applied = migrate(db.engine)
+        for step in applied:
+            print(f"✓ {step}")
+        print(f"Schema up to date ({len(applied)} change(s) applied).")
+    try:
+        checked = check_query_plans(db.engine)
+    except QueryPlanError as e:
+        print(f"❌ Hot-path query regressed to a table scan: {e}")
+        sys.exit(1)
+    print(f"✓ Query plans OK for {len(checked)} hot-path queries.")
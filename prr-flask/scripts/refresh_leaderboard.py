@@ -0,0 +1,17 @@
+# Rescores the materialized leaderboard (promotion_scores) synchronously, e.g. after a bulk seed.
+#   python scripts/refresh_leaderboard.py [--as-of 2014-12-31] [--employees 1 2 3]
+import argparse, sys, os, time
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from app import create_app
+from prr.services.leaderboard import LeaderboardService, maintained
+
+ap = argparse.ArgumentParser(description="Rebuild promotion_scores for the maintained as_of dates")
+ap.add_argument("--as-of", action="append", default=None, help="date to refresh (repeatable; default: LEADERBOARD_AS_OF)")
+ap.add_argument("--employees", type=int, nargs="*", default=None, help="only rescore these employee ids")
+args = ap.parse_args()
+app = create_app()
+with app.app_context():
+    for as_of in args.as_of or maintained():
+        t = time.perf_counter()
+        n = LeaderboardService.refresh(as_of, args.employees, force=True)
+        print(f"✓ Scored {n:,} employees for {as_of} in {time.perf_counter() - t:.1f}s")
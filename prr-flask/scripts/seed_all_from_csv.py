@@ -1,7 +1,12 @@
-import os, sys, sqlite3, math, json, random
+import os, sys, sqlite3, math, json, random, argparse
 from pathlib import Path
 import pandas as pd
 import numpy as np
+from scipy.special import ndtri
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+from prr.utils import datasets
+from prr.utils.metrics import timed, add_rows, write_textfile
 
 # Resolve DB path from DATABASE_URL (supports sqlite:///relative.db or sqlite:////abs/path.db)
 def _resolve_db_path():
@@ -25,7 +30,6 @@ def ensure_db():
     if Path(DB_PATH).exists():
         return
     print(f"⚠️  {DB_PATH} not found. Initializing schema now...")
-    sys.path.append(str(Path(__file__).resolve().parents[1]))
     from app import create_app
     from prr.utils.db import db
     app = create_app()
@@ -39,38 +43,117 @@ def ensure_db():
 
 
 def connect():
+    from prr.utils.db import sqlite_pragmas, apply_pragmas
     ensure_db()
-    return sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH)
+    apply_pragmas(conn, sqlite_pragmas())   # WAL: the API keeps reading while a reload is in flight
+    return conn
 
 def truncate(conn, table):
+    # no commit here: the following to_sql commits delete + reload as one transaction,
+    # so readers never observe the table empty
     try:
         conn.execute(f"DELETE FROM {table}")
-        conn.commit()
         print(f"✓ Cleared {table}")
     except Exception as e:
         print(f"… skipping clear for {table}: {e}")
 
-def seed_employees(conn):
-    csv = DATA_DIR / "employees_500.csv"
-    if not csv.exists():
-        print(f"❌ {csv} not found. Generate data first: python scripts/generate_big_data.py")
+# Natural keys for tables whose rows come from CSV/static definitions (upserted in --incremental mode)
+NATURAL_KEYS = {
+    "employee": ["id"],
+    "project_activity": ["employee_id", "date", "project_id"],
+    "competency_framework": ["rank", "competency"],
+    "catalog": ["course_id"],
+}
+UPSERT_CHUNK = 10_000
+TO_SQL_CHUNK = 50_000
+
+def _changed(new: pd.DataFrame, old: pd.DataFrame, key: list, cols: list) -> tuple[pd.DataFrame, int]:
+    """Rows of `new` that are missing from `old` or differ in any non-key column."""
+    m = new.merge(old, on=key, how="left", suffixes=("", "__old"), indicator=True)
+    is_new = m["_merge"] == "left_only"
+    diff = np.zeros(len(m), dtype=bool)
+    for c in cols:
+        if c in key: continue
+        a, b = m[c], m[f"{c}__old"]
+        both_na = a.isna() & b.isna()
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            diff |= ~(np.isclose(a.astype(float), b.astype(float), rtol=0, atol=1e-9) | both_na).to_numpy()
+        else:
+            diff |= ~((a.astype(str) == b.astype(str)) | both_na).to_numpy()
+    return new[(is_new | diff).to_numpy()], int(is_new.sum())
+
+def upsert(conn, table, df):
+    """Apply only new/changed rows via INSERT ... ON CONFLICT DO UPDATE, all in one transaction."""
+    key, cols = NATURAL_KEYS[table], list(df.columns)
+    conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{table}_natural ON {table} ({', '.join(key)})")
+    old = pd.read_sql_query(f"SELECT {', '.join(cols)} FROM {table}", conn)
+    changes, inserted = _changed(df, old, key, cols)
+    updates = ", ".join(f"{c}=excluded.{c}" for c in cols if c not in key)
+    sql = (f"INSERT INTO {table} ({', '.join(cols)}) VALUES ({', '.join('?' for _ in cols)}) "
+           f"ON CONFLICT ({', '.join(key)}) DO {'UPDATE SET ' + updates if updates else 'NOTHING'}")
+    rows = changes.astype(object).where(changes.notna(), None).itertuples(index=False, name=None)
+    with conn:
+        while True:
+            chunk = [r for _, r in zip(range(UPSERT_CHUNK), rows)]
+            if not chunk: break
+            conn.executemany(sql, chunk)
+    add_rows(len(changes))
+    report = {"inserted": inserted, "updated": len(changes) - inserted, "unchanged": len(df) - len(changes)}
+    print(f"✓ Upserted {table}: +{report['inserted']:,} new, ~{report['updated']:,} changed, {report['unchanged']:,} unchanged")
+    return changes, report
+
+def write_table(conn, table, df, incremental=False):
+    """Full reload (delete + append in one transaction) or, incrementally, upsert of the delta."""
+    if incremental:
+        return upsert(conn, table, df)[0]
+    _reload(conn, table, df)
+    return df
+
+def _has_rows(conn, table):
+    try:
+        return conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone() is not None
+    except sqlite3.OperationalError:
+        return False
+
+def _scale_ids(base_ids, n=None):
+    """(employee_id, template_id) for `n` employees: the first n CSV ids, then synthetic ids cloned round-robin from them."""
+    base = np.sort(np.asarray(base_ids))
+    if n is None or n <= len(base):
+        ids = base[:n]
+        return pd.DataFrame({"employee_id": ids, "template_id": ids})
+    extra = np.arange(n - len(base))
+    return pd.DataFrame({"employee_id": np.concatenate([base, base[-1] + 1 + extra]),
+                         "template_id": np.concatenate([base, base[extra % len(base)]])})
+
+@timed("seed.employees")
+def seed_employees(conn, incremental=False, employees=None):
+    if not datasets.exists("employees", DATA_DIR):
+        print(f"❌ {datasets.csv_path('employees', DATA_DIR)} not found. Generate data first: python scripts/generate_big_data.py")
         sys.exit(1)
-    df = pd.read_csv(csv)
-    out = df.rename(columns={"employee_id":"id"})
+    df = datasets.read("employees", DATA_DIR, columns=["employee_id","name","org_unit","current_rank","last_promotion_date"])
+    ids = _scale_ids(df["employee_id"], employees)
+    df = ids.merge(df.rename(columns={"employee_id": "template_id"}), on="template_id")
+    synthetic = df["employee_id"] != df["template_id"]
+    df.loc[synthetic, "name"] = "Employee " + df.loc[synthetic, "employee_id"].astype(str)
+    out = df.drop(columns="template_id").rename(columns={"employee_id":"id"})
     out["manager_id"] = None
     out["location"] = "HQ"
     out["employment_type"] = "Full-Time"
     cols = ["id","name","org_unit","manager_id","current_rank","last_promotion_date","location","employment_type"]
-    truncate(conn, "employee")
-    out[cols].to_sql("employee", conn, if_exists="append", index=False)
-    print(f"✓ Seeded employee ({len(out):,} rows)")
+    return write_table(conn, "employee", out[cols], incremental)
 
-def seed_project_activity(conn):
-    csv = DATA_DIR / "monthly_activity_2005_2014.csv"
-    if not csv.exists():
-        print(f"❌ {csv} not found. Generate data first: python scripts/generate_big_data.py")
+@timed("seed.project_activity")
+def seed_project_activity(conn, incremental=False, employees=None):
+    if not datasets.exists("monthly_activity", DATA_DIR):
+        print(f"❌ {datasets.csv_path('monthly_activity', DATA_DIR)} not found. Generate data first: python scripts/generate_big_data.py")
         sys.exit(1)
-    monthly = pd.read_csv(csv)
+    monthly = datasets.read("monthly_activity", DATA_DIR, columns=["employee_id","year_month","org_unit","hours","velocity",
+                                                                   "quality_mean","on_time_ratio","customer_impact"])
+    if employees is not None:
+        # synthetic employees replay their template's history
+        ids = _scale_ids(monthly["employee_id"].unique(), employees)
+        monthly = ids.merge(monthly.rename(columns={"employee_id": "template_id"}), on="template_id").drop(columns="template_id")
     # Map monthly → project_activity schema (1 row per month per employee)
     # We’ll use the last day of month as date; role by org_unit; on_time boolean from on_time_ratio
     def last_day(period_str):
@@ -89,11 +172,14 @@ def seed_project_activity(conn):
     }
 
     df = monthly.copy()
-    df["date"] = df["year_month"].apply(last_day)
+    months = df["year_month"].unique()
+    df["date"] = df["year_month"].map(dict(zip(months, map(last_day, months))))
     df["project_id"] = "PRJ-" + (df["employee_id"] % 50).astype(str).str.zfill(2)
     df["role"] = df["org_unit"].map(role_map).fillna("Contributor")
-    # On-time boolean per-month: compare on_time_ratio to a random threshold around 0.85
-    thresh = RNG.normal(0.85, 0.05, size=len(df))
+    # On-time boolean per-month: compare on_time_ratio to a random threshold around 0.85.
+    # The threshold is a pure function of the natural key so reloads only differ where the data did.
+    u = pd.util.hash_pandas_object(df[NATURAL_KEYS["project_activity"]], index=False).to_numpy() / 2.0**64
+    thresh = 0.85 + 0.05 * ndtri(np.clip(u, 1e-12, 1 - 1e-12))
     df["on_time"] = (df["on_time_ratio"] >= np.clip(thresh, 0.6, 0.98)).astype(int)
     df = df.rename(columns={
         "quality_mean":"quality_score",
@@ -102,113 +188,99 @@ def seed_project_activity(conn):
     out = df[[
         "employee_id","date","project_id","role","hours","velocity","quality_score","on_time","customer_impact"
     ]].copy()
-    truncate(conn, "project_activity")
-    out.to_sql("project_activity", conn, if_exists="append", index=False)
-    print(f"✓ Seeded project_activity ({len(out):,} rows)")
+    return write_table(conn, "project_activity", out, incremental)
+
+def _random_dates(n, first_year, last_year, max_day=27):
+    """n ISO date strings with uniform year, month and day-of-month (days 1..max_day, valid in every month)."""
+    months = (RNG.integers(first_year, last_year + 1, n) - 1970) * 12 + RNG.integers(0, 12, n)
+    days = months.astype("datetime64[M]").astype("datetime64[D]") + RNG.integers(0, max_day, n)
+    return days, np.datetime_as_string(days, unit="D")
 
-def _pick_rel():
-    return RNG.choice(["peer","direct","cross-functional","client"], p=[0.5,0.3,0.15,0.05])
+def _ratings(n, mean, sd):
+    return np.clip(np.rint(RNG.normal(mean, sd, n)), 1, 5).astype(int)
 
+def _reload(conn, table, df):
+    truncate(conn, table)
+    df.to_sql(table, conn, if_exists="append", index=False, chunksize=TO_SQL_CHUNK)
+    add_rows(len(df))
+    print(f"✓ Seeded {table} ({len(df):,} rows)")
+
+@timed("seed.feedback360")
 def seed_feedback360(conn, n_per_emp=6):
     # synthetic 360s (since we don’t have a CSV for it)
-    emp = pd.read_sql_query("SELECT id FROM employee", conn)
-    rows = []
-    for eid in emp["id"].tolist():
-        for i in range(n_per_emp):
-            rows.append({
-                "employee_id": eid,
-                "rater_id": int(RNG.integers(1, len(emp)+1)),
-                "date": str(pd.Timestamp(RNG.integers(2009,2015), RNG.integers(1,13), RNG.integers(1,28)).date()),
-                "dimension": RNG.choice(["Leadership","Collaboration","Communication","Execution"]),
-                "rating": int(np.clip(round(RNG.normal(4.1, 0.6)), 1, 5)),
-                "relationship": _pick_rel(),
-                "comment_redacted": RNG.choice(["Great work on Q3 project.","Improved collaboration.","Could communicate timelines better.","Strong execution."])
-            })
-    df = pd.DataFrame(rows)
-    truncate(conn, "feedback360")
-    df.to_sql("feedback360", conn, if_exists="append", index=False)
-    print(f"✓ Seeded feedback360 ({len(df):,} rows)")
+    ids = pd.read_sql_query("SELECT id FROM employee", conn)["id"].to_numpy()
+    n = len(ids) * n_per_emp
+    df = pd.DataFrame({
+        "employee_id": np.repeat(ids, n_per_emp),
+        "rater_id": RNG.integers(1, len(ids) + 1, n),
+        "date": _random_dates(n, 2009, 2014)[1],
+        "dimension": RNG.choice(["Leadership","Collaboration","Communication","Execution"], n),
+        "rating": _ratings(n, 4.1, 0.6),
+        "relationship": RNG.choice(["peer","direct","cross-functional","client"], n, p=[0.5,0.3,0.15,0.05]),
+        "comment_redacted": RNG.choice(["Great work on Q3 project.","Improved collaboration.","Could communicate timelines better.","Strong execution."], n),
+    })
+    _reload(conn, "feedback360", df)
 
+@timed("seed.manager_review")
 def seed_manager_review(conn, n_per_emp=4):
-    emp = pd.read_sql_query("SELECT id FROM employee", conn)
-    rows = []
-    for eid in emp["id"].tolist():
-        for yr in [2011,2012,2013,2014][:n_per_emp]:
-            rows.append({
-                "employee_id": eid,
-                "period": f"{yr}-H{RNG.integers(1,3)}",
-                "dimension": RNG.choice(["Impact","Ownership","Leadership","Craft"]),
-                "rating": int(np.clip(round(RNG.normal(4.0, 0.7)), 1, 5)),
-                "narrative_redacted": RNG.choice(["Solid progress","Ready for more scope","Needs delegation practice","Strong partner mgmt"])
-            })
-    df = pd.DataFrame(rows)
-    truncate(conn, "manager_review")
-    df.to_sql("manager_review", conn, if_exists="append", index=False)
-    print(f"✓ Seeded manager_review ({len(df):,} rows)")
+    ids = pd.read_sql_query("SELECT id FROM employee", conn)["id"].to_numpy()
+    years = np.array([2011,2012,2013,2014][:n_per_emp])
+    n = len(ids) * len(years)
+    df = pd.DataFrame({
+        "employee_id": np.repeat(ids, len(years)),
+        "period": np.char.add(np.char.add(np.tile(years, len(ids)).astype(str), "-H"), RNG.integers(1, 3, n).astype(str)),
+        "dimension": RNG.choice(["Impact","Ownership","Leadership","Craft"], n),
+        "rating": _ratings(n, 4.0, 0.7),
+        "narrative_redacted": RNG.choice(["Solid progress","Ready for more scope","Needs delegation practice","Strong partner mgmt"], n),
+    })
+    _reload(conn, "manager_review", df)
 
+@timed("seed.learning_history")
 def seed_learning_history(conn, max_courses_per_emp=5):
-    emp = pd.read_sql_query("SELECT id FROM employee", conn)
-    providers = ["LinkedIn Learning","Coursera","Udemy","Internal"]
-    skills = ["Leadership","Time Management","System Design","Data Analysis","Negotiation","Project Mgmt"]
-    rows = []
-    for eid in emp["id"].tolist():
-        k = int(RNG.integers(0, max_courses_per_emp+1))
-        for _ in range(k):
-            sdate = pd.Timestamp(RNG.integers(2010,2015), RNG.integers(1,13), RNG.integers(1,28))
-            edate = sdate + pd.Timedelta(days=int(RNG.integers(3,30)))
-            rows.append({
-                "employee_id": eid,
-                "course_id": f"C{RNG.integers(100,999)}",
-                "start_dt": str(sdate.date()),
-                "end_dt": str(edate.date()),
-                "completion": bool(RNG.integers(0,2)),
-                "assessment_score": int(RNG.integers(60,100)),
-                "hours": int(RNG.integers(2,16))
-            })
-    df = pd.DataFrame(rows)
-    truncate(conn, "learning_history")
-    df.to_sql("learning_history", conn, if_exists="append", index=False)
-    print(f"✓ Seeded learning_history ({len(df):,} rows)")
+    ids = pd.read_sql_query("SELECT id FROM employee", conn)["id"].to_numpy()
+    eids = np.repeat(ids, RNG.integers(0, max_courses_per_emp + 1, len(ids)))
+    n = len(eids)
+    start, start_iso = _random_dates(n, 2010, 2014)
+    df = pd.DataFrame({
+        "employee_id": eids,
+        "course_id": np.char.add("C", RNG.integers(100, 999, n).astype(str)),
+        "start_dt": start_iso,
+        "end_dt": np.datetime_as_string(start + RNG.integers(3, 30, n), unit="D"),
+        "completion": RNG.integers(0, 2, n).astype(bool),
+        "assessment_score": RNG.integers(60, 100, n),
+        "hours": RNG.integers(2, 16, n),
+    })
+    _reload(conn, "learning_history", df)
 
+@timed("seed.incidents")
 def seed_incidents(conn, rate=0.08):
-    emp = pd.read_sql_query("SELECT id FROM employee", conn)
-    severities = ["Low","Medium","High"]
-    rows = []
-    for eid in emp["id"].tolist():
-        if RNG.random() < rate:
-            n = int(RNG.integers(1,3))
-            for _ in range(n):
-                rows.append({
-                    "employee_id": eid,
-                    "date": str(pd.Timestamp(RNG.integers(2010,2015), RNG.integers(1,13), RNG.integers(1,28)).date()),
-                    "type": RNG.choice(["Policy","Quality","Security","Conduct"]),
-                    "severity": RNG.choice(severities, p=[0.7,0.25,0.05])
-                })
-    df = pd.DataFrame(rows) if rows else pd.DataFrame(columns=["employee_id","date","type","severity"])
-    truncate(conn, "incidents")
-    if len(df):
-        df.to_sql("incidents", conn, if_exists="append", index=False)
-    print(f"✓ Seeded incidents ({len(df):,} rows)")
+    ids = pd.read_sql_query("SELECT id FROM employee", conn)["id"].to_numpy()
+    flagged = ids[RNG.random(len(ids)) < rate]
+    eids = np.repeat(flagged, RNG.integers(1, 3, len(flagged)))
+    n = len(eids)
+    df = pd.DataFrame({
+        "employee_id": eids,
+        "date": _random_dates(n, 2010, 2014)[1],
+        "type": RNG.choice(["Policy","Quality","Security","Conduct"], n),
+        "severity": RNG.choice(["Low","Medium","High"], n, p=[0.7,0.25,0.05]),
+    })
+    _reload(conn, "incidents", df)
 
+@timed("seed.recognition")
 def seed_recognition(conn, avg_per_emp=2.5):
-    emp = pd.read_sql_query("SELECT id FROM employee", conn)
-    badges = ["Kudos","Customer Hero","Team Player","Innovator","Mentor"]
-    rows = []
-    for eid in emp["id"].tolist():
-        k = np.random.poisson(avg_per_emp)
-        for _ in range(k):
-            rows.append({
-                "employee_id": eid,
-                "date": str(pd.Timestamp(RNG.integers(2010,2015), RNG.integers(1,13), RNG.integers(1,28)).date()),
-                "badge_type": RNG.choice(badges),
-                "nominator_id": int(RNG.integers(1, len(emp)+1))
-            })
-    df = pd.DataFrame(rows)
-    truncate(conn, "recognition")
-    df.to_sql("recognition", conn, if_exists="append", index=False)
-    print(f"✓ Seeded recognition ({len(df):,} rows)")
+    ids = pd.read_sql_query("SELECT id FROM employee", conn)["id"].to_numpy()
+    eids = np.repeat(ids, RNG.poisson(avg_per_emp, len(ids)))
+    n = len(eids)
+    df = pd.DataFrame({
+        "employee_id": eids,
+        "date": _random_dates(n, 2010, 2014)[1],
+        "badge_type": RNG.choice(["Kudos","Customer Hero","Team Player","Innovator","Mentor"], n),
+        "nominator_id": RNG.integers(1, len(ids) + 1, n),
+    })
+    _reload(conn, "recognition", df)
 
-def seed_competency_framework(conn):
+@timed("seed.competency_framework")
+def seed_competency_framework(conn, incremental=False):
     rows = []
     ranks = ["IC","Senior","Lead","Manager"]
     comp = ["Leadership","Collaboration","Communication","Execution","System Design","Customer Focus"]
@@ -220,39 +292,69 @@ def seed_competency_framework(conn):
                 "expected_level": {"IC":1,"Senior":2,"Lead":3,"Manager":3}[r],
                 "rubric_json": json.dumps({"examples":[f"{c} examples for {r}"],"anchors":[1,2,3,4]})
             })
-    df = pd.DataFrame(rows)
-    truncate(conn, "competency_framework")
-    df.to_sql("competency_framework", conn, if_exists="append", index=False)
-    print(f"✓ Seeded competency_framework ({len(df):,} rows)")
+    return write_table(conn, "competency_framework", pd.DataFrame(rows), incremental)
 
-def seed_catalog(conn):
+@timed("seed.catalog")
+def seed_catalog(conn, incremental=False):
     rows = [
         {"course_id":"L-LEAD-101","title":"Leading Teams Under Pressure","provider":"LinkedIn Learning","modality":"online","duration_h":6,"skills_json":json.dumps(["Leadership","Conflict Resolution"]),"price":0,"internal_flag":0},
         {"course_id":"U-TM-200","title":"Advanced Time Management","provider":"Udemy","modality":"online","duration_h":5,"skills_json":json.dumps(["Time Management","Prioritization"]),"price":0,"internal_flag":0},
         {"course_id":"C-SD-310","title":"System Design for Scaling","provider":"Coursera","modality":"online","duration_h":12,"skills_json":json.dumps(["System Design","Architecture"]),"price":0,"internal_flag":0},
         {"course_id":"INT-MENT-001","title":"Internal Mentoring Program","provider":"Internal","modality":"blended","duration_h":8,"skills_json":json.dumps(["Mentorship","Leadership"]),"price":0,"internal_flag":1},
     ]
-    df = pd.DataFrame(rows)
-    truncate(conn, "catalog")
-    df.to_sql("catalog", conn, if_exists="append", index=False)
-    print(f"✓ Seeded catalog ({len(df):,} rows)")
+    return write_table(conn, "catalog", pd.DataFrame(rows), incremental)
+
+@timed("seed.feature_store")
+def build_feature_store(employee_ids=None):
+    """Backfill the monthly feature store from the freshly seeded tables (optionally just some employees)."""
+    from app import create_app
+    from prr.services.feature_store import FeatureStore
+    app = create_app()
+    with app.app_context():
+        n = FeatureStore.rebuild(employee_ids)
+    print(f"✓ Built feature_monthly ({n:,} rows)")
+
+SYNTHETIC = {"feedback360": seed_feedback360, "manager_review": seed_manager_review, "learning_history": seed_learning_history,
+             "incidents": seed_incidents, "recognition": seed_recognition}
 
 def main():
+    ap = argparse.ArgumentParser(description="Seed the PRR database from the CSVs in data/")
+    ap.add_argument("--incremental", action="store_true",
+                    help="upsert only new/changed rows by natural key instead of reloading every table; "
+                         "synthetic tables are generated only when empty")
+    ap.add_argument("--employees", type=int, default=None,
+                    help="scale to N employees: the first N from the CSV, or all of them plus synthetic clones")
+    args = ap.parse_args()
     conn = connect()
     try:
-        seed_employees(conn)
-        seed_project_activity(conn)
-        # Optional synthetic tables (uncomment any you want to skip)
-        seed_feedback360(conn)
-        seed_manager_review(conn)
-        seed_learning_history(conn)
-        seed_incidents(conn)
-        seed_recognition(conn)
-        seed_competency_framework(conn)
-        seed_catalog(conn)
+        if not args.incremental:
+            seed_employees(conn, employees=args.employees)
+            seed_project_activity(conn, employees=args.employees)
+            # Optional synthetic tables (uncomment any you want to skip)
+            seed_feedback360(conn)
+            seed_manager_review(conn)
+            seed_learning_history(conn)
+            seed_incidents(conn)
+            seed_recognition(conn)
+            seed_competency_framework(conn)
+            seed_catalog(conn)
+            build_feature_store()
+        else:
+            seed_employees(conn, incremental=True, employees=args.employees)
+            # only activity feeds the feature store; rebuild just the employees whose rows changed
+            touched = set(seed_project_activity(conn, incremental=True, employees=args.employees)["employee_id"])
+            for table, seed in SYNTHETIC.items():
+                if _has_rows(conn, table): continue
+                seed(conn)
+                touched = None
+            seed_competency_framework(conn, incremental=True)
+            seed_catalog(conn, incremental=True)
+            if touched is None: build_feature_store()
+            elif touched: build_feature_store(sorted(int(e) for e in touched))
         print("🎉 All seeds completed.")
     finally:
         conn.close()
+        write_textfile()
 
 if __name__ == "__main__":
     main()
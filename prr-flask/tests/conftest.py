@@ -0,0 +1,73 @@
+import os, sys, json, sqlite3, tempfile, importlib.util
+from pathlib import Path
+import joblib, numpy as np, pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+TMP = Path(tempfile.mkdtemp(prefix="prr-tests-"))
+DB_PATH = TMP / "prr.db"
+MODEL_DIR = TMP / "artifacts"
+# Config reads the environment at import time, so this must run before `app` is imported
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["MODEL_DIR"] = str(MODEL_DIR)
+
+def load_script(name, folder="scripts"):
+    spec = importlib.util.spec_from_file_location(name, ROOT / folder / f"{name}.py")
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def train_model(out_dir):
+    from lightgbm import LGBMClassifier
+    from sklearn.calibration import CalibratedClassifierCV
+    X = pd.read_csv(ROOT / "data" / "training_features_2005_2014.csv")
+    y = pd.read_csv(ROOT / "data" / "promotion_labels_2014.csv")["label"].values
+    feat_cols = [c for c in X.columns if c != "employee_id"]
+    base = LGBMClassifier(n_estimators=40, num_leaves=15, min_child_samples=20, verbose=-1, random_state=0)
+    model = CalibratedClassifierCV(base, method="isotonic", cv=3).fit(X[feat_cols].values, y)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(model, out_dir / "model.pkl")
+    with open(out_dir / "features.json", "w") as f:
+        json.dump({"feature_order": feat_cols, "model_type": "LightGBM", "calibrated": True}, f)
+    train_big = load_script("train_big", "ml")
+    orgs = pd.read_csv(ROOT / "data" / "employees_500.csv").set_index("employee_id").loc[X["employee_id"], "org_unit"].values
+    sv, base = train_big.shap_matrix(model, X[feat_cols].values)
+    np.save(out_dir / "shap_values.npy", sv.astype(np.float32))
+    np.save(out_dir / "shap_employee_ids.npy", X["employee_id"].to_numpy())
+    with open(out_dir / "explain_global.json", "w") as f:
+        json.dump(train_big.global_summary(sv, base, feat_cols, orgs), f)
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    seed = load_script("seed_all_from_csv")
+    seed.DATA_DIR = ROOT / "data"
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        seed.seed_employees(conn)
+        seed.seed_project_activity(conn)
+        seed.seed_feedback360(conn)
+        seed.seed_manager_review(conn)
+        seed.seed_learning_history(conn)
+        seed.seed_incidents(conn)
+        seed.seed_recognition(conn)
+        seed.seed_competency_framework(conn)
+        seed.seed_catalog(conn)
+    finally:
+        conn.close()
+    return DB_PATH
+
+@pytest.fixture(scope="session")
+def trained_model():
+    train_model(MODEL_DIR)
+    return MODEL_DIR
+
+@pytest.fixture(scope="session")
+def app(seeded_db, trained_model):
+    from app import app as flask_app
+    flask_app.config.update(TESTING=True)
+    return flask_app
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
@@ -1,2 +1,35 @@
 def test_placeholder():
     assert 2==2
+
+def test_score_single(client):
+    r = client.post("/v1/promotion/score", json={"employee_id": 5})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["employee"] == "Emp 005"
+    assert body["decision"] in {"PROMOTE", "BORDERLINE", "HOLD"}
+
+def test_score_batch_matches_single(client):
+    ids = [1, 2, 3, 250, 499]
+    r = client.post("/v1/promotion/score:batch", json={"employee_ids": ids})
+    assert r.status_code == 200
+    body = r.get_json()
+    assert body["count"] == len(ids)
+    for row in body["results"]:
+        single = client.post("/v1/promotion/score", json={"employee_id": row["employee_id"]}).get_json()
+        assert row == single
+
+def test_score_batch_by_org_unit(client):
+    body = client.post("/v1/promotion/score:batch", json={"org_unit": "Finance"}).get_json()
+    assert body["count"] > 0
+    assert all(r["employee"] for r in body["results"])
+
+def test_score_batch_requires_selector(client):
+    assert client.post("/v1/promotion/score:batch", json={}).status_code == 400
+
+def test_malformed_as_of_is_rejected(client):
+    bad = {"employee_id": 5, "employee_ids": [5], "as_of": "2014-12"}
+    for path in ("/v1/promotion/score", "/v1/promotion/score:batch", "/v1/plan/recommend", "/v1/plan/mentor", "/v1/explain/local:batch"):
+        r = client.post(path, json=bad)
+        assert r.status_code == 400 and "YYYY-MM-DD" in r.get_json()["error"], path
+    for path in ("/v1/explain/local?employee_id=5&as_of=2014-13-01", "/v1/promotion/leaderboard?as_of=12/31/2014"):
+        assert client.get(path).status_code == 400, path
@@ -0,0 +1,57 @@
+import asyncio, json
+import pytest
+pytest.importorskip("aiosqlite")
+pytest.importorskip("asgiref")
+from prr.utils.cache import readiness_cache, catalog_cache
+
+async def call(application, method, path, body=None, query=""):
+    sent, raw = [], json.dumps(body).encode() if body is not None else b""
+    async def receive():
+        return {"type": "http.request", "body": raw, "more_body": False}
+    async def send(message):
+        sent.append(message)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "path": path,
+             "raw_path": path.encode(), "query_string": query.encode(), "root_path": "", "scheme": "http",
+             "headers": [(b"content-type", b"application/json")], "server": ("test", 80), "client": ("test", 1)}
+    await application(scope, receive, send)
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    return status, json.loads(b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body"))
+
+@pytest.fixture()
+def asgi_app(app):
+    import asgi
+    yield asgi.application
+    asyncio.run(asgi.aio.AsyncDB.dispose())
+
+def test_async_routes_match_the_flask_ones(asgi_app, client):
+    cases = [("POST", "/v1/promotion/score", {"employee_id": 7}, ""),
+             ("POST", "/v1/plan/recommend", {"employee_id": 7, "as_of": "2014-06-15"}, ""),   # partial month
+             ("GET", "/v1/explain/local", None, "employee_id=7")]
+    async def run():
+        out = []
+        for method, path, body, query in cases:
+            readiness_cache.clear(); catalog_cache.clear()
+            out.append(await call(asgi_app, method, path, body, query))
+        return out
+    for (method, path, body, query), (status, got) in zip(cases, asyncio.run(run())):
+        readiness_cache.clear(); catalog_cache.clear()
+        assert status == 200
+        assert got == client.open(f"{path}?{query}", method=method, json=body).get_json()
+
+def test_other_routes_fall_through_to_flask(asgi_app):
+    status, body = asyncio.run(call(asgi_app, "GET", "/v1/ingest/health"))
+    assert status == 200 and body["status"] == "ok"
+
+def test_many_concurrent_requests_on_one_loop(asgi_app):
+    readiness_cache.clear()
+    async def burst():
+        return await asyncio.gather(*(call(asgi_app, "POST", "/v1/plan/recommend", {"employee_id": e}) for e in range(1, 201)))
+    results = asyncio.run(burst())
+    assert [s for s, _ in results] == [200] * 200
+    assert [b["employee_id"] for _, b in results] == list(range(1, 201))
+
+def test_bad_request(asgi_app):
+    status, body = asyncio.run(call(asgi_app, "POST", "/v1/promotion/score", {}))
+    assert status == 400 and "employee_id" in body["error"]
+    status, body = asyncio.run(call(asgi_app, "POST", "/v1/promotion/score", {"employee_id": 5, "as_of": "2014-12"}))
+    assert status == 400 and "YYYY-MM-DD" in body["error"]
@@ -0,0 +1,19 @@
+from conftest import load_script
+
+def _result(p95, sql):
+    return {"500": {"endpoints": {"score": {"p95_ms": p95, "sql_per_request": sql}}}}
+
+def test_regression_check_uses_threshold_floor_and_sql_counts():
+    bench = load_script("bench_endpoints")
+    base = _result(4.0, 6)
+    assert bench.regressions(_result(4.9, 6), base, 0.25, 0.5) == []        # within 25%
+    assert bench.regressions(_result(5.2, 6), base, 0.25, 2.0) == []        # over 25% but under the floor
+    assert len(bench.regressions(_result(5.2, 6), base, 0.25, 0.5)) == 1
+    assert "SQL/request" in bench.regressions(_result(4.0, 7), base, 0.25, 0.5)[0]
+    assert bench._pct([5, 1, 3, 2, 4], 50) == 3
+
+def test_measurements_missing_from_the_baseline_fail():
+    bench = load_script("bench_endpoints")
+    current = {**_result(4.0, 6), "100000": {"endpoints": {"score": {"p95_ms": 9.0, "sql_per_request": 6}}}}
+    found = bench.regressions(current, _result(4.0, 6), 0.25, 0.5)
+    assert len(found) == 1 and found[0].startswith("100000 score: not in the baseline")
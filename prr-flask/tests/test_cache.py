@@ -0,0 +1,36 @@
+import time
+from sqlalchemy import event
+from prr.utils.db import db
+from prr.utils.cache import TTLCache, readiness_cache, invalidate_employees
+
+def test_ttl_cache_lru_eviction_and_expiry():
+    c = TTLCache(maxsize=2, ttl=0.05)
+    c.set("a", 1); c.set("b", 2)
+    assert c.get("a") == 1
+    c.set("c", 3)
+    assert c.get("b") is None and c.get("a") == 1 and c.get("c") == 3
+    time.sleep(0.06)
+    assert c.get("a") is None
+    s = c.stats()
+    assert s["evictions"] == 1 and s["hits"] == 3 and s["misses"] == 2
+
+def test_plan_after_score_runs_no_sql(app, client):
+    readiness_cache.clear()
+    client.post("/v1/promotion/score", json={"employee_id": 11})
+    client.post("/v1/plan/recommend", json={"employee_id": 1})  # warm the catalog
+    statements = []
+    with app.app_context():
+        listener = lambda *a: statements.append(a[2])
+        event.listen(db.engine, "before_cursor_execute", listener)
+        try:
+            assert client.post("/v1/plan/recommend", json={"employee_id": 11}).status_code == 200
+            assert client.get("/v1/explain/local?employee_id=11").status_code == 200
+        finally:
+            event.remove(db.engine, "before_cursor_execute", listener)
+    assert statements == []
+
+def test_write_hook_invalidates_employee(client):
+    client.post("/v1/promotion/score", json={"employee_id": 12})
+    client.post("/v1/promotion/score", json={"employee_id": 13})
+    assert invalidate_employees([12]) == 1
+    assert readiness_cache.invalidate(lambda k: k[0] == 13) == 1
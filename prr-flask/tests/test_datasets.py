@@ -0,0 +1,29 @@
+import pandas as pd
+import pytest
+from conftest import ROOT
+from prr.utils import datasets
+
+pytest.importorskip("pyarrow")
+
+def test_parquet_matches_csv_with_projection_and_pushdown(tmp_path):
+    monthly = pd.read_csv(ROOT / "data" / "monthly_activity_2005_2014.csv")
+    datasets.write("monthly_activity", monthly.iloc[:25_000], tmp_path, fmt="parquet")
+    datasets.write("monthly_activity", monthly.iloc[25_000:], tmp_path, fmt="parquet", append=True)
+    assert (tmp_path / "monthly_activity" / "year=2014" / "org_unit=IT").is_dir()
+    filters = datasets.date_filters("monthly_activity", "2013-01", "2014-06") + [("org_unit", "in", ["IT", "HR"])]
+    cols = ["employee_id", "year_month", "velocity"]
+    key = ["employee_id", "year_month"]
+    from_parquet = datasets.read("monthly_activity", tmp_path, columns=cols, filters=filters).sort_values(key, ignore_index=True)
+    from_csv = datasets.read("monthly_activity", ROOT / "data", columns=cols, filters=filters).sort_values(key, ignore_index=True)
+    assert list(from_parquet.columns) == cols and len(from_parquet) > 0
+    pd.testing.assert_frame_equal(from_parquet, from_csv)
+    batches = list(datasets.iter_batches("monthly_activity", tmp_path, columns=["employee_id"], filters=[("year", "==", 2014)], batch_rows=1000))
+    assert max(map(len, batches)) <= 1000 and sum(map(len, batches)) == (monthly["year_month"] >= "2014").sum()
+
+def test_csv_round_trip_keeps_the_historical_file(tmp_path):
+    src = ROOT / "data" / "training_features_2005_2014.csv"
+    datasets.import_csv("training_features", tmp_path, src=src)
+    out = datasets.export_csv("training_features", tmp_path)
+    assert out.name == "training_features_2005_2014.csv"
+    pd.testing.assert_frame_equal(pd.read_csv(out), pd.read_csv(src))
+    assert list(datasets.read("training_features", tmp_path, columns=datasets.FEATURES).columns) == datasets.FEATURES
@@ -0,0 +1,31 @@
+import sqlite3
+from sqlalchemy import text
+from conftest import DB_PATH
+from prr.utils.db import db, engine_options
+from prr.utils.cache import readiness_cache
+
+def test_sqlite_connections_get_wal_pragmas(app):
+    with app.app_context():
+        conn = db.session.connection()
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1     # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        db.session.rollback()
+
+def test_readers_are_not_blocked_by_a_writer(client):
+    writer = sqlite3.connect(DB_PATH, timeout=0.1)
+    try:
+        # under a rollback journal an exclusive writer locks every reader out; under WAL they read the last commit
+        writer.execute("BEGIN EXCLUSIVE")
+        writer.execute("DELETE FROM employee WHERE id = 5")
+        readiness_cache.clear()
+        r = client.post("/v1/promotion/score", json={"employee_id": 5})
+        assert r.status_code == 200 and r.get_json()["employee"]
+    finally:
+        writer.rollback()
+        writer.close()
+
+def test_server_database_gets_a_tuned_pool():
+    assert engine_options("sqlite:///prr.db") == {}
+    opts = engine_options("postgresql+psycopg2://prr@db/prr")
+    assert opts["pool_size"] == 10 and opts["max_overflow"] == 20 and opts["pool_recycle"] == 1800 and opts["pool_pre_ping"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from prr.services.model import ModelService
+from prr.services.features import build_features
+from prr.services.ensemble import booster
+
+def test_shap_values_are_additive_in_log_odds(app):
+    with app.app_context():
+        feats = build_features(21, "2014-12-31")
+        model = ModelService.current()
+        values, base = model.explain_batch([feats])
+        x = model.matrix([feats])
+        margin = np.mean([booster(est).predict(x, raw_score=True) for est in model.base_estimators()])
+        assert values.shape == (1, len(model.feat_order))
+        assert base + values.sum() == pytest.approx(margin, abs=1e-6)
+
+def test_local_returns_shap_ranked_factors(client):
+    body = client.get("/v1/explain/local?employee_id=21").get_json()
+    shap = [abs(f["shap"]) for f in body["top_factors"]]
+    assert len(shap) == 5 and shap == sorted(shap, reverse=True)
+    assert body["model_version"] == ModelService.version()
+
+def test_batch_matches_local(client):
+    batch = client.post("/v1/explain/local:batch", json={"employee_ids": [21, 22]}).get_json()
+    for row in batch["results"]:
+        single = client.get(f"/v1/explain/local?employee_id={row['employee_id']}").get_json()
+        assert [f["feature"] for f in row["top_factors"]] == [f["feature"] for f in single["top_factors"]]
+        assert [f["shap"] for f in row["top_factors"]] == pytest.approx([f["shap"] for f in single["top_factors"]])
+
+def test_global_summary_and_org_breakdown(client):
+    body = client.get("/v1/explain/global").get_json()
+    assert body["n_employees"] == 500
+    ranks = [f["mean_abs_shap"] for f in body["features"]]
+    assert ranks == sorted(ranks, reverse=True)
+    org = body["org_units"][0]
+    sub = client.get(f"/v1/explain/global?org_unit={org}").get_json()
+    assert sub["org_unit"] == org and 0 < sub["n_employees"] < 500
+
+def test_global_employee_row_and_unknown_employee(client):
+    row = client.get("/v1/explain/global?employee_id=3").get_json()["shap"]
+    assert len(row) == 9
+    assert client.get("/v1/explain/global?employee_id=99999").status_code == 404
+
+def test_model_without_explainer_is_501(client, monkeypatch):
+    monkeypatch.setattr(ModelService.current(), "explainers", None)
+    r = client.post("/v1/explain/local:batch", json={"employee_ids": [23]})
+    assert r.status_code == 501 and "SHAP" in r.get_json()["error"]
+
+def test_batch_requires_employee_ids(client):
+    assert client.post("/v1/explain/local:batch", json={}).status_code == 400
+    assert client.post("/v1/explain/local:batch", json={"employee_ids": []}).status_code == 400
@@ -0,0 +1,42 @@
+import time
+import pandas as pd
+import pytest
+from prr.services.fairness import metrics, FairnessService
+from prr.services.model import ModelService
+
+def test_metrics_gaps_on_known_groups():
+    df = pd.DataFrame({
+        "employee_id": range(40),
+        "org_unit": ["A"] * 20 + ["B"] * 20,
+        "location": "HQ", "employment_type": "Full-Time", "current_rank": "IC",
+        "score": [0.9] * 10 + [0.1] * 10 + [0.9] * 5 + [0.1] * 15,
+        "label": [1] * 10 + [0] * 10 + [1] * 10 + [0] * 10,
+    })
+    out = metrics(df, promote_thresh=0.72)
+    org = out["by_attribute"]["org_unit"]
+    assert out["promotion_rate_overall"] == pytest.approx(15 / 40)
+    assert org["parity_gap"] == pytest.approx(0.5 - 0.25)
+    assert org["equal_opportunity_gap"] == pytest.approx(1.0 - 0.5)
+    assert out["by_attribute"]["location"]["parity_gap"] is None
+    a = next(g for g in org["groups"] if g["group"] == "A")
+    assert a["calibration_gap"] == pytest.approx(0.5 - 0.5)
+
+def test_summary_answers_from_cache_and_refreshes_in_background(client):
+    first = client.get("/v1/fairness/summary?as_of=2013-12-31")
+    if first.status_code == 202:
+        for _ in range(100):
+            time.sleep(0.1)
+            first = client.get("/v1/fairness/summary?as_of=2013-12-31")
+            if first.status_code == 200: break
+    body = first.get_json()
+    assert first.status_code == 200
+    assert set(body["by_attribute"]) == {"org_unit", "location", "employment_type", "current_rank"}
+    assert body["as_of"] == "2013-12-31" and body["stale"] is False
+    assert sum(g["n"] for g in body["by_attribute"]["org_unit"]["groups"]) == 500
+
+def test_bad_as_of_is_rejected_and_rescores_are_capped(client, monkeypatch):
+    assert client.get("/v1/fairness/summary?as_of=garbage").status_code == 400
+    assert client.get("/v1/fairness/summary?as_of=2014-13-01").status_code == 400
+    monkeypatch.setattr(FairnessService, "_pending", {ModelService.version()})   # a rescore is already running
+    r = client.get("/v1/fairness/summary?as_of=2012-06-30")
+    assert r.status_code == 202 and not FairnessService.refresh_async("2011-06-30")
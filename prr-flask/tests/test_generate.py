@@ -0,0 +1,20 @@
+import pandas as pd
+from conftest import load_script
+
+def test_generator_scales_and_streams_tasks_in_chunks(tmp_path):
+    gen = load_script("generate_big_data")
+    emp, months = gen.generate(tmp_path, n_emp=30, start="2013-01", end="2014-12", block=7)
+    monthly = pd.read_csv(tmp_path / "monthly_activity_2005_2014.csv")
+    assert len(monthly) == 30 * 24 and list(monthly.columns) == gen.MONTHLY_COLS
+    assert (monthly.groupby("employee_id")["year_month"].nunique() == 24).all()
+    assert monthly["quality_mean"].between(0, 1).all() and (monthly["customer_impact"] <= 5 * monthly["tasks"]).all()
+    feats = pd.read_csv(tmp_path / "training_features_2005_2014.csv")
+    lbl = pd.read_csv(tmp_path / "promotion_labels_2014.csv")
+    assert list(feats.columns) == ["employee_id"] + gen.FSET and len(lbl) == len(feats) > 0
+    assert (lbl["as_of"] == "2014-12-31").all()
+    chunks = list(gen.task_chunks(30, "2014-12-01", "2014-12-31", chunk_rows=1000))
+    assert max(len(c) for c in chunks) <= 1000 and sum(len(c) for c in chunks) == 30 * 31 * 10
+    out, rows = gen.write_tasks(tmp_path, 30, "2014-12-01", "2014-12-31", chunk_rows=1000)
+    tasks = pd.read_csv(out)
+    assert rows == len(tasks) == 9300 and list(tasks.columns) == gen.TASK_COLS
+    assert not tasks.duplicated(["employee_id", "date", "task_id"]).any()
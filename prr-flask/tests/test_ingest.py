@@ -0,0 +1,58 @@
+import json
+from prr.services import ingest
+from prr.utils.db import db
+from prr.utils.schema import migrate
+from prr.services.features import build_features
+
+def _ndjson(rows):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in rows) + "\n"
+
+def test_ndjson_ingest_batches_rejects_and_updates_features(app, client):
+    with app.app_context():
+        before = build_features(33, "2014-12-31")["velocity_total"]
+    good = {"employee_id": 33, "date": "2014-11-03", "project_id": "PRJ-33", "role": "Engineer", "hours": 6.5,
+            "velocity": 40, "quality_score": 0.91, "on_time": True, "customer_impact": 12}
+    body = _ndjson([good, {**good, "project_id": "PRJ-34", "velocity": 60}, {**good, "quality_score": 3}, "{not json",
+                    {**good, "project_id": "PRJ-35", "velocity": 5}])
+    r = client.post("/v1/ingest/project_activity?batch_size=2", data=body, content_type="application/x-ndjson")
+    report = r.get_json()
+    assert r.status_code == 200
+    assert (report["received"], report["inserted"], report["rejected"], report["batches"]) == (5, 3, 2, 2)
+    assert [e["line"] for e in report["errors"]] == [3, 4]
+    with app.app_context():
+        assert build_features(33, "2014-12-31")["velocity_total"] == before + 105
+
+def test_duplicate_natural_keys_are_rejected(client):
+    row = {"employee_id": 35, "date": "2014-11-04", "project_id": "PRJ-90", "role": "Engineer", "hours": 2,
+           "velocity": 1, "quality_score": 0.9, "on_time": False, "customer_impact": 0}
+    first = client.post("/v1/ingest/project_activity", data=_ndjson([row, row]), content_type="application/x-ndjson").get_json()
+    assert (first["inserted"], first["rejected"]) == (1, 1) and first["errors"][0]["line"] == 2
+    again = client.post("/v1/ingest/project_activity", data=_ndjson([row]), content_type="application/x-ndjson").get_json()
+    assert (again["inserted"], again["rejected"]) == (0, 1) and "duplicate" in again["errors"][0]["error"]
+
+def test_csv_ingest(client):
+    body = "employee_id,date,type,severity\n34,2014-10-01,Quality,Low\n34,2014-10-02,Quality,Severe\n"
+    report = client.post("/v1/ingest/incidents", data=body, content_type="text/csv").get_json()
+    assert report["inserted"] == 1 and report["rejected"] == 1
+    assert report["errors"][0]["line"] == 3
+
+def test_unknown_table_and_content_type(client):
+    assert client.post("/v1/ingest/employee", data="", content_type="text/csv").status_code == 404
+    assert client.post("/v1/ingest/incidents", data="x", content_type="text/plain").status_code == 415
+
+def test_key_stored_by_a_concurrent_ingest_is_rejected_not_500(app, client, monkeypatch):
+    with app.app_context():
+        migrate(db.engine)      # the seeded tables come from to_sql; the insert race needs the unique index
+    row = {"employee_id": 36, "date": "2014-11-05", "project_id": "PRJ-91", "role": "Engineer", "hours": 2,
+           "velocity": 1, "quality_score": 0.9, "on_time": False, "customer_impact": 0}
+    client.post("/v1/ingest/project_activity", data=_ndjson([row]), content_type="application/x-ndjson")
+    real, calls = ingest._duplicates, []
+    def racy(table, key, rows):     # the first check misses the row, as if another worker committed it just after
+        calls.append(table)
+        return set() if len(calls) == 1 else real(table, key, rows)
+    monkeypatch.setattr(ingest, "_duplicates", racy)
+    r = client.post("/v1/ingest/project_activity", data=_ndjson([row, {**row, "project_id": "PRJ-92"}]),
+                    content_type="application/x-ndjson")
+    assert r.status_code == 200 and len(calls) == 2
+    report = r.get_json()
+    assert (report["inserted"], report["rejected"]) == (1, 1) and report["errors"][0]["line"] == 1
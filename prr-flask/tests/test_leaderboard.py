@@ -0,0 +1,52 @@
+import json, time
+import pytest
+from sqlalchemy import text
+from prr.utils.db import db
+from prr.services.leaderboard import LeaderboardService
+from prr.utils.pagination import encode_cursor, decode_cursor
+
+def _wait(as_of="2014-12-31"):
+    for _ in range(400):
+        if not LeaderboardService.status(as_of)["refreshing"]: return
+        time.sleep(0.05)
+    raise AssertionError("leaderboard refresh did not finish")
+
+@pytest.fixture()
+def board(app, client):
+    if client.get("/v1/promotion/leaderboard").status_code == 202: _wait()
+    return client
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor([0.8125, 17]), 2) == [0.8125, 17]
+    with pytest.raises(ValueError): decode_cursor("bm9wZQ", 2)
+
+def test_pages_are_ordered_and_match_batch_scores(board):
+    seen, cursor = [], None
+    while True:
+        body = board.get(f"/v1/promotion/leaderboard?limit=120{'&cursor=' + cursor if cursor else ''}").get_json()
+        seen += body["results"]
+        cursor = body["next_cursor"]
+        if cursor is None: break
+    assert len(seen) == len({r["employee_id"] for r in seen}) == 500
+    keys = [(r["readiness_score"], r["employee_id"]) for r in seen]
+    assert keys == sorted(keys, reverse=True)
+    batch = board.post("/v1/promotion/score:batch", json={"employee_ids": [r["employee_id"] for r in seen[:5]]}).get_json()
+    assert [r["readiness_score"] for r in batch["results"]] == [r["readiness_score"] for r in seen[:5]]
+
+def test_filters(board):
+    body = board.get("/v1/promotion/leaderboard?org_unit=Finance&decision=PROMOTE&limit=500").get_json()
+    assert body["results"] and {(r["org_unit"], r["decision"]) for r in body["results"]} == {("Finance", "PROMOTE")}
+    assert all(r["readiness_score"] < 0.6 for r in board.get("/v1/promotion/leaderboard?decision=HOLD").get_json()["results"])
+    assert board.get("/v1/promotion/leaderboard?decision=MAYBE").status_code == 400
+    assert board.get("/v1/promotion/leaderboard?cursor=garbage").status_code == 400
+    assert board.get("/v1/promotion/leaderboard?as_of=2010-01-01").status_code == 404
+
+def test_ingest_rescores_only_touched_employees(app, board):
+    with app.app_context():
+        before = dict(db.session.execute(text("SELECT employee_id, scored_at FROM promotion_scores WHERE employee_id IN (40, 41)")).all())
+    row = {"employee_id": 40, "date": "2014-12-01", "type": "Conduct", "severity": "High"}
+    board.post("/v1/ingest/incidents", data=json.dumps(row) + "\n", content_type="application/x-ndjson")
+    _wait()
+    with app.app_context():
+        after = dict(db.session.execute(text("SELECT employee_id, scored_at FROM promotion_scores WHERE employee_id IN (40, 41)")).all())
+    assert after[40] > before[40] and after[41] == before[41]
@@ -0,0 +1,48 @@
+import numpy as np
+from sqlalchemy import text
+from prr.utils.db import db
+from prr.services.mentors import MentorIndex
+
+def small_index():
+    # 1 reports to 2, 2 reports to 3; 4 and 5 sit outside that chain
+    return MentorIndex([1, 2, 3, 4, 5], ["a", "b", "c", "d", "e"], ["Ops", "Ops", "Ops", "Ops", "Sales"],
+                       ["IC", "Lead", "Manager", "Lead", "Senior"], [2, 3, None, None, None], ["Craft", "Execution"],
+                       sums=[[2, 2], [8, 8], [9, 9], [4, 9], [9, 4]], counts=np.ones((5, 2)))
+
+def test_suggest_skips_manager_chain_and_juniors():
+    idx = small_index()
+    assert [int(idx.ids[m]) for m in idx.suggest(1, ["Craft"], k=5)] == [5, 4]
+    assert [int(idx.ids[m]) for m in idx.suggest(1, ["Execution"], k=5)] == [4, 5]
+    assert idx.suggest(3, ["Craft"]) == []      # nobody outranks a manager
+    assert not idx.eligible(2, 1) and idx.eligible(4, 1)
+
+def test_capacity_and_load_balancing():
+    idx = small_index()
+    idx.assign(1, 4)
+    assert [int(idx.ids[m]) for m in idx.suggest(1, ["Execution"], k=5, capacity=1)] == [5]
+    idx.assign(1, 5)    # reassignment moves the load
+    assert idx.load.tolist() == [0, 0, 0, 0, 1]
+
+def test_fold_updates_rows_in_place():
+    idx = small_index()
+    before = idx.z.copy()
+    assert idx.fold("feedback360", [{"employee_id": 4, "dimension": "Craft", "rating": 10}] * 3)
+    assert idx.z[3, 0] > before[3, 0] and np.array_equal(idx.z[[0, 1, 2, 4]], before[[0, 1, 2, 4]])
+    assert not idx.fold("feedback360", [{"employee_id": 99, "dimension": "Craft", "rating": 5}])
+
+def mentor_item(body):
+    return [i for i in body["plan"]["items"] if i["type"] == "mentor"][0]
+
+def test_plan_suggests_and_assign_endpoint_persists(app, client):
+    suggested = mentor_item(client.post("/v1/plan/recommend", json={"employee_id": 2}).get_json())
+    assert suggested["name"] != "Mary Johnson" and suggested["role"] != "IC"
+    count = "SELECT COUNT(*) FROM mentor_assignment WHERE mentee_id=2"
+    with app.app_context():
+        assert db.session.execute(text(count)).scalar() == 0     # the plan is a read
+    r = client.post("/v1/plan/mentor", json={"employee_id": 2})
+    assert r.status_code == 200 and r.get_json()["mentor"]["employee_id"] == suggested["employee_id"]
+    with app.app_context():
+        assert db.session.execute(text(count)).scalar() == 1
+    assert client.post("/v1/plan/mentor", json={"employee_id": 2, "mentor_id": 1}).status_code == 409   # 1 is an IC
+    again = mentor_item(client.post("/v1/plan/recommend", json={"employee_id": 2}).get_json())
+    assert again["employee_id"] == suggested["employee_id"]
@@ -0,0 +1,80 @@
+import os, subprocess, sys
+from conftest import ROOT, load_script
+from config import Config
+from prr.utils import metrics
+from prr.utils.cache import readiness_cache
+
+def test_histogram_renders_cumulative_buckets():
+    reg = metrics.Registry()
+    for v in (0.0002, 0.003, 0.003, 100.0):
+        reg.observe("prr_stage_seconds", (("stage", "x"),), v)
+    reg.inc("prr_sql_queries_total", (("stage", "x"),), 3)
+    lines = reg.render().splitlines()
+    assert 'prr_stage_seconds_bucket{stage="x",le="0.00025"} 1' in lines
+    assert 'prr_stage_seconds_bucket{stage="x",le="0.005"} 3' in lines
+    assert 'prr_stage_seconds_bucket{stage="x",le="+Inf"} 4' in lines
+    assert 'prr_stage_seconds_count{stage="x"} 4' in lines
+    assert 'prr_sql_queries_total{stage="x"} 3' in lines
+    assert "# TYPE prr_stage_seconds histogram" in lines
+
+def test_metrics_endpoint_reports_stages_and_sql(client):
+    readiness_cache.clear()
+    assert client.post("/v1/promotion/score", json={"employee_id": 3}).status_code == 200
+    assert client.post("/v1/plan/recommend", json={"employee_id": 3}).status_code == 200
+    r = client.get("/metrics")
+    assert r.status_code == 200 and r.mimetype == "text/plain"
+    body = r.get_data(as_text=True)
+    for stage in ("features", "employee", "model.predict", "recommend"):
+        assert f'prr_stage_seconds_count{{stage="{stage}"}}' in body
+    assert 'prr_sql_queries_total{stage="employee"}' in body
+    assert 'prr_stage_rows_total{stage="features.' in body
+    assert 'prr_request_seconds_count{endpoint="/v1/promotion/score",method="POST",status="200"}' in body
+
+def test_server_timing_header(client, monkeypatch):
+    assert "Server-Timing" not in client.get("/v1/ingest/health").headers
+    monkeypatch.setattr(Config, "SERVER_TIMING", True)
+    readiness_cache.clear()
+    header = client.post("/v1/promotion/score", json={"employee_id": 4}).headers["Server-Timing"]
+    names = [part.split(";")[0] for part in header.split(", ")]
+    assert {"features", "model-predict", "employee", "sql", "total"} <= set(names)
+
+def test_disabled_metrics_leave_functions_unwrapped():
+    probe = ("import app; from prr.services.recommender import recommend_courses; "
+             "print(app.app.test_client().get('/metrics').status_code, hasattr(recommend_courses, '__wrapped__'))")
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env={**os.environ, "METRICS": "0"},
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == "404 False"
+
+def test_write_textfile(tmp_path):
+    path = metrics.write_textfile(str(tmp_path / "prr.prom"))
+    assert path and open(path).read().startswith("# HELP")
+
+def test_metrics_merge_other_workers(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "METRICS_DIR", str(tmp_path))
+    other = metrics.Registry()
+    other.inc("prr_sql_queries_total", (("stage", "merge-probe"),), 5)
+    other.observe("prr_stage_seconds", (("stage", "merge-probe"),), 0.003)
+    monkeypatch.setattr(metrics, "REGISTRY", other)
+    metrics.flush()
+    (tmp_path / "worker-1-1.json").write_text((tmp_path / os.path.basename(metrics._worker["file"])).read_text())
+    monkeypatch.setattr(metrics, "REGISTRY", metrics.Registry())
+    metrics.REGISTRY.inc("prr_sql_queries_total", (("stage", "merge-probe"),), 2)
+    body = client.get("/metrics").get_data(as_text=True).splitlines()
+    # this worker's live 2 + the other worker's 5; its own stale dump is not counted twice
+    assert 'prr_sql_queries_total{stage="merge-probe"} 7' in body
+    assert 'prr_stage_seconds_count{stage="merge-probe"} 1' in body
+
+def test_gunicorn_startup_clears_only_metrics_dir(tmp_path, monkeypatch):
+    for var, value in {"WEB_CONCURRENCY": "1", "PRELOAD_APP": "0", "OMP_NUM_THREADS": "1"}.items():
+        monkeypatch.setenv(var, value)
+    monkeypatch.delenv("METRICS_DIR", raising=False)
+    conf = load_script("gunicorn.conf", folder=".")
+    stray, owned = tmp_path / "worker-1.json", tmp_path / "m" / "worker-2.json"
+    owned.parent.mkdir()
+    stray.write_text("{}"); owned.write_text("{}")
+    monkeypatch.chdir(tmp_path)
+    conf.on_starting(None)          # no METRICS_DIR: the working directory is not ours to clean
+    assert stray.exists()
+    monkeypatch.setenv("METRICS_DIR", str(owned.parent))
+    conf.on_starting(None)
+    assert stray.exists() and not owned.exists()
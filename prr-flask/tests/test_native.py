@@ -0,0 +1,40 @@
+import threading
+import numpy as np, pandas as pd
+from conftest import ROOT
+
+def _rows():
+    X = pd.read_csv(ROOT / "data" / "training_features_2005_2014.csv")
+    return X.drop(columns="employee_id").to_dict("records")
+
+def test_native_matches_sklearn(app):
+    from prr.services.model import ModelService
+    model = ModelService.current()
+    assert model.native is not None
+    rows = _rows()
+    expected = model.model.predict_proba(model.matrix(rows))[:, 1]
+    np.testing.assert_allclose(ModelService.score_batch(rows), expected, atol=1e-12)
+    np.testing.assert_allclose(ModelService.score_batch(rows[:7]), expected[:7], atol=1e-12)
+    np.testing.assert_allclose([ModelService.score(r) for r in rows[:25]], expected[:25], atol=1e-12)
+
+def test_native_single_row_threads(app):
+    from prr.services.model import ModelService
+    rows = _rows()[:40]
+    model = ModelService.current()
+    expected = model.model.predict_proba(model.matrix(rows))[:, 1]
+    out = {}
+    def work(k):
+        out[k] = [ModelService.score(r) for r in rows]
+    threads = [threading.Thread(target=work, args=(k,)) for k in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    for k in range(4): np.testing.assert_allclose(out[k], expected, atol=1e-12)
+
+def test_native_falls_back_for_sigmoid(app):
+    from lightgbm import LGBMClassifier
+    from sklearn.calibration import CalibratedClassifierCV
+    from prr.services.native import NativeScorer
+    x = np.random.default_rng(0).normal(size=(200, 3)); y = (x[:, 0] > 0).astype(int)
+    sig = CalibratedClassifierCV(LGBMClassifier(n_estimators=5, verbose=-1), method="sigmoid", cv=2).fit(x, y)
+    assert NativeScorer.from_model(sig, 3) is None
+    plain = LGBMClassifier(n_estimators=5, verbose=-1).fit(x, y)
+    np.testing.assert_allclose(NativeScorer.from_model(plain, 3).predict(x), plain.predict_proba(x)[:, 1], atol=1e-12)
@@ -0,0 +1,48 @@
+import json
+from sqlalchemy import text
+from prr.utils.db import db
+from prr.utils.cache import invalidate_catalog, catalog_cache
+from prr.services.recommender import SkillIndex, recommend_courses
+
+def _course(cid, skills, duration=5, internal=0):
+    return {"course_id": cid, "title": cid, "provider": "P", "duration_h": duration, "skills_json": json.dumps(skills), "internal_flag": internal}
+
+def test_ranking_overlap_then_internal_then_duration():
+    idx = SkillIndex([_course("A", ["Leadership"], 2), _course("B", ["Leadership", "Time Management"], 20),
+                      _course("C", ["leadership"], 9, internal=1), _course("D", ["Python"]), _course("E", "not json")])
+    assert [c["course_id"] for c in idx.search(["Leadership", "Time Management"])] == ["B", "C", "A"]
+    assert idx.search(["Leadership", "Time Management"])[0]["matched_skills"] == ["Leadership", "Time Management"]
+    assert idx.search(["Cooking"]) == []
+
+def test_partial_skill_match_ranks_below_exact():
+    idx = SkillIndex([_course("A", ["Detail Orientation"], 1), _course("B", ["Attention to Detail"], 30)])
+    assert [c["course_id"] for c in idx.search(["Attention to Detail"])] == ["B", "A"]
+
+def test_index_follows_catalog_changes(app):
+    with app.app_context():
+        assert [c["course_id"] for c in recommend_courses(["Leadership"])] == ["INT-MENT-001", "L-LEAD-101"]
+        db.session.execute(text("UPDATE catalog SET skills_json=:s WHERE course_id='L-LEAD-101'"), {"s": json.dumps(["Negotiation"])})
+        db.session.commit()
+        try:
+            invalidate_catalog()
+            assert [c["course_id"] for c in recommend_courses(["Leadership"])] == ["INT-MENT-001"]
+        finally:
+            db.session.execute(text("UPDATE catalog SET skills_json=:s WHERE course_id='L-LEAD-101'"),
+                               {"s": json.dumps(["Leadership", "Conflict Resolution"])})
+            db.session.commit()
+            invalidate_catalog()
+
+def test_same_length_catalog_edit_is_picked_up(app):
+    set_skills = lambda s: (db.session.execute(text("UPDATE catalog SET skills_json=:s WHERE course_id='L-LEAD-101'"),
+                                               {"s": json.dumps(s)}), db.session.commit())
+    with app.app_context():
+        recommend_courses(["Leadership"])
+        set_skills(["Cryptology", "Conflict Resolution"])   # same length as "Leadership"
+        try:
+            catalog_cache.clear()   # as when CACHE_TTL lapses
+            assert [c["course_id"] for c in recommend_courses(["Cryptology"])] == ["L-LEAD-101"]
+            assert "L-LEAD-101" not in [c["course_id"] for c in recommend_courses(["Leadership"])]
+        finally:
+            set_skills(["Leadership", "Conflict Resolution"])
+            invalidate_catalog()
+        assert "L-LEAD-101" in [c["course_id"] for c in recommend_courses(["Leadership"])]
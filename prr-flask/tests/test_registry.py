@@ -0,0 +1,57 @@
+import pytest
+from config import Config
+from conftest import MODEL_DIR
+from prr.services.model import ModelService
+from prr.services.registry import ModelRegistry
+
+@pytest.fixture()
+def registry(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "MODEL_REGISTRY", str(tmp_path / "registry"))
+    monkeypatch.setattr(ModelService, "_current", ModelService.current())
+    for v in ("v1", "v2"): ModelRegistry.publish(MODEL_DIR, v)
+    return tmp_path / "registry"
+
+def test_publish_and_pointer(registry):
+    assert [v["version"] for v in ModelRegistry.versions()] == ["v1", "v2"]
+    assert ModelRegistry.current() is None and ModelRegistry.resolve() == Config.MODEL_DIR
+    ModelRegistry.set_current("v2")
+    assert ModelRegistry.resolve() == str(registry / "v2")
+    assert ModelRegistry.path("../v1") is None
+    with pytest.raises(FileExistsError): ModelRegistry.publish(MODEL_DIR, "v1")
+
+def test_promote_swaps_without_breaking_held_model(client, registry):
+    before = ModelService.current()
+    r = client.post("/v1/models/v2/promote?wait=1")
+    assert r.status_code == 200 and r.get_json()["serving"] == "v2"
+    assert before.version != "v2" and before.score({}) == pytest.approx(ModelService.current().score({}))
+    body = client.post("/v1/promotion/score", json={"employee_id": 21}).get_json()
+    assert body["model_version"] == "v2"
+    batch = client.post("/v1/promotion/score:batch", json={"employee_ids": [21, 22]}).get_json()
+    assert batch["model_version"] == "v2" and {r["model_version"] for r in batch["results"]} == {"v2"}
+    listing = client.get("/v1/models").get_json()
+    assert listing["pointer"] == "v2" and [v["current"] for v in listing["versions"]] == [False, True]
+    assert client.post("/v1/models/nope/promote").status_code == 404
+
+def test_pointer_change_is_followed(app, registry, monkeypatch):
+    monkeypatch.setattr(Config, "MODEL_POLL_S", 0.0)
+    ModelRegistry.set_current("v1")
+    ModelService._checked_at = 0.0
+    ModelService.current()
+    for _ in range(100):
+        if ModelService._loading is None and ModelService._current.version == "v1": break
+        __import__("time").sleep(0.05)
+    assert ModelService.current().version == "v1"
+
+def test_broken_version_keeps_serving(client, registry):
+    (registry / "v1" / "model.pkl").write_bytes(b"not a pickle")
+    ModelRegistry.set_current("v2")
+    serving = ModelService.current().version
+    r = client.post("/v1/models/v1/promote?wait=1")
+    assert r.status_code == 500 and "v1" in r.get_json()["error"]
+    assert ModelService.current().version == serving and ModelRegistry.current() == "v2"
+
+def test_promote_requires_token(client, registry, monkeypatch):
+    monkeypatch.setitem(client.application.config, "ADMIN_TOKEN", "s3cret")
+    assert client.post("/v1/models/v2/promote").status_code == 401
+    r = client.post("/v1/models/v2/promote?wait=1", headers={"Authorization": "Bearer s3cret"})
+    assert r.status_code == 200
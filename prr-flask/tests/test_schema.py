@@ -0,0 +1,23 @@
+import pytest
+from sqlalchemy import create_engine, text, inspect
+from prr.utils.db import db, import_models
+from prr.utils.schema import migrate, check_query_plans, QueryPlanError
+
+def test_plan_check_fails_on_missing_index_and_migrate_restores_it(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    import_models().create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_project_activity_employee_date"))
+        conn.execute(text("DROP INDEX ux_project_activity_natural"))
+    with pytest.raises(QueryPlanError, match="project_activity"):
+        check_query_plans(engine)
+    assert sorted(migrate(engine)) == ["create index ix_project_activity_employee_date", "create index ux_project_activity_natural"]
+    check_query_plans(engine)
+
+def test_migrate_existing_db_is_idempotent(app):
+    with app.app_context():
+        migrate(db.engine)
+        assert migrate(db.engine) == []
+        names = {ix["name"] for ix in inspect(db.engine).get_indexes("feedback360")}
+        assert "ix_feedback360_employee_date" in names
+        check_query_plans(db.engine)
@@ -0,0 +1,36 @@
+import sqlite3
+import pandas as pd
+from conftest import ROOT, load_script
+
+def test_upsert_applies_only_the_delta(tmp_path):
+    seed = load_script("seed_all_from_csv")
+    conn = sqlite3.connect(tmp_path / "seed.db")
+    df = pd.DataFrame({"employee_id": [1, 1, 2], "date": ["2014-01-31", "2014-02-28", "2014-01-31"],
+                       "project_id": ["PRJ-01", "PRJ-01", "PRJ-02"], "hours": [10.0, 12.0, None]})
+    seed.write_table(conn, "project_activity", df.iloc[:0])
+    assert seed.upsert(conn, "project_activity", df)[1] == {"inserted": 3, "updated": 0, "unchanged": 0}
+    assert seed.upsert(conn, "project_activity", df)[1] == {"inserted": 0, "updated": 0, "unchanged": 3}
+    changed = pd.concat([df.assign(hours=[10.0, 13.5, None]),
+                         pd.DataFrame({"employee_id": [3], "date": ["2014-01-31"], "project_id": ["PRJ-03"], "hours": [1.0]})])
+    delta, report = seed.upsert(conn, "project_activity", changed)
+    assert report == {"inserted": 1, "updated": 1, "unchanged": 2}
+    assert sorted(delta["employee_id"]) == [1, 3]
+    stored = pd.read_sql_query("SELECT * FROM project_activity ORDER BY employee_id, date", conn)
+    assert len(stored) == 4 and stored["hours"].tolist()[1] == 13.5
+    conn.close()
+
+def test_scaled_seed_generates_synthetic_employees_and_tables(tmp_path):
+    seed = load_script("seed_all_from_csv")
+    seed.DATA_DIR = ROOT / "data"
+    conn = sqlite3.connect(tmp_path / "scaled.db")
+    emp = seed.seed_employees(conn, employees=1200)
+    assert len(emp) == 1200 and emp["id"].is_unique and emp["name"].iloc[-1] == "Employee 1200"
+    assert seed.seed_project_activity(conn, employees=1200)["employee_id"].nunique() == 1200
+    seed.seed_feedback360(conn); seed.seed_manager_review(conn); seed.seed_learning_history(conn)
+    fb = pd.read_sql_query("SELECT * FROM feedback360", conn)
+    assert len(fb) == 1200 * 6 and fb["rating"].between(1, 5).all() and fb["rater_id"].between(1, 1200).all()
+    assert pd.to_datetime(fb["date"]).dt.year.between(2009, 2014).all()
+    lh = pd.read_sql_query("SELECT start_dt, end_dt FROM learning_history", conn)
+    assert ((pd.to_datetime(lh["end_dt"]) - pd.to_datetime(lh["start_dt"])).dt.days.between(3, 29)).all()
+    assert pd.read_sql_query("SELECT period FROM manager_review", conn)["period"].str.fullmatch(r"201[1-4]-H[12]").all()
+    conn.close()
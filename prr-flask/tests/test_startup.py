@@ -0,0 +1,17 @@
+import os, subprocess, sys, time
+from conftest import ROOT
+
+def test_app_import_skips_ml_stack():
+    probe = "import sys, app; print(sorted(m for m in ('pandas', 'sklearn', 'lightgbm', 'shap', 'joblib') if m in sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, env={**os.environ, "PRELOAD_MODEL": "0"},
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip().splitlines()[-1] == "[]"
+
+def test_ready_flips_once_model_is_warm(client):
+    r = client.get("/ready")
+    for _ in range(200):
+        if r.status_code == 200: break
+        assert r.get_json()["status"] == "warming"
+        time.sleep(0.05)
+        r = client.get("/ready")
+    assert r.status_code == 200 and r.get_json()["model_version"]
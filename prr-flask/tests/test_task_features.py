@@ -0,0 +1,22 @@
+import pandas as pd
+from conftest import load_script
+
+def test_streamed_task_features_match_in_memory_groupby(tmp_path):
+    gen, tf = load_script("generate_big_data"), load_script("task_features", "ml")
+    gen.generate(tmp_path, n_emp=12, start="2014-01", end="2014-12")
+    gen.write_tasks(tmp_path, 12, "2014-01-01", "2014-12-31")
+    feats = tf.task_features(tmp_path, as_of="2014-11-30", batch_rows=997)
+
+    tasks = pd.read_csv(tmp_path / "full_project_tasks.csv")
+    emp = pd.read_csv(tmp_path / "employees_500.csv")
+    j = tasks.merge(emp[["employee_id", "last_promotion_date"]], on="employee_id")
+    j = j[(j["date"] >= j["last_promotion_date"]) & (j["date"] <= "2014-11-30")]
+    expected = j.groupby("employee_id").agg(on_time_ratio=("on_time", "mean"), quality_mean=("quality", "mean"),
+                                            velocity_total=("velocity", "sum"), impact_total=("impact", "sum")).reset_index()
+    got = feats.set_index("employee_id")
+    assert list(feats.columns) == ["employee_id"] + tf.datasets.FEATURES and len(feats) == len(expected)
+    for col in tf.TASK_FEATURES:
+        pd.testing.assert_series_equal(got.loc[expected["employee_id"], col].reset_index(drop=True),
+                                       expected[col], check_names=False, check_dtype=False)
+    base = pd.read_csv(tmp_path / "training_features_2005_2014.csv").set_index("employee_id")
+    assert (got["feedback_mean"] == base.loc[got.index, "feedback_mean"]).all()
@@ -0,0 +1,59 @@
+import sys
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np, pandas as pd
+from sklearn.model_selection import GroupKFold
+from conftest import ROOT
+
+sys.path.insert(0, str(ROOT / "ml"))
+import train_big  # noqa: E402  (importable by name so spawned workers can unpickle fit_fold)
+
+def _data():
+    X = pd.read_csv(ROOT / "data" / "training_features_2005_2014.csv")
+    y = pd.read_csv(ROOT / "data" / "promotion_labels_2014.csv")["label"].to_numpy()
+    groups = pd.read_csv(ROOT / "data" / "employees_500.csv")["org_unit"].astype("category").cat.codes.to_numpy()
+    x = X[train_big.datasets.FEATURES].to_numpy()
+    return x, y, list(GroupKFold(n_splits=train_big.N_SPLITS).split(x, y, groups=groups))
+
+def test_parallel_folds_match_serial_and_report_timings():
+    x, y, splits = _data()
+    params = {"n_estimators": 60}
+    serial = train_big.cross_validate(x, y, splits, params)
+    with ProcessPoolExecutor(2, mp_context=mp.get_context("spawn"), initializer=train_big._init_worker, initargs=(x, y)) as pool:
+        parallel = train_big.cross_validate(x, y, splits, params, pool)
+    assert [f["fold"] for f in parallel] == [1, 2, 3, 4, 5]
+    for s, p in zip(serial, parallel):
+        assert s["best_iteration"] == p["best_iteration"] <= 60 and p["wall_s"] > 0
+        np.testing.assert_allclose(s["prob"], p["prob"], atol=1e-9)
+
+def test_search_is_time_boxed_and_budget_splits_cores(monkeypatch):
+    x, y, splits = _data()
+    monkeypatch.setattr(train_big, "BASE_PARAMS", {**train_big.BASE_PARAMS, "n_estimators": 30})
+    (auc, params, folds), log = train_big.search(x, y, splits, budget_s=0.0, max_trials=5)
+    assert len(log["trials"]) == 1 and params == {} and len(folds) == 5
+    (_, _, _), log = train_big.search(x, y, splits, budget_s=3600, max_trials=3)
+    assert len(log["trials"]) == 3 and set(log["trials"][1]["params"]) == set(train_big.SEARCH_SPACE)
+    workers, n_jobs = train_big.cpu_budget(64)
+    assert workers <= train_big.N_SPLITS and workers * n_jobs >= 1
+
+def test_fold_ensemble_artifact_scores_through_model_service(tmp_path, monkeypatch):
+    import joblib, json
+    from prr.services.ensemble import FoldEnsemble
+    from prr.services.model import ModelService
+    x, y, splits = _data()
+    folds = train_big.cross_validate(x, y, splits, {"n_estimators": 80})
+    oof = np.zeros(len(y))
+    for f in folds: oof[splits[f["fold"] - 1][1]] = f["prob"]
+    ens = FoldEnsemble.from_folds([f["model"] for f in folds], [f["best_iteration"] for f in folds], oof, y)
+    assert [m.current_iteration() for m in ens.models] == [f["best_iteration"] for f in folds]
+    expected = np.mean([f["model"].predict_proba(x[:50])[:, 1] for f in folds], axis=0)
+    np.testing.assert_allclose(ens.raw(x[:50]), expected, atol=1e-9)
+    joblib.dump(ens, tmp_path / "model.pkl")
+    (tmp_path / "features.json").write_text(json.dumps({"feature_order": train_big.datasets.FEATURES}))
+    monkeypatch.setattr(ModelService, "_current", None)
+    ModelService.load(str(tmp_path))
+    rows = [dict(zip(train_big.datasets.FEATURES, r)) for r in x[:50]]
+    np.testing.assert_allclose(ModelService.score_batch(rows), ens.calibrator.predict(expected), atol=1e-9)
+    values, base = ModelService.explain_batch(rows[:3])
+    margin = np.mean([m.predict(x[:3], raw_score=True) for m in ens.models], axis=0)
+    np.testing.assert_allclose(base + values.sum(axis=1), margin, atol=1e-6)